@@ -2,10 +2,13 @@
 
 import datetime
 import logging
+import time
+import uuid
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
-from django.core.exceptions import FieldError
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
 from django.utils.timezone import now
 
 from .utils import TABLE_MAP, AEC_Triggers
@@ -20,6 +23,13 @@
 log = logging.getLogger(__name__)
 logger = get_task_logger(__name__)
 
+PRUNE_BATCH_SIZE = 1000
+PRUNE_MAX_SECONDS = 60 * 4
+PRUNE_CHECKPOINT_KEY = "aec_remrate_prune_checkpoint"
+PRUNE_CHECKPOINT_TIMEOUT = 60 * 60 * 24 * 7
+PRUNE_LOCK_KEY = "aec_remrate_prune_lock"
+PRUNE_LOCK_TIMEOUT = 60 * 30
+
 # These tables all get looked at when an export happens.
 LMAX_TABLES = {
     "AshpType": "lASTASTNo",
@@ -62,56 +72,171 @@ def _get_field_from_column(model, field):
     return final
 
 
-@shared_task(time_limit=60 * 5)
-def prune_remrate_data(**kwargs):
-    """This is the celery task which will prune the remrate database side of thing."""
+def _iter_pk_batches(queryset, batch_size, start_pk=None, fields=()):
+    """Walk ``queryset`` in primary key order, ``batch_size`` rows at a time, starting after
+    ``start_pk``.  Each batch is its own short query so no long running cursor is held open."""
+    last_pk = start_pk
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch.order_by("pk").values_list("pk", *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
 
-    from axis.remrate_data.models import DataTracker
 
-    before_now = now() - datetime.timedelta(hours=kwargs.get("hours", 48))
-    exclude = DataTracker.objects.using("default").filter(last_update__gte=before_now)
-    exclude = list(exclude.values_list("_result_number", flat=True))
+def _get_recent_result_numbers(result_numbers, before_now):
+    """The result numbers out of ``result_numbers`` that are still being tracked.  DataTracker
+    lives on the default database so this is evaluated one batch at a time."""
+    from axis.remrate_data.models import DataTracker
 
-    del_tables, del_rows = 0, 0
-    for idx, (source_model_name, destination_model_name) in enumerate(TABLE_MAP):
+    result_numbers = {x for x in result_numbers if x is not None}
+    if not result_numbers:
+        return set()
+    recent = DataTracker.objects.using("default").filter(
+        last_update__gte=before_now, _result_number__in=result_numbers
+    )
+    return set(recent.values_list("_result_number", flat=True))
+
+
+def _prune_table(SourceModelObj, before_now, batch_size, start_pk=None, exclude_pk=None):
+    """Delete the rows of a source table which are no longer tracked, one primary key batch at a
+    time.  Yields ``(last_pk, deleted)`` after each batch so the caller can checkpoint."""
+    sources = SourceModelObj.objects.all()
+    if exclude_pk is not None:
+        sources = sources.exclude(pk=exclude_pk)
+
+    try:
+        SourceModelObj._meta.get_field("result_number")
+        fields = ("result_number",)
+    except FieldDoesNotExist:
+        fields = ()
+
+    for rows in _iter_pk_batches(sources, batch_size, start_pk, fields):
+        pks = [row[0] for row in rows]
+        if fields:
+            recent = _get_recent_result_numbers([row[1] for row in rows], before_now)
+            pks = [pk for pk, result_number in rows if result_number not in recent]
+
+        deleted = 0
+        if pks:
+            deleted, _ = SourceModelObj.objects.filter(pk__in=pks).delete()
+        yield rows[-1][0], deleted
+
+
+def _update_lmax_row(source_model_name, destination_model_name, SourceModelObj, last_one):
+    """Renumber the row we kept so the next export follows on from the destination table"""
+    TargetObj = AEC_Triggers().get_destination_model(destination_model_name)
+    field = _get_field_from_column(SourceModelObj, LMAX_TABLES[source_model_name])
+    target_last = TargetObj.objects.all().order_by("pk").last()
+    number = 1 if not target_last else target_last.pk + 1
+    if getattr(last_one, field.name) != number:
+        try:
+            SourceModelObj.objects.filter(pk=last_one.pk).update(**{field.name: number})
+        except Exception as err:
+            logger.error(
+                "Issue attempting to Update - Please manually update: %r %s: %s -- %r",
+                source_model_name,
+                field.db_column,
+                number,
+                err,
+            )
+
+
+@shared_task(bind=True, time_limit=60 * 5)
+def prune_remrate_data(self, **kwargs):
+    """This is the celery task which will prune the remrate database side of thing.
+
+    Rows are removed in primary key batches of ``batch_size``.  Progress is checkpointed after
+    every batch; when the run reaches ``max_seconds`` it re-queues itself and carries on from the
+    checkpoint.  A run that was killed outright picks up from the same checkpoint next time.
+
+    Only one run works from the checkpoint at a time.  A run holds ``PRUNE_LOCK_KEY`` and hands
+    its token on to the run it re-queues, any other run finding the lock held does nothing.
+    """
+
+    lock_token = kwargs.pop("lock_token", None)
+    if lock_token is not None and cache.get(PRUNE_LOCK_KEY) == lock_token:
+        cache.set(PRUNE_LOCK_KEY, lock_token, timeout=PRUNE_LOCK_TIMEOUT)
+    else:
+        lock_token = uuid.uuid4().hex
+        if not cache.add(PRUNE_LOCK_KEY, lock_token, timeout=PRUNE_LOCK_TIMEOUT):
+            logger.info("REM/Rate prune is already running - skipping")
+            return "REM/Rate prune is already running"
+
+    requeued = False
+    try:
+        result, requeued = _prune_remrate_data(self, lock_token, **kwargs)
+    finally:
+        if not requeued:
+            cache.delete(PRUNE_LOCK_KEY)
+    return result
+
+
+def _prune_remrate_data(task, lock_token, **kwargs):
+    """Body of ``prune_remrate_data``.  Returns the result message and whether it re-queued."""
+    hours = kwargs.get("hours", 48)
+    batch_size = kwargs.get("batch_size", PRUNE_BATCH_SIZE)
+    max_seconds = kwargs.get("max_seconds", PRUNE_MAX_SECONDS)
+
+    started = time.monotonic()
+    before_now = now() - datetime.timedelta(hours=hours)
+
+    checkpoint = cache.get(PRUNE_CHECKPOINT_KEY) or {}
+    report = checkpoint.get("report", {})
+    if checkpoint:
+        logger.info("Resuming REM/Rate prune at %(table)s after pk %(pk)s", checkpoint)
+
+    table_names = [source_model_name for source_model_name, _ in TABLE_MAP]
+    start_idx = 0
+    if checkpoint.get("table") in table_names:
+        start_idx = table_names.index(checkpoint["table"])
+
+    for source_model_name, destination_model_name in TABLE_MAP[start_idx:]:
         SourceModelObj = AEC_Triggers().get_source_model(source_model_name)
 
-        sources = SourceModelObj.objects.all()
+        start_pk = None
+        if checkpoint.get("table") == source_model_name:
+            start_pk = checkpoint.get("pk")
 
         last_one = None
         if source_model_name in LMAX_TABLES.keys():
             # We need to keep at least one of these..
             field = _get_field_from_column(SourceModelObj, LMAX_TABLES[source_model_name])
             last_one = SourceModelObj.objects.all().order_by(field.name).last()
-            sources = sources.exclude(pk=last_one.pk)
 
-        try:
-            sources = sources.exclude(result_number__in=exclude)
-        except FieldError:
-            pass
+        pruned = _prune_table(
+            SourceModelObj,
+            before_now,
+            batch_size,
+            start_pk=start_pk,
+            exclude_pk=last_one.pk if last_one else None,
+        )
+        for last_pk, deleted in pruned:
+            report[source_model_name] = report.get(source_model_name, 0) + deleted
+            checkpoint = {"table": source_model_name, "pk": last_pk, "report": report}
+            cache.set(PRUNE_CHECKPOINT_KEY, checkpoint, timeout=PRUNE_CHECKPOINT_TIMEOUT)
+
+            if time.monotonic() - started > max_seconds:
+                logger.info(
+                    "REM/Rate prune stopped at %s after pk %s - continuing in a new task",
+                    source_model_name,
+                    last_pk,
+                )
+                task.apply_async(kwargs=dict(kwargs, lock_token=lock_token), countdown=5)
+                message = "Pruned {} tables with {} rows removed so far".format(
+                    len([x for x in report.values() if x]), sum(report.values())
+                )
+                return message, True
 
-        if sources.count():
-            del_tables += 1
+        if last_one:
+            _update_lmax_row(source_model_name, destination_model_name, SourceModelObj, last_one)
 
-        for source in sources:
-            source.delete()
-            del_rows += 1
+        if report.get(source_model_name):
+            logger.info("Pruned %s rows from %s", report[source_model_name], source_model_name)
 
-        if last_one:
-            TargetObj = AEC_Triggers().get_destination_model(destination_model_name)
-            field = _get_field_from_column(SourceModelObj, LMAX_TABLES[source_model_name])
-            target_last = TargetObj.objects.all().order_by("pk").last()
-            number = 1 if not target_last else target_last.pk + 1
-            if getattr(last_one, field.name) != number:
-                try:
-                    SourceModelObj.objects.filter(pk=last_one.pk).update(**{field.name: number})
-                except Exception as err:
-                    logger.error(
-                        "Issue attempting to Update - Please manually update: %r %s: %s -- %r",
-                        source_model_name,
-                        field.db_column,
-                        number,
-                        err,
-                    )
-
-    return "Pruned {} tables with {} rows removed".format(del_tables, del_rows)
+    cache.delete(PRUNE_CHECKPOINT_KEY)
+
+    del_tables = len([x for x in report.values() if x])
+    del_rows = sum(report.values())
+    return "Pruned {} tables with {} rows removed".format(del_tables, del_rows), False
@@ -2,9 +2,16 @@
 import io
 import logging
 import os
+from unittest import mock
 
 from django.core import management
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from axis.aec_remrate.models import SeasonalRate, UtilityRates
+from axis.aec_remrate.tasks import PRUNE_CHECKPOINT_KEY, PRUNE_LOCK_KEY, prune_remrate_data
+from axis.remrate_data.models import DataTracker
 
 log = logging.getLogger(__name__)
 
@@ -38,3 +45,119 @@ def test_build_sql_triggers(self):
                 self.assertEqual(list(source), list(compare))
 
         os.remove(output_file)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+@mock.patch(
+    "axis.aec_remrate.tasks.TABLE_MAP",
+    (("UtilRate", "UtilityRate"), ("SeasnRat", "SeasonalRate")),
+)
+class PruneRemrateDataTests(TestCase):
+    """The source tables are unmanaged, so the two pruned here are created for the tests"""
+
+    source_models = (UtilityRates, SeasonalRate)
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as schema_editor:
+            for model in cls.source_models:
+                schema_editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as schema_editor:
+            for model in cls.source_models:
+                schema_editor.delete_model(model)
+
+    @classmethod
+    def setUpTestData(cls):
+        # Result numbers 2 and 4 are still tracked, the last utility rate is kept regardless
+        for result_number in range(1, 7):
+            UtilityRates.objects.create(
+                result_number=result_number, utility_rate_no=result_number * 10
+            )
+            SeasonalRate.objects.create(
+                result_number=result_number,
+                utility_rate_no=result_number * 10,
+                seasonal_rate_no=result_number,
+            )
+        for result_number in (2, 4):
+            DataTracker.objects.create(
+                _result_number=result_number,
+                version="16.0",
+                db_major_version=16,
+                db_minor_version=0,
+            )
+
+    def setUp(self):
+        cache.delete_many([PRUNE_CHECKPOINT_KEY, PRUNE_LOCK_KEY])
+
+    def prune(self, **kwargs):
+        return prune_remrate_data.apply(kwargs=dict(kwargs, batch_size=2)).get()
+
+    def test_prune(self):
+        """Tracked results and the LMAX row survive the batches, the LMAX row is renumbered"""
+        result = self.prune()
+
+        self.assertEqual(result, "Pruned 2 tables with 6 rows removed")
+        self.assertEqual(
+            list(UtilityRates.objects.order_by("pk").values_list("result_number", flat=True)),
+            [2, 4, 6],
+        )
+        self.assertEqual(
+            list(SeasonalRate.objects.order_by("pk").values_list("result_number", flat=True)),
+            [2, 4, 6],
+        )
+        last_one = UtilityRates.objects.get(result_number=6)
+        self.assertEqual(last_one.utility_rate_no, 1)
+
+        self.assertIsNone(cache.get(PRUNE_CHECKPOINT_KEY))
+        self.assertIsNone(cache.get(PRUNE_LOCK_KEY))
+
+    def test_resume_from_checkpoint(self):
+        """A checkpoint skips the tables and rows it says are done"""
+        seasonal_rate_pks = list(SeasonalRate.objects.order_by("pk").values_list("pk", flat=True))
+        cache.set(
+            PRUNE_CHECKPOINT_KEY,
+            {"table": "SeasnRat", "pk": seasonal_rate_pks[2], "report": {"UtilRate": 3}},
+        )
+
+        result = self.prune()
+
+        self.assertEqual(result, "Pruned 2 tables with 4 rows removed")
+        self.assertEqual(UtilityRates.objects.count(), 6)
+        self.assertEqual(
+            list(SeasonalRate.objects.order_by("pk").values_list("result_number", flat=True)),
+            [1, 2, 3, 4, 6],
+        )
+        self.assertIsNone(cache.get(PRUNE_CHECKPOINT_KEY))
+
+    def test_requeue(self):
+        """Running out of time re-queues from the checkpoint and hands the lock over"""
+        task = prune_remrate_data._get_current_object()
+        with mock.patch.object(task, "apply_async") as apply_async:
+            result = self.prune(max_seconds=-1)
+
+        self.assertEqual(result, "Pruned 1 tables with 1 rows removed so far")
+        self.assertEqual(UtilityRates.objects.count(), 5)
+
+        checkpoint = cache.get(PRUNE_CHECKPOINT_KEY)
+        self.assertEqual(checkpoint["table"], "UtilRate")
+        self.assertEqual(checkpoint["report"], {"UtilRate": 1})
+
+        lock_token = cache.get(PRUNE_LOCK_KEY)
+        self.assertIsNotNone(lock_token)
+        apply_async.assert_called_once_with(
+            kwargs={"batch_size": 2, "max_seconds": -1, "lock_token": lock_token}, countdown=5
+        )
+
+        # A scheduled run can't start while the re-queued one holds the lock
+        self.assertEqual(self.prune(), "REM/Rate prune is already running")
+        self.assertEqual(UtilityRates.objects.count(), 5)
+
+        result = self.prune(lock_token=lock_token)
+        self.assertEqual(result, "Pruned 2 tables with 6 rows removed")
+        self.assertIsNone(cache.get(PRUNE_CHECKPOINT_KEY))
+        self.assertIsNone(cache.get(PRUNE_LOCK_KEY))
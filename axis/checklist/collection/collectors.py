@@ -10,6 +10,7 @@
 from django_input_collection.models import get_input_model, CollectionRequest
 
 from . import methods as axis_methods
+from .resolvers import clear_resolver_cache
 
 __author__ = "Autumn Valenta"
 __date__ = "2018-10-08 1:49 PM"
@@ -367,6 +368,8 @@ def store(self, instrument, data, **kwargs):
                 .last()
             )
 
+        # Anything resolved against this home status may now be out of date
+        clear_resolver_cache(home_status)
         return super(AxisCollectorMixin, self).store(instrument, data, **kwargs)
 
     def remove_child_instruments(self, instrument, **context):
@@ -382,6 +385,7 @@ def remove(self, instrument, instance):
         """Removes all inputs matching this context for child instruments to ``instrument``."""
         for child_instrument in instrument.get_child_instruments():
             self.remove_child_instruments(child_instrument, **self.context)
+        clear_resolver_cache(self.home_status)
         super(AxisCollectorMixin, self).remove(instrument, instance)
 
     def raise_error(self, exception):
@@ -1,6 +1,7 @@
 """Collection resolvers"""
 
 from .base import CollectorMethodResolver
+from .cache import CachedAttributeResolverMixin, clear_resolver_cache
 from .remrate import RemRateResolver
 from .simulation import SimulationResolver
 
@@ -0,0 +1,127 @@
+"""cache.py - Axis"""
+
+import logging
+import re
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models
+from django.db.models import prefetch_related_objects
+from django_input_collection.models import Condition
+
+__author__ = "Steven K"
+__date__ = "10/18/26 17:05"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven K",
+]
+
+log = logging.getLogger(__name__)
+
+CACHE_ATTRIBUTE = "_resolver_cache"
+MISSING = object()
+
+
+def get_resolver_cache(instance, create=True):
+    """The cache lives on the home status instance the collector was built around, so it is scoped
+    to the collector (and therefore the request) that loaded it."""
+    cache = getattr(instance, CACHE_ATTRIBUTE, None)
+    if cache is None and create:
+        cache = {"prefetched": False, "segments": {}, "values": {}}
+        setattr(instance, CACHE_ATTRIBUTE, cache)
+    return cache
+
+
+def clear_resolver_cache(instance):
+    """Drop anything resolved for ``instance`` - required once collected data changes"""
+    if instance is not None and hasattr(instance, CACHE_ATTRIBUTE):
+        delattr(instance, CACHE_ATTRIBUTE)
+
+
+def get_relation_lookups(model, dotted_paths):
+    """Reduce dotted paths to the longest relation lookups ``model`` can prefetch.
+    'floorplan.simulation.climate_zone' -> 'floorplan__simulation'"""
+    lookups = set()
+    for dotted_path in dotted_paths:
+        current, segments = model, []
+        for segment in dotted_path.split("."):
+            try:
+                field = current._meta.get_field(segment)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            segments.append(segment)
+            current = field.related_model
+        if segments:
+            lookups.add("__".join(segments))
+
+    # Drop anything a longer lookup already covers
+    return sorted(x for x in lookups if not any(y.startswith(x + "__") for y in lookups))
+
+
+def prefetch_resolver_paths(home_status, resolver_names=("rem", "simulation")):
+    """Prefetch the relation subtrees every attribute-resolver condition on the collection request
+    refers to in one pass, instead of walking them lazily per instrument."""
+    pattern = r"^(%s):" % "|".join(resolver_names)
+    data_getters = Condition.objects.filter(
+        instrument__collection_request_id=home_status.collection_request_id,
+        data_getter__regex=pattern,
+    ).values_list("data_getter", flat=True)
+
+    dotted_paths = {re.sub(pattern, "", data_getter) for data_getter in data_getters}
+    lookups = get_relation_lookups(home_status.__class__, dotted_paths)
+    if lookups:
+        prefetch_related_objects([home_status], *lookups)
+    return lookups
+
+
+class CachedAttributeResolverMixin(object):
+    """Memoizes ``resolve_dotted_path`` for every instrument resolved against the same home status.
+
+    Intermediate segments are cached while they resolve to model instances - this is where the
+    queries are (home_status.floorplan.simulation...).  Anything past that is handed back to the
+    stock resolver in one piece so list / manager handling is left untouched.
+    """
+
+    def resolve_dotted_path(self, obj, attr, *args, **kwargs):
+        if not isinstance(obj, models.Model) or args or kwargs:
+            return super(CachedAttributeResolverMixin, self).resolve_dotted_path(
+                obj, attr, *args, **kwargs
+            )
+
+        cache = get_resolver_cache(obj)
+        value = cache["values"].get(attr, MISSING)
+        if value is not MISSING:
+            return value
+
+        if not cache["prefetched"]:
+            cache["prefetched"] = True
+            if getattr(obj, "collection_request_id", None):
+                prefetch_resolver_paths(obj)
+
+        value = self._resolve_cached_path(cache["segments"], obj, attr)
+        cache["values"][attr] = value
+        return value
+
+    def _resolve_cached_path(self, segment_cache, obj, attr):
+        segments = attr.split(".")
+        current = obj
+        for idx, segment in enumerate(segments[:-1]):
+            prefix = ".".join(segments[: idx + 1])
+            value = segment_cache.get(prefix, MISSING)
+            if value is MISSING:
+                try:
+                    value = getattr(current, segment)
+                except (AttributeError, ObjectDoesNotExist):
+                    value = MISSING
+                if value is None or isinstance(value, models.Model):
+                    segment_cache[prefix] = value
+            if value is None:
+                return None
+            if not isinstance(value, models.Model):
+                break
+            current = value
+        else:
+            idx = len(segments) - 1
+        remainder = ".".join(segments[idx:])
+        return super(CachedAttributeResolverMixin, self).resolve_dotted_path(current, remainder)
@@ -5,6 +5,8 @@
 from django.apps import apps
 from django_input_collection.collection import AttributeResolver
 
+from .cache import CachedAttributeResolverMixin
+
 __author__ = "Autumn Valenta"
 __date__ = "2012-10-08 1:48:00 PM"
 __copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions.Consulting. All rights reserved."
@@ -19,7 +21,7 @@
 _should_log = getattr(app, "VERBOSE_LOGGING", False)
 
 
-class RemRateResolver(AttributeResolver):
+class RemRateResolver(CachedAttributeResolverMixin, AttributeResolver):
     name = "rem"
     pattern = r"(?P<dotted_path>.*)"
 
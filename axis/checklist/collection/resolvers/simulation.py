@@ -5,6 +5,8 @@
 from django.apps import apps
 from django_input_collection.collection import AttributeResolver
 
+from .cache import CachedAttributeResolverMixin
+
 log = logging.getLogger(__name__)
 
 __author__ = "Steven K"
@@ -19,7 +21,7 @@
 _should_log = getattr(app, "VERBOSE_LOGGING", False)
 
 
-class SimulationResolver(AttributeResolver):
+class SimulationResolver(CachedAttributeResolverMixin, AttributeResolver):
     name = "simulation"
     pattern = r"(?P<dotted_path>.*)"
 
@@ -17,8 +17,6 @@
 from localflavor.us.us_states import STATES_NORMALIZED
 from openpyxl.utils.exceptions import InvalidFileException
 
-from axis.community.models import Community
-from axis.company.models import Company
 from axis.customer_aps.aps_calculator import APSInputException
 from axis.customer_aps.aps_calculator.calculator import APSCalculator
 from axis.eep_program.models import EEPProgram
@@ -26,7 +24,8 @@
 from axis.filehandling.models import ResultObjectLog
 from axis.filehandling.utils import XLSXParser, get_physical_file
 from axis.floorplan.models import Floorplan
-from axis.geographic.models import ClimateZone, County, City
+from axis.geocoder.models import Geocode
+from axis.geographic.models import ClimateZone
 from axis.home.models import EEPProgramHomeStatus, Home
 from axis.home.tasks import (
     update_home_states,
@@ -40,7 +39,7 @@
 from axis.sampleset.strings import MISSING_SUBDIVISION
 from axis.sampleset.utils import inspect_for_sampleset, validate_bulk_sampleset_configuration
 from axis.scheduling.models import ConstructionStage, ConstructionStatus
-from axis.subdivision.models import Subdivision, EEPProgramSubdivisionStatus
+from axis.subdivision.models import EEPProgramSubdivisionStatus
 from . import strings
 from .forms import BULK_UPLOAD_EQUIV_MAP
 from .models import Question, QuestionChoice, CheckList, Section
@@ -49,10 +48,12 @@
     validate_checklist_sheets,
     ExcelChecklist,
     get_answered_questions_from_data,
+    get_question_pool,
     answer_questions_for_home,
     set_annotations_for_home,
     MAX_NUM_CHOICES,
     VALID_AFFIRMATIVE_BULK_FILL_RESPONSES,
+    BulkUploadLookupCache,
 )
 
 __author__ = "Steven Klass"
@@ -380,6 +381,7 @@ def bulk_checklist_process(
     results = xlsx.get_results_dictionary_list(
         equivalence_map=BULK_UPLOAD_EQUIV_MAP, set_lower=True
     )
+    xlsx.close()
     if not results:
         app_log.error(strings.XLS_NO_RESULTING_DATA.format(document=os.path.basename(filename)))
         return
@@ -393,6 +395,13 @@ def bulk_checklist_process(
     # STAGE TWO - Validation
     # ----------------------------------------------------------------------------------------------
 
+    # Most uploads repeat a handful of cities, builders and subdivisions - look each up once.
+    lookups = BulkUploadLookupCache(
+        company, log=app_log, only_bulk_home_processing=only_bulk_home_processing
+    )
+    lookups.prefetch(results)
+    question_pools = {}
+
     total_homes = len(results)
     final_results = []
     link_string = "<a target='_blank' href='{url}'>{object}</a>"
@@ -424,38 +433,22 @@ def bulk_checklist_process(
             except (KeyError, AttributeError):
                 app_log.error(strings.INVALID_US_STATE.format(state=result.get("state")))
 
-        county = County.objects.verify(
-            name=result.get("county"), state=state, ignore_missing=True, log=app_log
-        )
-
-        city = City.objects.verify(
-            name=result.get("city"),
-            county=county,
-            state=state,
-            info_only=True,
-            ignore_missing=only_bulk_home_processing,
-            log=app_log,
-        )
+        county = lookups.get_county(result.get("county"), state)
+        city = lookups.get_city(result.get("city"), county, state)
 
         builder = None
         if result.get("builder_org"):
-            builder = Company.objects.verify_existence_for_company(
-                result.get("builder_org"), company, log=app_log
-            )
+            builder = lookups.get_builder(result.get("builder_org"))
 
-        community = Community.objects.verify_existence_for_company(
-            result.get("community"), company, ignore_missing=True, log=app_log
-        )
+        community = lookups.get_community(result.get("community"))
 
         subdivision = None
         if result.get("subdivision") or result.get("subdivision_builder_name"):
-            subdivision = Subdivision.objects.verify_for_company(
-                name=result.get("subdivision"),
-                builder_name=result.get("subdivision_builder_name"),
-                company=company,
-                community=community,
-                builder=builder,
-                log=app_log,
+            subdivision = lookups.get_subdivision(
+                result.get("subdivision"),
+                result.get("subdivision_builder_name"),
+                community,
+                builder,
             )
 
         if subdivision:
@@ -525,8 +518,14 @@ def bulk_checklist_process(
                 payloads = [collector.clean_payload(payload) for payload in payloads]
 
             # For legacy and annotations--the input-collection setup doesn't handle the annotations
+            if eep_program.id not in question_pools:
+                question_pools[eep_program.id] = get_question_pool(eep_program)
             questions, annotations = get_answered_questions_from_data(
-                result, eep_program, ignore_missing=only_bulk_home_processing, log=app_log
+                result,
+                eep_program,
+                ignore_missing=only_bulk_home_processing,
+                log=app_log,
+                question_pool=question_pools[eep_program.id],
             )
 
         # Determine Sampling info
@@ -917,6 +916,25 @@ def get_expected_string(value):
     to_be_certified = []
     samplesets_to_be_certified = []
 
+    # Geocode the new homes together, the per home lookups below then find them already done.
+    geocode_lookups = []
+    for item in final_results:
+        city = item.get("city") or getattr(item.get("subdivision"), "city", None)
+        street_line1 = item["result"].get("street_line1")
+        if item.get("home") or not city or not street_line1 or not item.get("zipcode"):
+            continue
+        lookup = Home.objects.get_geocode_lookup(
+            street_line1=street_line1,
+            street_line2=item["result"].get("street_line2"),
+            city=city,
+            state=item.get("state"),
+            zipcode=item.get("zipcode"),
+            is_multi_family=item["result"].get("is_multi_family"),
+        )
+        geocode_lookups.append(lookup)
+    if geocode_lookups:
+        Geocode.objects.get_batch_matches(geocode_lookups)
+
     for item in final_results:
         stat = "{}/{}".format(final_results.index(item) + 1, len(final_results))
         app_log.set_context(row=None)
@@ -1207,6 +1225,7 @@ def get_expected_string(value):
                 user=user,
                 ignore_missing=only_bulk_home_processing,
                 overwrite_old_answers=overwrite_old_answers,
+                update_stats=False,
                 log=app_log,
             )
 
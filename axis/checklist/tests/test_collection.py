@@ -269,6 +269,49 @@ def test_conditional_zero_value_rem_data(self):
         questions = questions.values_list("measure", flat=True)
         self.assertEqual({"basic", "basic-alt", "condition-zero"}, set(questions))
 
+    def test_resolver_cache(self):
+        """Intermediate segments are resolved once per home status and dropped on demand"""
+        from django_input_collection.collection import AttributeResolver
+
+        from axis.checklist.collection.resolvers import RemRateResolver, clear_resolver_cache
+        from axis.checklist.collection.resolvers.cache import get_relation_lookups
+        from axis.home.models import EEPProgramHomeStatus
+
+        self.assertEqual(
+            get_relation_lookups(
+                EEPProgramHomeStatus,
+                [
+                    "floorplan.remrate_target.number_of_runs",
+                    "floorplan.remrate_target.version",
+                    "floorplan.square_footage",
+                    "eep_program.name",
+                    "not_a_field.version",
+                ],
+            ),
+            ["eep_program", "floorplan__remrate_target"],
+        )
+
+        # Fresh instances, so nothing is already sitting in Django's related object caches.
+        home_status = EEPProgramHomeStatus.objects.get(id=self.home_status.id)
+        uncached_home_status = EEPProgramHomeStatus.objects.get(id=self.home_status.id)
+
+        # Without the cache each relation is loaded when a path first walks through it
+        resolver = AttributeResolver()
+        resolver.resolve_dotted_path(uncached_home_status, "floorplan.square_footage")
+        with self.assertNumQueries(1):
+            resolver.resolve_dotted_path(uncached_home_status, "floorplan.remrate_target.version")
+
+        # The first lookup prefetches everything the request's rem: conditions walk through
+        resolver = RemRateResolver()
+        resolver.resolve_dotted_path(home_status, "floorplan.square_footage")
+        with self.assertNumQueries(0):
+            version = resolver.resolve_dotted_path(home_status, "floorplan.remrate_target.version")
+            resolver.resolve_dotted_path(home_status, "floorplan.remrate_target.export_type")
+        self.assertEqual(version, self.home_status.floorplan.remrate_target.version)
+
+        clear_resolver_cache(home_status)
+        self.assertFalse(hasattr(home_status, "_resolver_cache"))
+
     def test_condition_one_in_set(self):
         """Verifies that 'one' works for remrate data"""
         questions = self.home_status.get_unanswered_questions()
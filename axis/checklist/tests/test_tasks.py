@@ -436,3 +436,44 @@ def test_bulk_upload_multiples(self):
         self.assertEqual(CollectedInput.objects.count(), 6)
 
         self._test_bulk_upload_answers()
+
+
+class BulkUploadLookupCacheTests(AxisTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from axis.company.tests.factories import rater_organization_factory
+        from axis.geographic.tests.factories import city_factory
+
+        cls.company = rater_organization_factory()
+        cls.city = city_factory(name="Tempe", county__name="Maricopa", county__state="AZ")
+        cls.other_city = city_factory(name="Phoenix", county=cls.city.county)
+
+    def test_lookups_resolved_once_and_replayed(self):
+        """Each distinct lookup hits the database once, every row still gets its messages"""
+        from unittest import mock
+
+        from axis.checklist.utils import BulkUploadLookupCache, RecordedLog
+        from axis.geographic.models import City
+
+        log = RecordedLog()
+        lookups = BulkUploadLookupCache(self.company, log=log)
+        rows = [{"state": "AZ", "county": "Maricopa", "city": "Tempe"}] * 5
+        rows.append({"state": "AZ", "county": "Maricopa", "city": "Phoenix"})
+
+        with mock.patch.object(City.objects, "verify", wraps=City.objects.verify) as verify:
+            lookups.prefetch(rows)
+            self.assertEqual(verify.call_count, 2)
+            self.assertEqual(log.records, [])
+
+            county = lookups.get_county("Maricopa", "AZ")
+            start = len(log.records)
+            self.assertEqual(lookups.get_city("Tempe", county, "AZ"), self.city)
+            messages = log.records[start:]
+            self.assertTrue(len(messages))
+
+            start = len(log.records)
+            self.assertEqual(lookups.get_city("Tempe", county, "AZ"), self.city)
+            self.assertEqual(log.records[start:], messages)
+
+            self.assertEqual(lookups.get_city("Phoenix", county, "AZ"), self.other_city)
+            self.assertEqual(verify.call_count, 2)
@@ -0,0 +1,181 @@
+"""test_utils.py: checklist"""
+
+import datetime
+import logging
+from unittest import mock
+
+from django.db import connection
+
+from axis.core.tests.testcases import AxisTestCase
+from axis.checklist.models import Answer
+from axis.checklist.utils import answer_questions_for_home
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 21:05"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class AnswerQuestionsForHomeTests(AxisTestCase):
+    """Bulk answering is worked out in memory and has to store what the per-answer saves did"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from axis.checklist.tests.factories import (
+            checklist_factory,
+            question_choice_factory,
+            question_factory,
+        )
+        from axis.core.tests.factories import rater_admin_factory
+        from axis.eep_program.tests.factories import basic_eep_program_factory
+        from axis.home.tests.factories import eep_program_home_status_factory
+        from axis.scheduling.models import ConstructionStage
+
+        ConstructionStage.objects.get_or_create(name="Started", is_public=True, order=1)
+
+        cls.user = rater_admin_factory()
+        cls.open_question = question_factory()
+        cls.choice_question = question_factory(
+            question_choices=[
+                question_choice_factory(choice="Fail", is_considered_failure=True),
+                question_choice_factory(choice="Pass"),
+            ]
+        )
+        checklist = checklist_factory(questions=[cls.open_question, cls.choice_question])
+        eep_program = basic_eep_program_factory(
+            required_checklists=[checklist], owner=cls.user.company, no_close_dates=True
+        )
+        cls.home_status = eep_program_home_status_factory(
+            company=cls.user.company, eep_program=eep_program
+        )
+        cls.home = cls.home_status.home
+        cls.answer_date = datetime.datetime(2023, 4, 1)
+
+    def answer(self, questions, **kwargs):
+        return answer_questions_for_home(
+            self.user,
+            questions,
+            self.home_status,
+            self.user.company,
+            self.answer_date,
+            update_stats=False,
+            **kwargs,
+        )
+
+    def get_answer_dict(self, answer, choice_priority=1, is_considered_failure=False):
+        return {
+            "answer": answer,
+            "comment": "Comment on {}".format(answer),
+            "choice_priority": choice_priority,
+            "is_considered_failure": is_considered_failure,
+            "display_as_failure": is_considered_failure,
+        }
+
+    def test_new_answers(self):
+        """New answers carry the same values the per-answer get_or_create() stored"""
+        result = self.answer({self.open_question: [self.get_answer_dict("42")]})
+
+        answer = result.get()
+        self.assertEqual(answer.user, self.user)
+        self.assertEqual(answer.home, self.home)
+        self.assertEqual(answer.question, self.open_question)
+        self.assertEqual(answer.answer, "42")
+        self.assertEqual(answer.comment, "Comment on 42")
+        self.assertEqual(answer.type, self.open_question.type)
+        self.assertFalse(answer.is_considered_failure)
+        self.assertFalse(answer.failure_is_reviewed)
+        self.assertFalse(answer.confirmed)
+        self.assertTrue(answer.bulk_uploaded)
+
+        self.assertEqual(answer.history.count(), 1)
+        self.assertEqual(answer.history.get().history_user, self.user)
+
+    def test_new_answers_without_returned_ids(self):
+        """Backends which don't hand back ids from a bulk insert look the new answers up once"""
+        answers = [
+            self.get_answer_dict("Pass", choice_priority=2),
+            self.get_answer_dict("Fail", choice_priority=1, is_considered_failure=True),
+        ]
+        with mock.patch.object(connection.features, "can_return_rows_from_bulk_insert", False):
+            result = self.answer(
+                {self.open_question: [self.get_answer_dict("42")], self.choice_question: answers}
+            )
+
+        self.assertEqual(result.count(), 3)
+        self.assertEqual(set(result), set(Answer.objects.filter(home=self.home)))
+        for answer in result:
+            self.assertEqual(answer.history.get().history_user, self.user)
+
+    def test_passing_and_failing(self):
+        """A failure goes in already reviewed alongside the passing answer"""
+        answers = [
+            self.get_answer_dict("Pass", choice_priority=2),
+            self.get_answer_dict("Fail", choice_priority=1, is_considered_failure=True),
+        ]
+        result = self.answer({self.choice_question: answers})
+        self.assertEqual(result.count(), 2)
+
+        failing = result.get(is_considered_failure=True)
+        self.assertEqual(failing.answer, "Fail")
+        self.assertTrue(failing.failure_is_reviewed)
+        self.assertTrue(failing.display_as_failure)
+
+        passing = result.get(is_considered_failure=False)
+        self.assertEqual(passing.answer, "Pass")
+        self.assertFalse(passing.failure_is_reviewed)
+
+        for answer in result:
+            self.assertEqual(answer.history.get().history_user, self.user)
+
+    def test_reuse(self):
+        """Without overwriting a question which already has an answer keeps it"""
+        from axis.checklist.tests.factories import answer_factory
+
+        existing = answer_factory(self.open_question, self.home, self.user, answer="Old")
+
+        result = self.answer(
+            {
+                self.open_question: [self.get_answer_dict("New")],
+                self.choice_question: [self.get_answer_dict("Pass")],
+            }
+        )
+
+        self.assertEqual(list(result.values_list("answer", flat=True)), ["Pass"])
+        answers = Answer.objects.filter(home=self.home, question=self.open_question)
+        self.assertEqual(list(answers), [existing])
+
+    def test_overwrite(self):
+        """Overwriting removes every existing answer to the question in favor of the new ones"""
+        from axis.checklist.tests.factories import answer_factory
+
+        answer_factory(self.choice_question, self.home, self.user, answer="Pass")
+        answer_factory(
+            self.choice_question, self.home, self.user, answer="Fail", is_considered_failure=True
+        )
+
+        answers = [
+            self.get_answer_dict("Pass", choice_priority=2),
+            self.get_answer_dict("Fail", choice_priority=1, is_considered_failure=True),
+        ]
+        result = self.answer({self.choice_question: answers}, overwrite_old_answers=True)
+
+        answers = Answer.objects.filter(home=self.home, question=self.choice_question)
+        self.assertEqual(set(answers), set(result))
+        self.assertEqual(
+            set(answers.values_list("answer", "failure_is_reviewed")),
+            {("Pass", False), ("Fail", True)},
+        )
+
+    def test_nothing_to_do(self):
+        """No questions, or a certified home, leave the answers alone"""
+        self.assertIsNone(self.answer({}))
+        self.assertIsNone(self.answer(None, ignore_missing=True))
+
+        self.home_status.certification_date = datetime.date(2023, 4, 1)
+        result = self.answer({self.open_question: [self.get_answer_dict("42")]})
+        self.assertIsNone(result)
+        self.assertFalse(Answer.objects.filter(home=self.home).exists())
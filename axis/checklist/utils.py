@@ -10,11 +10,14 @@
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import MultipleObjectsReturned
-from django.db.models.signals import post_save, post_delete
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete
 from django.forms import ValidationError
 from django.urls import reverse
 from django.utils import formats
 from django.utils.timezone import now
+from localflavor.us.us_states import STATES_NORMALIZED
 from openpyxl import Workbook
 from openpyxl.comments import Comment
 from openpyxl.drawing.image import Image
@@ -33,15 +36,22 @@
 from openpyxl.utils import get_column_letter
 from openpyxl.utils.exceptions import InvalidFileException
 from openpyxl.worksheet.datavalidation import DataValidation
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from axis.annotation.messages import NWESHMeetsOrBeatsAnsweredNo
+from axis.community.models import Community
 from axis.company.models import Company
 from axis.core.utils import values_to_dict
 from axis.eep_program.models import EEPProgram
 from axis.filehandling.utils import XLSXParser
+from axis.geographic.models import City, County
+from axis.home.models import EEPProgramHomeStatus
 from axis.home.signals import update_stats_on_answer
 from axis.home.tasks import update_home_stats, update_home_states
+from axis.home.utils import get_sampleset_home_status_ids
+from axis.sampleset.utils import update_sampleset_answer_coverage
 from axis.scheduling.models import ConstructionStatus, ConstructionStage
+from axis.subdivision.models import Subdivision
 from . import strings
 from .collection.excel import BulkExcelChecklistCollector
 from .models import Question, Answer, TYPE_CHOICES, CheckList, QAAnswer
@@ -226,7 +236,8 @@ def validate_answer(
     is_considered_failure, display_as_failure, email_required = False, False, False
     document_required, photo_required = False, False
     if question.type == "multiple-choice":
-        choice = question.question_choice.get(choice=answer)
+        # question_choice is often prefetched, see get_question_pool()
+        choice = next(x for x in question.question_choice.all() if x.choice == answer)
         if choice.is_considered_failure:
             choice_priority = 0
         else:
@@ -251,7 +262,20 @@ def validate_answer(
     }
 
 
-def get_answered_questions_from_data(data, eep_program, ignore_missing=False, log=None):
+def get_question_pool(eep_program):
+    """The program questions with their choices, for matching and validating answers in memory"""
+    return list(Question.objects.filter_by_eep(eep_program).prefetch_related("question_choice"))
+
+
+def find_questions(question_pool, question_start):
+    """In memory version of ``question__istartswith``"""
+    question_start = question_start.lower()
+    return [x for x in question_pool if x.question.lower().startswith(question_start)]
+
+
+def get_answered_questions_from_data(
+    data, eep_program, ignore_missing=False, log=None, question_pool=None
+):
     """
     Correlates string questions with valid answers, which are the keys and values of ``data``.
 
@@ -271,7 +295,8 @@ def get_answered_questions_from_data(data, eep_program, ignore_missing=False, lo
     questions = defaultdict(list)
     annotations = []
 
-    question_pool = Question.objects.filter_by_eep(eep_program)
+    if question_pool is None:
+        question_pool = get_question_pool(eep_program)
 
     for potential_question, potential_answer in data.items():
         if potential_question is None or potential_answer is None:
@@ -302,30 +327,27 @@ def get_answered_questions_from_data(data, eep_program, ignore_missing=False, lo
                 continue
 
         # Find the text question's corresponding object
-        try:
-            question = question_pool.get(question__istartswith=question_start)
-        except Question.DoesNotExist:
+        matches = find_questions(question_pool, question_start)
+        if not matches:
             continue
-        except Question.MultipleObjectsReturned:
+        if len(matches) > 1:
             # Try again with a space on the end to narrow the pool
-            try:
-                question = question_pool.get(question__istartswith="{} ".format(question_start))
-            except Question.MultipleObjectsReturned:
+            matches = find_questions(question_pool, "{} ".format(question_start))
+            if len(matches) > 1:
                 err = 'Many questions found for "{}" - skipped'
                 log.error(err.format(question_start))
                 continue
-            except Question.DoesNotExist:
-                # The first query returned many, but the second returned none.
+            if not matches:
+                # The first lookup returned many, but the second returned none.
                 # Try again with a period on the end instead of a space.
-                try:
-                    question = question_pool.get(
-                        question__istartswith="{}. ".format(question_start)
-                    )  # A bug with OpenPyXL # FIXME: Document what the bug is
-                except Question.DoesNotExist:
+                # A bug with OpenPyXL # FIXME: Document what the bug is
+                matches = find_questions(question_pool, "{}. ".format(question_start))
+                if len(matches) != 1:
                     if ignore_missing:
                         issue = 'Unable to find a question which matches "%s" - skipped (%s)'
                         log.info(issue, potential_question, question_start)
                     continue
+        question = matches[0]
 
         # NOTE: Custom EFL handling
         # Here is where we will need to handle multiple answers when EFL gives us many
@@ -387,10 +409,35 @@ def get_answered_questions_from_data(data, eep_program, ignore_missing=False, lo
                 {"answer": sorted_answers[-1]["answer"]},
             )
             questions[question] = failing + [sorted_answers[-1]]
-    log.debug("Validated %s/%s questions", len(questions.keys()), question_pool.count())
+    log.debug("Validated %s/%s questions", len(questions.keys()), len(question_pool))
     return AnsweredQuestionResultTuple(questions=questions, annotations=annotations)
 
 
+def _bulk_create_answers(answer_model, answers, home, user):
+    """Creates ``answers`` along with their history records.
+
+    Backends which can't return the new ids from a bulk insert (MySQL) would have
+    ``bulk_create_with_history()`` look every answer back up by all of its values.  The new rows
+    are picked up in one query on home, user, question and id instead.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return bulk_create_with_history(answers, answer_model, default_user=user)
+
+    last_id = answer_model.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    answer_model.objects.bulk_create(answers)
+    created = list(
+        answer_model.objects.filter(
+            id__gt=last_id,
+            home=home,
+            user=user,
+            question_id__in={answer.question_id for answer in answers},
+            bulk_uploaded=True,
+        ).order_by("id")
+    )
+    answer_model.history.bulk_history_create(created, default_user=user)
+    return created
+
+
 def answer_questions_for_home(
     user,
     questions,
@@ -400,9 +447,14 @@ def answer_questions_for_home(
     log=None,
     ignore_missing=False,
     overwrite_old_answers=False,
+    update_stats=True,
 ):
+    """Stores the validated ``questions`` (see ``get_answered_questions_from_data()``) for a home.
+
+    Answers are worked out in memory and written in one transaction; use ``update_stats=False``
+    when the caller updates the home stats and states itself.
+    """
     from axis.company.models import COMPANY_MODELS
-    from axis.home.models import EEPProgramHomeStatus
 
     log = log if log else logging.getLogger(__name__)
 
@@ -440,13 +492,21 @@ def answer_questions_for_home(
         log.info(info_already_certified, home_url)
         return None
 
-    stage_updated = False
-    new_answers, answer_ids, reused_answers, overwritten_answers = [], [], [], []
+    answer_datetime = None
+    if answer_date:
+        answer_datetime = datetime.datetime.combine(answer_date, datetime.time()).replace(
+            tzinfo=datetime.timezone.utc
+        )
 
-    # Disconnect HomeStatusUpdate - We want to update the states when we are done..
-    post_save.disconnect(update_stats_on_answer, sender=answer_model)
-    if overwrite_old_answers:
-        post_delete.disconnect(update_stats_on_answer, sender=answer_model)
+    # One pass for what is already there - everything else is worked out in memory.
+    existing = defaultdict(list)
+    existing_answers = answer_model.objects.filter(
+        home=home, question__in=[question for question, answers in questions.items() if answers]
+    )
+    for existing_answer in existing_answers.order_by("-id"):
+        existing[existing_answer.question_id].append(existing_answer)
+
+    new_answers, reused_answers, overwritten_answers, removed_answer_ids = [], [], [], []
 
     ctime = None
     for question, answers in questions.items():
@@ -467,102 +527,89 @@ def answer_questions_for_home(
         sorted_answers = sorted(answers, key=lambda k: k["choice_priority"])
         assert len(sorted_answers) <= 2, "At most one passing and one failing is allowed"
 
-        existing_answers = answer_model.objects.filter(home=home, question=question).order_by("-id")
+        existing_answers = existing.get(question.id, [])
 
         # Skip examination of new answers unless we're in overwrite mode.
-        if not overwrite_old_answers or (existing_answers and not sorted_answers):
-            if len(existing_answers):
-                existing_answer = existing_answers[0]
-                # msg = strings.REUSE_ANSWER
-                # log.debug(msg.format(answer=existing_answer, question=question.question[:14]))
-                reused_answers.append(existing_answer)
-                continue
+        if existing_answers and not overwrite_old_answers:
+            reused_answers.append(existing_answers[0])
+            continue
 
-        for answer_dict in sorted_answers:
-            if not stage_updated:
-                info_stage_updated = "Setting the home construction stage to {stage}"
-                stage = ConstructionStage.objects.get(name="Started", is_public=True, order=1)
-                try:
-                    status, create = ConstructionStatus.objects.get_or_create(
-                        stage=stage,
-                        home=home,
-                        company=company,
-                        defaults=dict(start_date=answer_date),
-                    )
-                except MultipleObjectsReturned:
-                    _stats = ConstructionStatus.objects.filter(
-                        stage=stage, home=home, company=company
-                    )
-                    for idx, _stat in enumerate(list(_stats.all())):
-                        if idx == 0:
-                            continue
-                        _stat.delete()
-                log.info(info_stage_updated.format(stage=stage.name))
-                stage_updated = True
-
-            # If the answer is new, then it means it's not one of the existing answers, since
-            # we fetched the new answer via get_or_create().
-            # In this situation, we will remove old answers in favor of the new one(s).
-            if overwrite_old_answers and existing_answers:
-                existing_answer = existing_answers[0]
-                msg = strings.OVERWRITE_ANSWER
-                ques_str = "{}...".format(question.question[:14])
-                log.debug(
-                    msg.format(
-                        answer=existing_answer.answer,
-                        question=ques_str,
-                        new_answer=answer_dict.get("answer"),
-                    )
+        # In overwrite mode we remove old answers in favor of the new one(s).
+        if existing_answers:
+            msg = strings.OVERWRITE_ANSWER
+            ques_str = "{}...".format(question.question[:14])
+            log.debug(
+                msg.format(
+                    answer=existing_answers[0].answer,
+                    question=ques_str,
+                    new_answer=sorted_answers[0].get("answer"),
                 )
-                overwritten_answers.append(existing_answer)
-                existing_answers.delete()
-
-            answer_datetime = datetime.datetime.combine(answer_date, datetime.time()).replace(
-                tzinfo=datetime.timezone.utc
             )
+            overwritten_answers.append(existing_answers[0])
+            removed_answer_ids += [existing_answer.id for existing_answer in existing_answers]
 
-            answer_obj, created = answer_model.objects.get_or_create(
+        for answer_dict in sorted_answers:
+            answer_obj = answer_model(
                 user=user,
                 question=question,
                 home=home,
                 answer=answer_dict.get("answer"),
                 is_considered_failure=answer_dict.get("is_considered_failure", False),
                 display_as_failure=answer_dict.get("display_as_failure", False),
+                failure_is_reviewed=bool(answer_dict.get("is_considered_failure")),
                 type=question.type,
-                defaults=dict(
-                    comment=answer_dict.get("comment"),
-                    created_date=answer_datetime,
-                    confirmed=False,
-                    bulk_uploaded=True,
-                ),
+                comment=answer_dict.get("comment"),
+                created_date=answer_datetime,
+                confirmed=False,
+                bulk_uploaded=True,
             )
+            if answer_obj.is_considered_failure:
+                log.info("Review of identified failure for '%s' set", answer_obj)
+            new_answers.append(answer_obj)
 
-            if created:
-                new_answers.append(answer_obj)
-                historical_answer = answer_obj.history.first()
-                if historical_answer and historical_answer.history_user is None:
-                    historical_answer.history_user = user
-                    historical_answer.save()
+    if new_answers:
+        info_stage_updated = "Setting the home construction stage to {stage}"
+        stage = ConstructionStage.objects.get(name="Started", is_public=True, order=1)
+        try:
+            status, create = ConstructionStatus.objects.get_or_create(
+                stage=stage,
+                home=home,
+                company=company,
+                defaults=dict(start_date=answer_date),
+            )
+        except MultipleObjectsReturned:
+            _stats = ConstructionStatus.objects.filter(stage=stage, home=home, company=company)
+            for idx, _stat in enumerate(list(_stats.all())):
+                if idx == 0:
+                    continue
+                _stat.delete()
+        log.info(info_stage_updated.format(stage=stage.name))
 
-            if answer_dict.get("is_considered_failure"):
-                log.info("Review of identified failure for '%s' set", answer_obj)
-                answer_obj.failure_is_reviewed = True
-                answer_obj.save()
-                historical_answer = answer_obj.history.first()
-                historical_answer.history_user = user
-                historical_answer.save()
-            answer_ids.append(answer_obj.id)
-
-    # Now update the stats
-    post_save.connect(update_stats_on_answer, sender=answer_model)
-    if overwrite_old_answers:
-        post_delete.connect(update_stats_on_answer, sender=answer_model)
+    # Stats and states get updated once when we are done, not for every answer.
+    if removed_answer_ids:
+        post_delete.disconnect(update_stats_on_answer, sender=answer_model)
+    try:
+        with transaction.atomic():
+            if removed_answer_ids:
+                answer_model.objects.filter(id__in=removed_answer_ids).delete()
+            if new_answers:
+                new_answers = _bulk_create_answers(answer_model, new_answers, home, user)
+    finally:
+        if removed_answer_ids:
+            post_delete.connect(update_stats_on_answer, sender=answer_model)
 
     if len(new_answers) or len(overwritten_answers):
-        if home_stat.pct_complete < 99.9:
-            update_home_stats(eepprogramhomestatus_id=home_stat.id, log=log)
-        if home_stat.state != "complete":
-            update_home_states(eepprogramhomestatus_id=home_stat.id, user_id=user.id, log=log)
+        # Bulk creation skips the answer post_save signals which index sampleset coverage.
+        update_sampleset_answer_coverage(new_answers)
+        home_status_ids = home.homestatuses.values_list("id", flat=True)
+        EEPProgramHomeStatus.invalidate_requirements_cache(
+            get_sampleset_home_status_ids(list(home_status_ids)), ["answers", "sampleset"]
+        )
+        if update_stats:
+            if home_stat.pct_complete < 99.9:
+                update_home_stats(eepprogramhomestatus_id=home_stat.id, log=log)
+            if home_stat.state != "complete":
+                update_home_states(eepprogramhomestatus_id=home_stat.id, user_id=user.id, log=log)
 
     home_stat.validate_references()
 
@@ -577,34 +624,57 @@ def answer_questions_for_home(
             home=href,
         )
     )
-    return answer_model.objects.filter(id__in=answer_ids)
+    return answer_model.objects.filter(id__in=[answer.id for answer in new_answers])
 
 
 def set_annotations_for_home(annotations, home_stat, user, log=None):
+    from axis.annotation.models import Annotation
+
     log = log if log else logging.getLogger(__name__)
-    objects = []
     total = 0
     changed = 0
     content_type = ContentType.objects.get_for_model(home_stat)
-    for i, data in enumerate(annotations):
-        obj, created = home_stat.annotations.get_or_create(
-            content_type=content_type,
-            object_id=home_stat.id,
-            user=user,
-            type=data["type"],
-            defaults={
-                "content": data["content"],
-            },
-        )
-        if created:
+
+    existing = {}
+    for annotation in home_stat.annotations.filter(user=user).order_by("id"):
+        existing.setdefault(annotation.type_id, annotation)
+
+    objects, new_annotations, changed_annotations = [], {}, {}
+    for data in annotations:
+        obj = existing.get(data["type"].id) or new_annotations.get(data["type"].id)
+        if obj is None:
             total += 1
+            obj = Annotation(
+                content_type=content_type,
+                object_id=home_stat.id,
+                user=user,
+                type=data["type"],
+                content=data["content"],
+            )
+            new_annotations[data["type"].id] = obj
         else:
             changed += 1
             obj.content = data["content"]
-            obj.save()
+            if obj.pk:
+                changed_annotations[obj.pk] = obj
         objects.append(obj)
 
-        if data["type"].slug == "beat-annual-fuel-usage" and obj.content.lower() == "no":
+    with transaction.atomic():
+        if new_annotations:
+            created = bulk_create_with_history(
+                list(new_annotations.values()), Annotation, default_user=user
+            )
+            created = {annotation.type_id: annotation for annotation in created}
+            objects = [created.get(obj.type_id, obj) if not obj.pk else obj for obj in objects]
+        if changed_annotations:
+            bulk_update_with_history(
+                list(changed_annotations.values()), Annotation, ["content"], default_user=user
+            )
+    if new_annotations or changed_annotations:
+        EEPProgramHomeStatus.invalidate_requirements_cache([home_stat.id], ["annotations"])
+
+    for obj in objects:
+        if obj.type.slug == "beat-annual-fuel-usage" and obj.content.lower() == "no":
             context = {"url": home_stat.get_absolute_url(), "text": "{}".format(home_stat)}
             NWESHMeetsOrBeatsAnsweredNo(url=home_stat.get_absolute_url()).send(
                 user=user, context=context
@@ -679,28 +749,33 @@ def validate_checklist_spreadsheet_format(filename, result_log):
             result_log.update(errors=err)
             continue
 
-        headers = set(xlsx.get_columns(uniq_column=uniq_header_column))
-        if not len(headers):
-            err = (
-                "Unable to find header row in sheet {} XLSX File. Looking for a column which "
-                'exactly matches with "{}"'
-            ).format(sheet, uniq_header_column)
-            result_log.update(errors=err)
-            continue
+        try:
+            headers = set(xlsx.get_columns(uniq_column=uniq_header_column))
+            if not len(headers):
+                err = (
+                    "Unable to find header row in sheet {} XLSX File. Looking for a column which "
+                    'exactly matches with "{}"'
+                ).format(sheet, uniq_header_column)
+                result_log.update(errors=err)
+                continue
 
-        if not COLUMNS_WE_CARE_ABOUT[sheet].issubset(headers):
-            missing = ", ".join(list(COLUMNS_WE_CARE_ABOUT[sheet] - headers))
-            err = "XLSX sheet {} is missing the following columns: {}".format(sheet, missing)
-            result_log.update(errors=err)
-            continue
+            if not COLUMNS_WE_CARE_ABOUT[sheet].issubset(headers):
+                missing = ", ".join(list(COLUMNS_WE_CARE_ABOUT[sheet] - headers))
+                err = "XLSX sheet {} is missing the following columns: {}".format(sheet, missing)
+                result_log.update(errors=err)
+                continue
+
+            # Only counted - there is no need to hold on to the rows here.
+            results = sum(1 for _result in xlsx.iter_results_dictionary())
+        finally:
+            xlsx.close()
 
-        results = xlsx.get_results_dictionary_list()
         if not results:
             err = "There are no results on sheet {}".format(sheet)
             result_log.update(errors=err)
             continue
 
-        log.info("Sheet %s looks good - %s results", sheet, len(results))
+        log.info("Sheet %s looks good - %s results", sheet, results)
 
 
 def validate_checklist_sheets(filename, result_log, company):
@@ -851,6 +926,147 @@ def validate_checklist_sheet_Questions(filename, result_log, section_list, choic
                 result_log.update(errors=errors.format(bulk_fill))
 
 
+class RecordedLog(object):
+    """Stands in for a log and keeps every message so it can be replayed onto another one"""
+
+    def __init__(self):
+        self.records = []
+
+    def __getattr__(self, level):
+        def record(*args, **kwargs):
+            self.records.append((level, args, kwargs))
+
+        return record
+
+    def replay(self, log):
+        for level, args, kwargs in self.records:
+            getattr(log, level)(*args, **kwargs)
+
+
+class BulkUploadLookupCache(object):
+    """Resolves the counties, cities, builders, communities and subdivisions of a single bulk
+    upload once per distinct input.  The messages logged the first time are replayed on every row
+    which asks again, so each row reports exactly what it would have on its own.
+
+    Lookups can be done up front with ``prefetch()``; rows then only replay messages.
+    """
+
+    def __init__(self, company, log=None, only_bulk_home_processing=False):
+        self.company = company
+        self.log = log if log else logging.getLogger(__name__)
+        self.only_bulk_home_processing = only_bulk_home_processing
+        self._cache = {}
+
+    def resolve(self, key, method, replay=True, **kwargs):
+        if key not in self._cache:
+            recorded_log = RecordedLog()
+            self._cache[key] = method(log=recorded_log, **kwargs), recorded_log
+        value, recorded_log = self._cache[key]
+        if replay:
+            recorded_log.replay(self.log)
+        return value
+
+    def get_state(self, value):
+        try:
+            return STATES_NORMALIZED[value.lower()] if value else None
+        except (KeyError, AttributeError):
+            return None
+
+    def get_county(self, name, state, replay=True):
+        key = ("county", name, state)
+        return self.resolve(
+            key, County.objects.verify, replay, name=name, state=state, ignore_missing=True
+        )
+
+    def get_city(self, name, county, state, replay=True):
+        key = ("city", name, county.pk if county else None, state)
+        return self.resolve(
+            key,
+            City.objects.verify,
+            replay,
+            name=name,
+            county=county,
+            state=state,
+            info_only=True,
+            ignore_missing=self.only_bulk_home_processing,
+        )
+
+    def get_builder(self, name, replay=True):
+        return self.resolve(
+            ("builder", name),
+            Company.objects.verify_existence_for_company,
+            replay,
+            name=name,
+            company=self.company,
+        )
+
+    def get_community(self, name, replay=True):
+        return self.resolve(
+            ("community", name),
+            Community.objects.verify_existence_for_company,
+            replay,
+            name=name,
+            company=self.company,
+            ignore_missing=True,
+        )
+
+    def get_subdivision(self, name, builder_name, community, builder, replay=True):
+        key = (
+            "subdivision",
+            name,
+            builder_name,
+            community.pk if community else None,
+            builder.pk if builder else None,
+        )
+        return self.resolve(
+            key,
+            Subdivision.objects.verify_for_company,
+            replay,
+            name=name,
+            builder_name=builder_name,
+            company=self.company,
+            community=community,
+            builder=builder,
+        )
+
+    def prefetch(self, results):
+        """Resolve every distinct (county, city, builder, subdivision) of the upload once"""
+        seen = set()
+        for result in results:
+            values = tuple(
+                result.get(k)
+                for k in [
+                    "state",
+                    "county",
+                    "city",
+                    "builder_org",
+                    "community",
+                    "subdivision",
+                    "subdivision_builder_name",
+                ]
+            )
+            if values in seen:
+                continue
+            seen.add(values)
+
+            state = self.get_state(result.get("state"))
+            county = self.get_county(result.get("county"), state, replay=False)
+            self.get_city(result.get("city"), county, state, replay=False)
+            builder = None
+            if result.get("builder_org"):
+                builder = self.get_builder(result.get("builder_org"), replay=False)
+            community = self.get_community(result.get("community"), replay=False)
+            if result.get("subdivision") or result.get("subdivision_builder_name"):
+                self.get_subdivision(
+                    result.get("subdivision"),
+                    result.get("subdivision_builder_name"),
+                    community,
+                    builder,
+                    replay=False,
+                )
+        log.debug("Resolved %d distinct lookups for %d rows", len(self._cache), len(results))
+
+
 class ExcelChecklist(XLSXParser):
     def __init__(self, *args, **kwargs):
         super(ExcelChecklist, self).__init__(*args, **kwargs)
@@ -29,17 +29,17 @@ def validate_open_answer(question, answer_value, **kwargs):
 
 
 def validate_multiple_choice_answer(question, answer_value, **kwargs):
-    from .models import QuestionChoice
-
     override_comment_requirement = kwargs.get("override_comment_requirement", False)
     comment = kwargs.get("comment", None)
+    # Filtered here rather than in the db so a prefetched question_choice costs no queries.
+    choices = list(question.question_choice.all())
     try:
-        question_choice = question.question_choice.get(choice__iexact=answer_value)
-    except QuestionChoice.DoesNotExist:
-        msg = strings.INVALID_QUESTION_CHOICE
-        raise ValidationError(
-            msg % ", ".join(list(question.question_choice.values_list("choice", flat=True)))
+        question_choice = next(
+            x for x in choices if x.choice.lower() == "{}".format(answer_value).lower()
         )
+    except StopIteration:
+        msg = strings.INVALID_QUESTION_CHOICE
+        raise ValidationError(msg % ", ".join(x.choice for x in choices))
     if question_choice.comment_required and not comment and not override_comment_requirement:
         msg = strings.QUESTION_CHOICE_REQUIRES_COMMENT
         raise ValidationError(msg)
@@ -230,5 +230,12 @@ def update_auto_accept_relationships(sender, instance, raw=None, **kwargs):
     newly_added_customer = (historical_is_customer is False) and instance.is_customer
 
     if newly_auto_added or newly_added_customer:
+        from axis.home.models import HomeVisibility
+        from axis.search.models import SearchDocument
+
         relationships = Relationship.objects.filter(company_id=instance.id, is_owned=False)
+        home_ids = HomeVisibility.objects.get_relationship_home_ids(relationships)
+        search_object_ids = SearchDocument.objects.get_relationship_object_ids(relationships)
         relationships.update(is_owned=True)
+        HomeVisibility.objects.sync(home_ids)
+        SearchDocument.objects.sync_objects(search_object_ids)
@@ -8,14 +8,17 @@
 ]
 
 
+import hashlib
+import json
 import logging
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
 from django.urls import resolve, Resolver404, NoReverseMatch, reverse_lazy, reverse
-from django.utils.functional import SimpleLazyObject
+from django.utils.functional import SimpleLazyObject, cached_property
 
 from axis.certification.models import Workflow
 from axis.company.strings import COMPANY_TYPES_PLURAL
@@ -27,6 +30,23 @@
 customer_hirl_app = apps.get_app_config("customer_hirl")
 customer_neea_app = apps.get_app_config("customer_neea")
 
+MENU_CACHE_KEY = "menu__{}_v1"
+# Everything MENU_ITEMS reads off the user
+MENU_USER_ATTRIBUTES = (
+    "pk",
+    "is_authenticated",
+    "is_superuser",
+    "is_company_admin",
+    "company_id",
+)
+MENU_COMPANY_ATTRIBUTES = (
+    "company_id",
+    "company_slug",
+    "company_name",
+    "company_type",
+    "company_is_eep_sponsor",
+)
+
 
 def server_configuration(request):
     """Return the current server configuration"""
@@ -85,6 +105,7 @@ def __init__(self, **kwgs):
         self.attrs = kwgs.pop("url_attrs", {})
         self.add_divider = kwgs.pop("add_divider", False)
         self.add_header = kwgs.pop("add_header", None)
+        self.url = kwgs.pop("url", None)
         for k, v in kwgs.items():
             setattr(self, k, v)
 
@@ -134,6 +155,8 @@ def get_url(self):
         # FIXME: make a better docstring, what makes something invalid.
         :return string
         """
+        if self.url is not None:
+            return self.url
         try:
             resolve(self.path)
         except AttributeError:
@@ -161,6 +184,41 @@ def as_dict(self):
             "add_indent": self.add_indent,
         }
 
+    def serialize(self):
+        """A picklable copy of this item with its url resolved.  The active state is left out as
+        it depends on the path being rendered."""
+        try:
+            url = str(self.get_url())
+        except (NoReverseMatch, AttributeError):
+            url = "#"
+        data = {
+            k: v
+            for k, v in self.__dict__.items()
+            if k not in ("active", "has_perms", "children", "attrs", "url")
+        }
+        data.update(
+            {
+                "title": str(getattr(self, "title", "")),
+                "path": url,
+                "url": url,
+                "url_attrs": self.attrs,
+                "has_perms": bool(self.has_perms),
+                "children": [child.serialize() for child in self.children],
+            }
+        )
+        return data
+
+    @classmethod
+    def from_serialized(cls, data, path="/"):
+        """Rebuild a serialized item, marking it active for ``path``"""
+        data = data.copy()
+        children = [cls.from_serialized(child, path=path) for child in data.pop("children", [])]
+        element = cls(children=children, **data)
+        element.active = element.url.split("?")[0] == path.split("?")[0]
+        if True in [child.active for child in children]:
+            element.active = True
+        return element
+
 
 class BaseMenuContextProcessor(object):
     """Context processor for the menu."""
@@ -175,20 +233,31 @@ def __init__(self, *args, **kwgs):
         self._domain = kwgs.get("domain", default_domain)
         self._user = kwgs.get("user", default_user)
         self._authenticated = kwgs.get("authenticated", self._user.is_authenticated)
+
+        for k, v in kwgs.items():
+            if not hasattr(self, k):
+                setattr(self, k, v)
+
+        self._menu_kwargs = kwgs
+
+    @cached_property
+    def menu(self):
+        """The menu data - only needed when the menu is actually built"""
+        return MENU_ITEMS(user=self._user, path=self._path, **self._menu_kwargs)
+
+    @cached_property
+    def _has_neea_affiliation(self):
         if (
             self._authenticated
             and self._user.company
             and self._user.company.company_type == "utility"
         ):
-            self._has_neea_affiliation = self._user.company.sponsors.filter(slug="neea").exists()
-        else:
-            self._has_neea_affiliation = False
+            return self._user.company.sponsors.filter(slug="neea").exists()
+        return False
 
-        for k, v in kwgs.items():
-            if not hasattr(self, k):
-                setattr(self, k, v)
-
-        self.menu = MENU_ITEMS(user=self._user, path=self._path, **kwgs)
+    @cached_property
+    def _workflows(self):
+        return list(Workflow.objects.filter_by_user(self._user))
 
     def get_menu_item(self, item, header=None, divider=False, indent=False, **kwgs):
         """A single menu item"""
@@ -292,7 +361,31 @@ def get_menu(self, *args, **kwgs):
         """Return the menu"""
         if not self._authenticated:
             return self.build_unauthenticated_menu(*args, **kwgs)
-        return self.build_menu(*args, **kwgs)
+        if args or kwgs:
+            return self.build_menu(*args, **kwgs)
+        return self.get_cached_menu()
+
+    def get_menu_cache_key(self):
+        """The menu only varies by the user attributes, the company attributes, the permission set
+        and the available workflows.  A change to any of them lands on a new key."""
+        fingerprint = {
+            "user": [getattr(self._user, k, None) for k in MENU_USER_ATTRIBUTES],
+            "company": [getattr(self, k, None) for k in MENU_COMPANY_ATTRIBUTES],
+            "sponsor_slugs": sorted(getattr(self, "sponsor_slugs", None) or []),
+            "permissions": sorted(getattr(self, "permissions", None) or []),
+            "workflows": sorted((x.pk, x.config_path) for x in self._workflows),
+        }
+        value = json.dumps(fingerprint, sort_keys=True, default=str)
+        return MENU_CACHE_KEY.format(hashlib.sha1(value.encode("utf-8")).hexdigest())
+
+    def get_cached_menu(self):
+        """Serve the menu structure from cache, only the active state is worked out per path"""
+        cache_key = self.get_menu_cache_key()
+        data = cache.get(cache_key)
+        if data is None:
+            data = [item.serialize() for item in self.build_menu()]
+            cache.set(cache_key, data, settings.MENU_CACHE_DURATION)
+        return [MenuObj.from_serialized(item, path=self._path) for item in data]
 
     def build_menu(self, *args, **kwgs):
         """Builde the menu"""
@@ -328,8 +421,8 @@ def _get_places_menu(self):
 
         # pylint: disable=deprecated-lambda
         vanilla_children = filter(lambda item: item.get("conditions"), children)
-        workflows = Workflow.objects.filter_by_user(self._user)
-        num_workflows = workflows.count() + (1 if vanilla_children else 0)  # Treat Home as workflow
+        workflows = self._workflows
+        num_workflows = len(workflows) + (1 if vanilla_children else 0)  # Treat Home as workflow
         for workflow in workflows:
             children.extend(
                 self._get_workflow_types(
@@ -418,8 +511,8 @@ def _get_tasks_menu(self):
 
             # pylint: disable=deprecated-lambda
             vanilla_children = filter(lambda item: item.get("conditions"), children)
-            workflows = Workflow.objects.filter_by_user(self._user)
-            num_workflows = workflows.count() + (1 if vanilla_children else 0)
+            workflows = self._workflows
+            num_workflows = len(workflows) + (1 if vanilla_children else 0)
             for workflow in workflows:
                 children.extend(
                     self._get_workflow_types(
@@ -0,0 +1,104 @@
+"""test_context_processors.py: Django core"""
+
+import logging
+import pickle
+
+from django.test import SimpleTestCase, override_settings
+
+from .testcases import AxisTestCase
+from ..context_processors import BootstrapMenuContextProcessor, MenuObj
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:10"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class MenuSerializationTests(SimpleTestCase):
+    def get_menu(self):
+        children = [
+            MenuObj(title="Homes", path="/homes/", has_perms=True, add_indent=False),
+            MenuObj(
+                title="Docs",
+                path="https://example.com/docs",
+                has_perms=True,
+                add_indent=True,
+                add_divider=True,
+                url_attrs={"target": "_blank"},
+            ),
+        ]
+        return MenuObj(title="Places", has_perms=True, add_indent=False, children=children)
+
+    def test_round_trip(self):
+        """The cached structure survives pickling and rebuilds the same items"""
+        data = pickle.loads(pickle.dumps(self.get_menu().serialize()))
+        menu = MenuObj.from_serialized(data, path="/")
+
+        self.assertEqual(menu.title, "Places")
+        self.assertEqual(menu.get_url(), "#")
+        self.assertEqual([x.title for x in menu.children], ["Homes", "Docs"])
+        self.assertEqual(
+            [x.get_url() for x in menu.children], ["/homes/", "https://example.com/docs"]
+        )
+        self.assertEqual(menu.children[1].url_attrs(), "target=_blank")
+        self.assertTrue(menu.children[1].add_divider)
+        self.assertTrue(menu.children[1].add_indent)
+        self.assertEqual(menu.as_dict()["children"][0]["url"], "/homes/")
+
+    def test_active_follows_path(self):
+        """Active state is not cached, it is worked out for each path"""
+        data = self.get_menu().serialize()
+
+        menu = MenuObj.from_serialized(data, path="/homes/?page=2")
+        self.assertTrue(menu.active)
+        self.assertEqual([x.active for x in menu.children], [True, False])
+
+        menu = MenuObj.from_serialized(data, path="/subdivisions/")
+        self.assertFalse(menu.active)
+        self.assertEqual([x.active for x in menu.children], [False, False])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class MenuCacheTests(AxisTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from axis.core.tests.factories import rater_user_factory
+
+        cls.user = rater_user_factory()
+
+    def get_processor(self):
+        company = self.user.company
+        return BootstrapMenuContextProcessor(
+            user=self.user,
+            path="/",
+            company_id=company.id,
+            company_slug=company.slug,
+            company_name=company.name,
+            company_type=company.company_type,
+            company_is_eep_sponsor=company.is_eep_sponsor,
+            sponsor_slugs=[],
+            permissions=[],
+        )
+
+    def get_titles(self, items):
+        titles = set()
+        for item in items:
+            titles.add(item.title)
+            titles |= self.get_titles(item.children)
+        return titles
+
+    def test_company_admin(self):
+        """Becoming a company admin adds to the menu, so it can't be served the cached one"""
+        self.user.is_company_admin = False
+        processor = self.get_processor()
+        cache_key = processor.get_menu_cache_key()
+        self.assertNotIn("Scheduling", self.get_titles(processor.get_menu()))
+
+        self.user.is_company_admin = True
+        processor = self.get_processor()
+        self.assertNotEqual(processor.get_menu_cache_key(), cache_key)
+        self.assertIn("Scheduling", self.get_titles(processor.get_menu()))
@@ -48,6 +48,7 @@
 from axis.home.models import Home, EEPProgramHomeStatus
 from axis.invoicing.models import Invoice
 from axis.sampleset.models import SampleSet
+from axis.search.models import SearchDocument
 from axis.subdivision.models import Subdivision
 from .generic import LegacyAxisDatatableView
 from .machineries import (
@@ -72,6 +73,7 @@
 log = logging.getLogger(__name__)
 customer_hirl_app = apps.get_app_config("customer_hirl")
 user_management_app = apps.get_app_config("user_management")
+search_app = apps.get_app_config("search")
 
 
 class AjaxLoginView(FormView):
@@ -610,6 +612,15 @@ class SearchListView(LoginRequiredMixin, TemplateView):
 
     template_name = "core/search_results.html"
 
+    # These come out of the search index in one pass instead of a filter_by_user() per model
+    indexed_types = {
+        "company": Company,
+        "community": Community,
+        "subdivision": Subdivision,
+        "floorplan": Floorplan,
+        "home": Home,
+    }
+
     def get(self, context, **kwargs):
         if "q" not in self.request.GET:
             messages.warning(self.request, "You must input something to search on.")
@@ -690,6 +701,7 @@ def get_queryset(self):
         data = []
         full_query = search_query + " " + filter_query
         terms = set(full_query.split())
+        self.search_index_ids = self.get_search_index_ids(valid_types, full_query)
         for valid_type in valid_types:
             f = getattr(self, "get_{}_values".format(valid_type))
             data.extend(
@@ -715,6 +727,20 @@ def get_queryset(self):
 
         return data
 
+    def get_search_index_ids(self, valid_types, full_query):
+        """{model: [id, ...]} for every indexed type being searched.  Subdivisions are indexed
+        with their community name, so the "X at Y" format only needs the separator dropped."""
+        if not search_app.USE_INDEX:
+            return {}
+
+        models = [model for name, model in self.indexed_types.items() if name in valid_types]
+        if not models:
+            return {}
+
+        terms = re.sub(r"\sat\s|\s?@\s?", " ", full_query).split()
+        results = SearchDocument.objects.search(self.request.user, terms, models=models)
+        return {model: results.get(model, []) for model in models}
+
     def build_results(self, object_list, **kwargs):
         return [self.build_result(obj, **kwargs) for obj in object_list]
 
@@ -762,6 +788,11 @@ def _get_values(
         :param kwargs: extra params for build_results
         :return: list
         """
+        search_index_ids = getattr(self, "search_index_ids", {})
+        if model in search_index_ids:
+            queryset = model.objects.filter(id__in=search_index_ids[model])
+            return self.build_results(queryset, **kwargs)
+
         queryset = model.objects.filter_by_user(self.request.user)
 
         if terms:
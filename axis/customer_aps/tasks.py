@@ -430,23 +430,25 @@ def update_metersets_task():
     start_time = time.time()
     from axis.incentive_payment.models import IncentivePaymentStatus
     from axis.home.models import Home
-    from axis.customer_aps.utils import APSAutoMatcher
+    from axis.customer_aps.utils import APSAddressIndex, APSAutoMatcher
 
     _ipp = IncentivePaymentStatus.objects.filter(
         home_status__home__apshome__isnull=True, home_status__eep_program__owner__slug="aps"
     )
     home_ids = _ipp.exclude(state="complete").values_list("home_status__home_id", flat=True)
-    homes = Home.objects.filter(id__in=home_ids)
+    homes = Home.objects.filter(id__in=home_ids).select_related("geocode_response__geocode")
     matches = []
 
+    # Matched APS homes are dropped from the index, so nothing needs excluding per home
+    address_index = APSAddressIndex()
     for home in homes:
-        exclude_ids = [x[1].id for x in matches]
-        auto = APSAutoMatcher(axis_home=home, show_detail=False)
+        auto = APSAutoMatcher(axis_home=home, show_detail=False, address_index=address_index)
         try:
-            match = auto.automatch(exclude_ids=exclude_ids)
+            match = auto.automatch()
             if not match:
                 continue
             matches.append((home, auto.aps_home, auto.match_reason, auto.issues))
+            address_index.discard(auto.aps_home.id)
             auto.update()
             auto.align()
         except (ObjectDoesNotExist, MultipleObjectsReturned):
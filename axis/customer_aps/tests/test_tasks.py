@@ -5,7 +5,9 @@
 from axis.customer_aps.tests.factories import apshome_factory
 from axis.home.models import Home, EEPProgramHomeStatus
 from .mixins import CustomerAPS2019ModelTestMixin
+from ..models import APSHome
 from ..tasks import update_metersets_task
+from ..utils import APSAddressIndex
 
 
 __author__ = "Artem Hruzd"
@@ -42,3 +44,33 @@ def test_update_metersets_task(self):
         update_metersets_task()
         aps_home.refresh_from_db()
         self.assertEqual(home, aps_home.home)
+
+    def test_address_index(self):
+        """Candidates are blocked on house number, must contain the street and prefer the zip"""
+        near = apshome_factory(raw_street_line_1="4321 W. Main St, Unit 2", raw_zip="85297")
+        far = apshome_factory(raw_street_line_1="4321 W Main St", raw_zip="85001")
+        other = apshome_factory(raw_street_line_1="4322 W Main St", raw_zip="85297")
+
+        index = APSAddressIndex(APSHome.objects.filter(id__in=[near.id, far.id, other.id]))
+        self.assertEqual(index.get_candidate_ids("4321 w main st", zipcode="85297"), [near.id])
+        self.assertEqual(
+            index.get_candidate_ids("4321 W Main St", zipcode="99999"), sorted([near.id, far.id])
+        )
+        self.assertEqual(index.get_candidate_ids("9 Elm St"), [])
+        self.assertEqual(
+            index.get_candidate_ids("Elm St", raw_street_line1="4322 W. Main St"), [other.id]
+        )
+        self.assertEqual(index.get_candidate_ids("4322 W Main"), [other.id])
+
+        index.discard(near.id)
+        self.assertEqual(index.get_candidate_ids("4321 W Main St", zipcode="85297"), [far.id])
+
+    def test_address_index_without_house_number(self):
+        """APS rows which don't lead with the house number are still candidates"""
+        lot = apshome_factory(raw_street_line_1="Lot 12 4321 W Main St", raw_zip="85297")
+        numbered = apshome_factory(raw_street_line_1="4321 W Main St", raw_zip="85001")
+
+        index = APSAddressIndex(APSHome.objects.filter(id__in=[lot.id, numbered.id]))
+        self.assertEqual(index.get_candidate_ids("4321 W Main St"), sorted([lot.id, numbered.id]))
+        self.assertEqual(index.get_candidate_ids("4321 W Main St", zipcode="85297"), [lot.id])
+        self.assertEqual(index.get_candidate_ids("4322 W Main St"), [])
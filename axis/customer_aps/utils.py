@@ -77,10 +77,90 @@ def update_apshomes(lots=None):
     return confirmations
 
 
+def normalize_address(value):
+    """Lower case, punctuation folded to spaces - '123 N. Main St,' -> '123 n main st'"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", "{}".format(value or "").lower()).split())
+
+
+def _get_zip5(value):
+    return "{}".format(value or "").strip()[:5]
+
+
+class APSAddressIndex(object):
+    """
+    In memory blocking index over the unmatched APS homes.  Built with a single query and then
+    used for every Axis home in a matching run.  Rows are blocked on the leading house number;
+    rows without one are checked for every home.  Within a block a candidate has to pass the same
+    test the per home query did (street contains or equals the geocoded street) and those in the
+    home's zipcode win out over the rest.
+    """
+
+    def __init__(self, queryset=None):
+        from axis.customer_aps.models import APSHome
+
+        if queryset is None:
+            queryset = APSHome.objects.filter(home__isnull=True)
+
+        self.entries = {}
+        self.blocks = {}
+        rows = queryset.values_list("id", "raw_street_line_1", "raw_zip", "zipcode")
+        for aps_home_id, street, raw_zip, zipcode in rows:
+            normalized = normalize_address(street)
+            if not normalized:
+                continue
+            house_number = self.get_house_number(normalized)
+            self.entries[aps_home_id] = (normalized, _get_zip5(raw_zip or zipcode))
+            self.blocks.setdefault(house_number, set()).add(aps_home_id)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def get_house_number(normalized):
+        first = normalized.split(" ", 1)[0]
+        return first if first.isdigit() else None
+
+    def discard(self, aps_home_id):
+        """Take a claimed APS home out of the running"""
+        entry = self.entries.pop(aps_home_id, None)
+        if entry:
+            self.blocks.get(self.get_house_number(entry[0]), set()).discard(aps_home_id)
+
+    def get_candidate_ids(self, street_line1, raw_street_line1=None, zipcode=None):
+        """APS home ids matching the street, in id order.  Candidates aren't ranked any further,
+        ``APSAutoMatcher.queryset()`` filters on them and the match only stands if one is left."""
+        street = normalize_address(street_line1)
+        raw_street = normalize_address(raw_street_line1)
+        if not street and not raw_street:
+            return []
+
+        # A house number can sit behind a lot or unit in the rows which don't lead with one
+        block_ids = set(self.blocks.get(None, set()))
+        for value in {street, raw_street}:
+            house_number = self.get_house_number(value) if value else None
+            if house_number is None:
+                # Nothing to block on - fall back to everything we hold
+                block_ids = set(self.entries.keys())
+                break
+            block_ids |= self.blocks.get(house_number, set())
+
+        zip5 = _get_zip5(zipcode)
+        candidates, zip_matches = [], []
+        for aps_home_id in sorted(block_ids):
+            normalized, aps_zip = self.entries[aps_home_id]
+            if not ((street and street in normalized) or (raw_street and raw_street == normalized)):
+                continue
+            candidates.append(aps_home_id)
+            if zip5 and zip5 == aps_zip:
+                zip_matches.append(aps_home_id)
+        return zip_matches or candidates
+
+
 class APSAutoMatcher(object):
     def __init__(self, *args, **kwargs):
         self.axis_home = kwargs.get("axis_home", None)
         self.aps_home = kwargs.get("axis_home", None)
+        self.address_index = kwargs.get("address_index", None)
 
         self.corrected = False
         self.aligned = False
@@ -111,7 +191,16 @@ def __init__(self, *args, **kwargs):
     def queryset(self, exclude_ids):
         from axis.customer_aps.models import APSHome
 
-        if self.axis_home.geocode_response and self.axis_home.geocode_response.geocode:
+        if self.address_index is not None:
+            raw_street_line1 = None
+            if self.axis_home.geocode_response and self.axis_home.geocode_response.geocode:
+                raw_street_line1 = self.axis_home.geocode_response.geocode.raw_street_line1
+            candidate_ids = self.address_index.get_candidate_ids(
+                self.axis_home.street_line1, raw_street_line1, self.axis_home.zipcode
+            )
+            homes = APSHome.objects.filter(id__in=candidate_ids, home__isnull=True)
+            log.debug("%d APS Homes found in the address index", len(candidate_ids))
+        elif self.axis_home.geocode_response and self.axis_home.geocode_response.geocode:
             homes = APSHome.objects.filter(
                 Q(raw_street_line_1__icontains=self.axis_home.street_line1)
                 | Q(
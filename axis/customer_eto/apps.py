@@ -102,6 +102,8 @@ class CustomerETOConfig(customers.CustomerAppConfig):
     LEGACY_EPS_REPORT_CUTOFF_DATE = settings.get(
         "LEGACY_EPS_REPORT_CUTOFF_DATE", datetime.date(2022, 10, 28)
     )
+    # EPS reports rendered per parallel subtask of a bulk download
+    EPS_REPORT_BATCH_CHUNK_SIZE = settings.get("EPS_REPORT_BATCH_CHUNK_SIZE", 50)
 
     DOCUSIGN_USER_ID = "35ba1bab-9820-4674-bbb9-918a20237d2f"
     DOCUSIGN_ACCOUNT_ID = "6203629b-387c-46d2-8556-bd44c38dba0f"
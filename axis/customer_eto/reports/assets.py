@@ -0,0 +1,22 @@
+"""assets.py - Axis"""
+
+__author__ = "Steven K"
+__date__ = "10/18/26 18:30"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven K",
+]
+
+import os
+from functools import lru_cache
+
+from reportlab.lib.utils import ImageReader
+
+FILE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def get_static_image(path: str) -> ImageReader:
+    """Static report images are read and decoded once per process, then shared by every report
+    rendered in it.  ``path`` is relative to this directory."""
+    return ImageReader(os.path.normpath(os.path.join(FILE_PATH, path)))
@@ -9,7 +9,6 @@
 
 import datetime
 import logging
-import os
 from io import BytesIO
 
 from django.contrib.auth import get_user_model
@@ -27,11 +26,11 @@
     SolarElements2022,
 )
 
+from .assets import get_static_image
+
 log = logging.getLogger(__name__)
 User = get_user_model()
 
-FILE_PATH = os.path.dirname(os.path.abspath(__file__))
-
 
 class EPSReportGenerator:
     canvas = None
@@ -54,8 +53,16 @@ class EPSReportGenerator:
     WATERMARK = HexColor("#EAEAEA")
     FOOTER_BLUE = HexColor("#3CB8CB")
 
+    _stylesheets = {}
+
     @property
     def styles(self) -> StyleSheet1:
+        """The stylesheet is only ever read from, so it is built once per process"""
+        if type(self) not in self._stylesheets:
+            self._stylesheets[type(self)] = self.get_stylesheet()
+        return self._stylesheets[type(self)]
+
+    def get_stylesheet(self) -> StyleSheet1:
         stylesheet = StyleSheet1()
 
         stylesheet.add(
@@ -167,7 +174,7 @@ def styles(self) -> StyleSheet1:
     def set_eps_logo(self) -> None:
         """Place our EPS Logo"""
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/MainLogo.png"),
+            image=get_static_image("../static/images/MainLogo.png"),
             x=self.MARGIN + 0.07 * inch,
             y=8.87 * inch,
             width=1.50 * inch,
@@ -300,7 +307,7 @@ def set_your_home(
 
     def set_qr_code(self) -> None:
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/ETOQR.png"),
+            image=get_static_image("../static/images/ETOQR.png"),
             x=self.MARGIN,
             y=2.95 * inch,
             width=0.75 * inch,
@@ -405,7 +412,7 @@ def set_estimated_costs(
 
     def add_checkmark(self, x, y):
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/EPS_Checkbox.png"),
+            image=get_static_image("../static/images/EPS_Checkbox.png"),
             x=x,
             y=y,
             width=38 * 0.28,
@@ -530,7 +537,7 @@ def set_energy_score(
 
         # Slider on right
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/EPS_2022_ESCORE.png"),
+            image=get_static_image("../static/images/EPS_2022_ESCORE.png"),
             x=6.64 * inch,
             y=3.86 * inch,
             width=334 * 0.28,
@@ -541,7 +548,7 @@ def set_energy_score(
 
         # Home
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/EPS_2022_HOME.png"),
+            image=get_static_image("../static/images/EPS_2022_HOME.png"),
             x=5.5 * inch,
             y=6.63 * inch,
             width=244 * 0.28,
@@ -685,7 +692,7 @@ def set_additional_features(
 
     def set_eto_logo(self) -> None:
         self.canvas.drawImage(
-            image=os.path.join(FILE_PATH, "../static/images/BottomLogo.png"),
+            image=get_static_image("../static/images/BottomLogo.png"),
             x=6.55 * inch,
             y=1.4 * inch,
             width=1.4 * inch,
@@ -3,7 +3,6 @@
 # TODO: fix sizing for half bold info text under scales.
 # TODO: better place text related to dynamic arrows to allow for more space underneath.
 import logging
-import os
 import re
 
 from django.core.exceptions import ObjectDoesNotExist
@@ -24,6 +23,8 @@
 from axis.home.models import EEPProgramHomeStatus
 from simulation.enumerations import FuelType
 
+from .assets import get_static_image
+
 __author__ = "Michael Jeffrey"
 __date__ = "5/27/13 10:29 AM"
 __copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
@@ -795,9 +796,8 @@ def _shape_block_arrow(
         self._draw_centered_text(x, text_y, text_font, text_size, text, color=Color(1, 1, 1))
 
     def _static_images(self, path, x, y, width, height, **kwargs):
-        image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
         self.canvas.drawImage(
-            image_path,
+            get_static_image(path),
             self._x(x * inch),
             self._y(y * inch),
             width=width * inch,
@@ -6,7 +6,7 @@
 ]
 
 from .docusign import poll_building_permits_docusign, poll_certificates_of_occupancy_docusign
-from .eps import eps_report_task
+from .eps import eps_report_task, eps_report_chunk_task, eps_report_archive_task
 from .fasttrack import submit_fasttrack_xml
 from .washington_code_credit import WashingtonCodeCreditUploadTask
 from .legacy import audit_relationships
@@ -7,45 +7,51 @@
     "Steven K",
 ]
 
-import tempfile
-import zipfile
-
 from celery import shared_task
 from celery.utils.log import get_task_logger
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.core import management
-from django.core.files.base import ContentFile
 from django.core.management import CommandError
 
 from axis.core.tests.test_views import DevNull
 from axis.filehandling.log_storage import LogStorage
 from axis.filehandling.models import AsynchronousProcessedDocument
+from axis.filehandling.utils import (
+    finish_chunked_archive,
+    start_chunked_archive,
+    store_partial_archive,
+    track_chunk_progress,
+)
 
 logger = get_task_logger(__name__)
+app = apps.get_app_config("customer_eto")
+
+PARTIAL_ARCHIVE_ROOT = "customer_eto/eps_reports"
 
 
 @shared_task(bind=True, time_limit=60 * 5)
 def eps_report_task(
-    self, asynchronous_process_document_id, user_id, eep_program_home_status_ids=None
+    self,
+    asynchronous_process_document_id,
+    user_id,
+    eep_program_home_status_ids=None,
+    chunk_size=None,
 ):
     """
-    Generate report tasks
+    Generate report tasks.  The home statuses are split into chunks rendered concurrently by
+    ``eps_report_chunk_task``, and ``eps_report_archive_task`` streams the results into the
+    document zip, see ``start_chunked_archive()``.
     :param self:
     :param asynchronous_process_document_id:
     :param user_id:
     :param eep_program_home_status_ids: list of EEPProgramHomeStatus ids
+    :param chunk_size: Reports rendered per subtask
     """
     if not eep_program_home_status_ids:
         eep_program_home_status_ids = []
-
-    from axis.customer_eto.api_v3.viewsets.eps_report import get_eps_report
-
-    task_meta = {
-        "processing": {"current": 0, "total": len(eep_program_home_status_ids)},
-        "writing": {"current": 0, "total": 1},
-    }
-
-    self.update_state(state="STARTED", meta=task_meta)
+    if not chunk_size:
+        chunk_size = app.EPS_REPORT_BATCH_CHUNK_SIZE
 
     user = get_user_model().objects.get(id=user_id)
 
@@ -54,34 +60,59 @@ def eps_report_task(
     asynchronous_process_document = AsynchronousProcessedDocument.objects.get(
         id=asynchronous_process_document_id
     )
-    asynchronous_process_document.task_id = self.request.id
-    asynchronous_process_document.task_name = self.name
-    asynchronous_process_document.save()
 
-    app_log.info(
-        "{user} requested task [{task_id}]".format(
-            user=user.get_full_name(), task_id=asynchronous_process_document.task_id
-        )
+    total = len(eep_program_home_status_ids)
+    chunks = [
+        eep_program_home_status_ids[idx : idx + chunk_size] for idx in range(0, total, chunk_size)
+    ]
+
+    app_log.info(f"{user.get_full_name()} requested {total} reports in {len(chunks)} parts")
+
+    start_chunked_archive(
+        asynchronous_process_document,
+        chunks,
+        chunk_task=eps_report_chunk_task,
+        chunk_kwarg="eep_program_home_status_ids",
+        archive_task=eps_report_archive_task,
+        partial_root=PARTIAL_ARCHIVE_ROOT,
+        chunk_kwargs={"user_id": user_id},
+        archive_kwargs={"asynchronous_process_document_id": asynchronous_process_document_id},
     )
 
-    app_log.info(f"Generating {len(eep_program_home_status_ids)} reports")
-
-    with tempfile.SpooledTemporaryFile() as tmp:
-        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as archive:
-            for home_status_id in eep_program_home_status_ids:
-                stream, label = get_eps_report(home_status_id, user, return_virtual_workbook=True)
-                archive.writestr(label, stream.getvalue())
-                task_meta["processing"]["current"] += 1
-                self.update_state(state="STARTED", meta=task_meta)
-        tmp.seek(0)
-        app_log.info("Saving report")
-        filename = "Energy_Performance_Score_Reports.zip"
-        asynchronous_process_document.document.save(filename, ContentFile(tmp.read()))
-
-    app_log.info("Done")
-    task_meta["writing"]["current"] = 1
-    self.update_state(state="DONE", meta=task_meta)
-    app_log.update_model(throttle_seconds=None)
+
+@shared_task(bind=True, time_limit=60 * 30)
+def eps_report_chunk_task(
+    self, user_id, eep_program_home_status_ids, partial_name, progress_task_id, total
+):
+    """Render a chunk of EPS reports into a partial archive as each one finishes.  The report
+    images and stylesheets are loaded once per worker process and reused for every report."""
+    from axis.customer_eto.api_v3.viewsets.eps_report import get_eps_report
+
+    user = get_user_model().objects.get(id=user_id)
+
+    def render():
+        for home_status_id in eep_program_home_status_ids:
+            stream, label = get_eps_report(home_status_id, user, return_virtual_workbook=True)
+            yield label, stream
+
+            track_chunk_progress(eps_report_archive_task, progress_task_id, total)
+
+    return store_partial_archive(partial_name, render())
+
+
+@shared_task(bind=True, time_limit=60 * 30)
+def eps_report_archive_task(self, partial_names, asynchronous_process_document_id, total):
+    """Stream the partial archives into the document zip one report at a time"""
+    asynchronous_process_document = AsynchronousProcessedDocument.objects.get(
+        id=asynchronous_process_document_id
+    )
+    finish_chunked_archive(
+        self,
+        asynchronous_process_document,
+        partial_names,
+        "Energy_Performance_Score_Reports.zip",
+        total,
+    )
 
 
 @shared_task
@@ -123,6 +123,9 @@ class ProjectConfig(customers.ExtensionConfig):
 
     BUILD_TO_RENT_FEE = 125
 
+    # Bulk certificate download - certificates rendered per parallel subtask
+    BULK_CERTIFICATE_CHUNK_SIZE = 25
+
     WATER_SENSE_PROGRAM_LIST = [
         "ngbs-sf-new-construction-2020-new",
         "ngbs-mf-new-construction-2020-new",
@@ -39,4 +39,8 @@
     milestone_export_task,
 )
 from .customer_hirl_all_projects_report import customer_hirl_all_projects_report_task
-from .customer_hirl_bulk_certificate import customer_hirl_bulk_certificate_task
+from .customer_hirl_bulk_certificate import (
+    customer_hirl_bulk_certificate_task,
+    customer_hirl_bulk_certificate_chunk_task,
+    customer_hirl_bulk_certificate_archive_task,
+)
@@ -9,58 +9,83 @@
     "Steven Klass",
 ]
 
-import tempfile
-import zipfile
-
 from celery import shared_task
 from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
 
-from axis.customer_hirl.api_v3.filters import HIRLProjectFilter
 from axis.customer_hirl.reports.certificate import CustomerHIRLCertificate
 from axis.filehandling.log_storage import LogStorage
 from axis.filehandling.models import AsynchronousProcessedDocument
+from axis.filehandling.utils import (
+    finish_chunked_archive,
+    start_chunked_archive,
+    store_partial_archive,
+    track_chunk_progress,
+)
 from axis.home.api_v3.filters import EEPProgramHomeStatusFilter
 from axis.home.models import EEPProgramHomeStatus
 
 User = get_user_model()
 customer_hirl_app = apps.get_app_config("customer_hirl")
 
+PARTIAL_ARCHIVE_ROOT = "customer_hirl/bulk_certificates"
 
-@shared_task(bind=True, time_limit=60 * 60 * 3)
-def customer_hirl_bulk_certificate_task(self, user_id, result_object_id, query_params=None):
-    if not query_params:
-        query_params = {}
 
-    task_meta = {
-        "processing": {"current": 0, "total": 1},
-        "writing": {"current": 0, "total": 1},
-    }
+def get_bulk_certificate_queryset(user, query_params):
+    """Completed home statuses the user can see, narrowed down by the api filter parameters"""
+    queryset = EEPProgramHomeStatus.objects.filter_by_user(user=user).filter(
+        state=EEPProgramHomeStatus.COMPLETE_STATE
+    )
+    filter_cls = EEPProgramHomeStatusFilter(data=query_params, queryset=queryset)
+    return filter_cls.qs
 
-    certificate_limit = 100
 
-    self.update_state(state="STARTED", meta=task_meta)
+@shared_task(bind=True, time_limit=60 * 60 * 3)
+def customer_hirl_bulk_certificate_task(
+    self, user_id, result_object_id, query_params=None, chunk_size=None
+):
+    """Split the certificates into chunks rendered by parallel subtasks.  Each chunk writes a
+    partial archive and ``customer_hirl_bulk_certificate_archive_task`` merges them into the
+    document, see ``start_chunked_archive()``."""
+    if not query_params:
+        query_params = {}
+    if not chunk_size:
+        chunk_size = customer_hirl_app.BULK_CERTIFICATE_CHUNK_SIZE
 
     app_log = LogStorage(model_id=result_object_id)
 
     user = User.objects.get(id=user_id)
 
-    async_document = AsynchronousProcessedDocument.objects.get(id=result_object_id)
-    async_document.task_id = self.request.id
-    async_document.task_name = self.name
-    async_document.save()
+    home_status_ids = list(
+        get_bulk_certificate_queryset(user, query_params).values_list("id", flat=True)
+    )
+    chunks = [
+        home_status_ids[idx : idx + chunk_size]
+        for idx in range(0, len(home_status_ids), chunk_size)
+    ]
+
+    app_log.info(f"Generating {len(home_status_ids)} reports in {len(chunks)} parts")
+
+    start_chunked_archive(
+        AsynchronousProcessedDocument.objects.get(id=result_object_id),
+        chunks,
+        chunk_task=customer_hirl_bulk_certificate_chunk_task,
+        chunk_kwarg="home_status_ids",
+        archive_task=customer_hirl_bulk_certificate_archive_task,
+        partial_root=PARTIAL_ARCHIVE_ROOT,
+        chunk_kwargs={"user_id": user_id},
+        archive_kwargs={"result_object_id": result_object_id},
+    )
 
-    task_meta["processing"]["current"] = 1
-    self.update_state(state="STARTED", meta=task_meta)
 
-    queryset = EEPProgramHomeStatus.objects.filter_by_user(user=user).filter(
-        state=EEPProgramHomeStatus.COMPLETE_STATE
-    )
-    filter_cls = EEPProgramHomeStatusFilter(data=query_params, queryset=queryset)
-    queryset = filter_cls.qs
+@shared_task(bind=True, time_limit=60 * 60)
+def customer_hirl_bulk_certificate_chunk_task(
+    self, user_id, home_status_ids, partial_name, progress_task_id, total
+):
+    """Render one chunk of certificates into a partial archive and return its storage name"""
+    user = User.objects.get(id=user_id)
 
-    queryset = queryset.select_related(
+    home_statuses = EEPProgramHomeStatus.objects.select_related(
         "home",
         "eep_program",
         "customer_hirl_project",
@@ -69,26 +94,27 @@ def customer_hirl_bulk_certificate_task(self, user_id, result_object_id, query_p
         "customer_hirl_project__registration__developer_organization",
         "customer_hirl_project__registration__architect_organization",
         "customer_hirl_project__registration__community_owner_organization",
-    )[:certificate_limit]
-
-    app_log.info(f"Generating {queryset.count()} reports")
-
-    with tempfile.SpooledTemporaryFile() as tmp:
-        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as archive:
-            for home_status in queryset:
-                customer_hirl_certificate = CustomerHIRLCertificate(
-                    home_status=home_status, user=user
-                )
-                output_stream = customer_hirl_certificate.generate()
-                filename = customer_hirl_certificate.get_filename()
-                archive.writestr(filename, output_stream.getvalue())
-                task_meta["processing"]["current"] += 1
-                self.update_state(state="STARTED", meta=task_meta)
-        tmp.seek(0)
-        app_log.info("Saving report")
-        filename = "NGBS Bulk Certificate Download.zip"
-        async_document.document.save(filename, ContentFile(tmp.read()))
-
-    app_log.info("Done")
-    task_meta["writing"]["current"] = 1
-    self.update_state(state="DONE", meta=task_meta)
+    ).in_bulk(home_status_ids)
+
+    def render():
+        for home_status_id in home_status_ids:
+            home_status = home_statuses.get(home_status_id)
+            if home_status is None:
+                continue
+            customer_hirl_certificate = CustomerHIRLCertificate(home_status=home_status, user=user)
+            yield customer_hirl_certificate.get_filename(), customer_hirl_certificate.generate()
+
+            track_chunk_progress(
+                customer_hirl_bulk_certificate_archive_task, progress_task_id, total
+            )
+
+    return store_partial_archive(partial_name, render())
+
+
+@shared_task(bind=True, time_limit=60 * 60)
+def customer_hirl_bulk_certificate_archive_task(self, partial_names, result_object_id, total):
+    """Stream the partial archives into the final document one member at a time"""
+    async_document = AsynchronousProcessedDocument.objects.get(id=result_object_id)
+    finish_chunked_archive(
+        self, async_document, partial_names, "NGBS Bulk Certificate Download.zip", total
+    )
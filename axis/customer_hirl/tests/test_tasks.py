@@ -8,9 +8,143 @@
     "Steven Klass",
 ]
 
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import override_settings
 
+from axis.core.tests.testcases import AxisTestCase
+from axis.customer_hirl.tasks import (
+    customer_hirl_bulk_certificate_archive_task,
+    customer_hirl_bulk_certificate_task,
+)
+from axis.customer_hirl.tasks.customer_hirl_bulk_certificate import PARTIAL_ARCHIVE_ROOT
+from axis.filehandling.models import AsynchronousProcessedDocument
+from axis.filehandling.tasks import chunked_archive_cleanup_task
+from axis.home.models import EEPProgramHomeStatus
 
 User = get_user_model()
 customer_hirl_app = apps.get_app_config("customer_hirl")
+
+BULK_CERTIFICATE_MODULE = "axis.customer_hirl.tasks.customer_hirl_bulk_certificate"
+
+
+class FakeCertificate:
+    """Stands in for ``CustomerHIRLCertificate``, which needs a fully certified NGBS project"""
+
+    fail_for = set()
+
+    def __init__(self, home_status, user):
+        self.home_status = home_status
+
+    def get_filename(self):
+        return f"{self.home_status.id}.pdf"
+
+    def generate(self):
+        if self.home_status.id in self.fail_for:
+            raise ValueError("Unable to render certificate")
+        return io.BytesIO(str(self.home_status.id).encode("utf-8"))
+
+
+class CustomerHIRLBulkCertificateTaskTests(AxisTestCase):
+    """The certificates are rendered in chunks and merged into the document in order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from axis.core.tests.factories import provider_admin_factory
+        from axis.home.tests.factories import eep_program_home_status_factory
+
+        cls.user = provider_admin_factory()
+        cls.home_status_ids = sorted(
+            eep_program_home_status_factory(company=cls.user.company).id for _ in range(5)
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_partial_directory(self, async_document):
+        return f"{PARTIAL_ARCHIVE_ROOT}/{async_document.task_id}"
+
+    def get_partial_names(self, async_document):
+        try:
+            return default_storage.listdir(self.get_partial_directory(async_document))[1]
+        except FileNotFoundError:
+            return []
+
+    def run_task(self, home_status_ids, chunk_size=2, fail_for=()):
+        async_document = AsynchronousProcessedDocument.objects.create(
+            company=self.user.company,
+            document=None,
+            task_name=customer_hirl_bulk_certificate_task.name,
+            task_id="",
+            download=True,
+        )
+        queryset = EEPProgramHomeStatus.objects.filter(id__in=home_status_ids).order_by("id")
+        with mock.patch(
+            f"{BULK_CERTIFICATE_MODULE}.get_bulk_certificate_queryset", return_value=queryset
+        ), mock.patch(f"{BULK_CERTIFICATE_MODULE}.CustomerHIRLCertificate", FakeCertificate):
+            FakeCertificate.fail_for = set(fail_for)
+            try:
+                customer_hirl_bulk_certificate_task.delay(
+                    user_id=self.user.id, result_object_id=async_document.id, chunk_size=chunk_size
+                )
+            finally:
+                FakeCertificate.fail_for = set()
+                async_document.refresh_from_db()
+        return async_document
+
+    def test_several_chunks(self):
+        async_document = self.run_task(self.home_status_ids, chunk_size=2)
+
+        self.assertEqual(async_document.task_name, customer_hirl_bulk_certificate_archive_task.name)
+        with zipfile.ZipFile(async_document.document.file) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                [f"{home_status_id}.pdf" for home_status_id in self.home_status_ids],
+            )
+            self.assertEqual(
+                archive.read(f"{self.home_status_ids[-1]}.pdf").decode(),
+                str(self.home_status_ids[-1]),
+            )
+        self.assertEqual(self.get_partial_names(async_document), [])
+        self.assertIsNone(async_document.final_status)
+
+    def test_empty_queryset(self):
+        async_document = self.run_task([])
+
+        self.assertEqual(async_document.task_name, customer_hirl_bulk_certificate_archive_task.name)
+        with zipfile.ZipFile(async_document.document.file) as archive:
+            self.assertEqual(archive.namelist(), [])
+
+    def test_failing_chunk(self):
+        """A failing chunk leaves the earlier partials behind for the error callback to clear.
+        Eager mode raises straight out of the chord, a worker calls the callback instead."""
+        with self.assertRaises(ValueError):
+            self.run_task(self.home_status_ids, chunk_size=2, fail_for=[self.home_status_ids[3]])
+
+        async_document = AsynchronousProcessedDocument.objects.get(
+            task_name=customer_hirl_bulk_certificate_archive_task.name
+        )
+        self.assertEqual(len(self.get_partial_names(async_document)), 1)
+        self.assertFalse(async_document.document)
+
+        chunked_archive_cleanup_task(
+            result_object_id=async_document.id,
+            directory=self.get_partial_directory(async_document),
+            archive_task_id=async_document.task_id,
+        )
+
+        async_document.refresh_from_db()
+        self.assertEqual(self.get_partial_names(async_document), [])
+        self.assertEqual(async_document.final_status, "FAILURE")
+        self.assertTrue(len(async_document.result["errors"]))
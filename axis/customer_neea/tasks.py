@@ -43,7 +43,8 @@ def _export_file(report_class, prefix, result_object_id, **kwargs):
     app_log.info(msg.format(user=user, task=result_object.task_name, task_id=result_object.task_id))
 
     export = report_class(log=app_log, **kwargs)
-    new_filename = tempfile.NamedTemporaryFile(delete=True, suffix=".xlsx", prefix=prefix)
+    suffix = ".{}".format(getattr(export, "export_format", "xlsx"))
+    new_filename = tempfile.NamedTemporaryFile(delete=True, suffix=suffix, prefix=prefix)
     export.write(output=new_filename)
 
     app_log.info("New file saved %s", os.path.basename(new_filename.name))
@@ -18,6 +18,11 @@ class EkotropeConfig(technology.TechnologyAppConfig):
 
     name = "axis.ekotrope"
 
+    # Sync engine: concurrent requests per credential, pooled connections and projects per pass
+    SYNC_MAX_WORKERS = settings.get("sync_max_workers", 4)
+    SYNC_POOL_SIZE = settings.get("sync_pool_size", 8)
+    SYNC_PROJECT_CHUNK_SIZE = settings.get("sync_project_chunk_size", 10)
+
     @property
     def rater_organization_factory(self):
         return apps.get_app_config("company").rater_organization_factory
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ekotrope", "0007_alter_ekotropeauthdetails_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="data_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="houseplan",
+            name="data_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="data_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
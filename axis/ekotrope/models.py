@@ -40,6 +40,7 @@ class RemoteObject(models.Model):
     id = models.CharField(max_length=8, primary_key=True, validators=[validators.validate_id])
     name = models.CharField(max_length=500, blank=True)
     data = AxisJSONField(default=dict)
+    data_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
 
     import_failed = models.BooleanField(default=False)
     import_error = models.CharField(max_length=500, blank=True, null=True)
@@ -0,0 +1,291 @@
+"""sync.py: Ekotrope sync engine"""
+
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.utils.timezone import now
+from requests.adapters import HTTPAdapter
+from rest_framework.serializers import ValidationError
+from simulation.models import get_or_import_ekotrope_simulation
+from urllib3.util.retry import Retry
+
+from .utils import stub_project_list, store_analysis, store_houseplan, store_project
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:10"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+ekotrope_app = apps.get_app_config("ekotrope")
+
+
+class EkotropeTransportError(Exception):
+    pass
+
+
+class RequestsTransport(object):
+    """
+    HTTP transport for the sync engine.  Every credential gets one keep-alive session with a
+    connection pool sized for the engine's workers; connection failures and 429 / 5xx responses are
+    retried with backoff by the adapter.  Anything with a ``get(path, params=None)`` returning
+    ``(data, url)`` can stand in for it.
+    """
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    def __init__(self, auth_details, base_url=None, pool_size=None, retries=3, timeout=60):
+        self.auth_details = auth_details
+        self.base_url = (base_url or settings.EKOTROPE_API_ENDPOINT).rstrip("/")
+        self.pool_size = pool_size or ekotrope_app.SYNC_POOL_SIZE
+        self.retries = retries
+        self.timeout = timeout
+
+    def get_session(self):
+        key = (self.base_url, self.auth_details.username, self.auth_details.password)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET",),
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry
+                )
+                session = requests.Session()
+                session.auth = (self.auth_details.username, self.auth_details.password)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+        return session
+
+    def get(self, path, params=None):
+        url = "{}/{}".format(self.base_url, path)
+        session = self.get_session()
+        for attempt in range(1, self.retries + 1):
+            response = session.get(url, params=params, timeout=self.timeout)
+            try:
+                return response.json(), response.url
+            except ValueError:
+                if response.text == "":
+                    return None, response.url
+                log.warning(
+                    "Attempt %d Error parsing response from Ekotrope API: %s: %s",
+                    attempt,
+                    response.url,
+                    response.text,
+                )
+        raise EkotropeTransportError(
+            f"Error parsing response from Ekotrope API: {response.url}: {response.text}"
+        )
+
+
+class EkotropeSyncEngine(object):
+    """
+    Brings the projects of one credential up to date.
+
+    The project list is fetched once and compared against what we hold - only projects whose
+    ``selfOrPlanLastSavedAt`` moved (or recent ones which never imported) are fetched.  Projects,
+    houseplans and analyses for those are requested concurrently, ``max_workers`` at a time, a
+    chunk of projects at a time.  Saving happens on the calling thread and payloads whose content
+    hash did not change are not written again.
+    """
+
+    def __init__(self, auth_details, transport=None, max_workers=None, chunk_size=None):
+        self.auth_details = auth_details
+        self.transport = transport or RequestsTransport(auth_details)
+        self.max_workers = max_workers or ekotrope_app.SYNC_MAX_WORKERS
+        self.chunk_size = chunk_size or ekotrope_app.SYNC_PROJECT_CHUNK_SIZE
+
+    def fetch_project_list(self):
+        data, url = self.transport.get("projects")
+        if data is None:
+            return []
+        if isinstance(data, dict):
+            if "internalErrorCode" in data:
+                data["ekotrope_auth_id"] = self.auth_details.pk
+                msg = data.pop("message", "Ekotrope internalError")
+                message = "%r Occured for user %s (%s)" % (
+                    msg,
+                    self.auth_details.user,
+                    self.auth_details.user.company,
+                )
+                log.error(message, extra=data)
+                return []
+            return [data]
+        return data
+
+    def fetch_project(self, id):
+        return self.transport.get("projects/{}".format(id))
+
+    def fetch_houseplan(self, id):
+        return self.transport.get("houseplans/{}".format(id))
+
+    def fetch_analysis(self, id, building_type, codes_to_check=None):
+        params = {"buildingType": building_type}
+        if codes_to_check:
+            params["codesToCheck"] = codes_to_check
+        return self.transport.get("planAnalysis/{}".format(id), params=params)
+
+    def get_changed_project_ids(self, project_list, look_back_days=30):
+        """Ids out of the project listing which need to be (re-)imported"""
+        from .models import Project
+
+        look_back = now() - datetime.timedelta(days=look_back_days)
+        ids = [item["id"] for item in project_list if item.get("id")]
+        stored = {
+            project_id: (stamp, import_failed, created_date)
+            for project_id, stamp, import_failed, created_date in Project.objects.filter(
+                id__in=ids
+            ).values_list("id", "data__selfOrPlanLastSavedAt", "import_failed", "created_date")
+        }
+
+        changed = []
+        for item in project_list:
+            if not item.get("id"):
+                continue
+            if item["id"] not in stored:
+                changed.append(item["id"])
+                continue
+            stamp, import_failed, created_date = stored[item["id"]]
+            if import_failed or stamp is None:
+                # Never made it in - keep trying for a while
+                if created_date >= look_back:
+                    changed.append(item["id"])
+            elif stamp != item.get("selfOrPlanLastSavedAt"):
+                changed.append(item["id"])
+        return changed
+
+    def fetch_trees(self, project_ids, executor):
+        """Fetch everything for ``project_ids`` concurrently.  Yields
+        ``(project_id, project_response, {plan_id: (houseplan_response, analysis_responses)})``"""
+        from .validators import DEFAULT_ANALYSES
+
+        projects = {
+            project_id: executor.submit(self.fetch_project, project_id)
+            for project_id in project_ids
+        }
+
+        plans = {}
+        for project_id, future in projects.items():
+            try:
+                data, _url = future.result()
+            except (requests.RequestException, EkotropeTransportError) as err:
+                log.error("Unable to fetch Ekotrope project %s - %s", project_id, err)
+                continue
+            for plan in data.get("plans", []) if isinstance(data, dict) else []:
+                plans.setdefault(project_id, {})[plan["id"]] = (
+                    executor.submit(self.fetch_houseplan, plan["id"]),
+                    [
+                        (
+                            building_type,
+                            codes_to_check,
+                            executor.submit(
+                                self.fetch_analysis, plan["id"], building_type, codes_to_check
+                            ),
+                        )
+                        for building_type, codes_to_check in DEFAULT_ANALYSES
+                    ],
+                )
+
+        for project_id, future in projects.items():
+            try:
+                project_response = future.result()
+                plan_responses = {}
+                for plan_id, (houseplan, analyses) in plans.get(project_id, {}).items():
+                    plan_responses[plan_id] = (
+                        houseplan.result(),
+                        [
+                            (building_type, codes_to_check) + analysis.result()
+                            for building_type, codes_to_check, analysis in analyses
+                        ],
+                    )
+            except (requests.RequestException, EkotropeTransportError) as err:
+                log.error("Unable to fetch Ekotrope project tree %s - %s", project_id, err)
+                continue
+            yield project_id, project_response, plan_responses
+
+    def store_tree(self, project_id, project_response, plan_responses):
+        """Save a fetched project tree.  Returns the houseplans whose data changed."""
+        from .models import Analysis, HousePlan
+
+        project = store_project(self.auth_details, project_id, *project_response)
+        if not project:
+            return []
+
+        plan_ids = list(plan_responses.keys())
+        previous = {
+            (model, pk): data_hash
+            for model in (HousePlan, Analysis)
+            for pk, data_hash in model.objects.filter(id__in=plan_ids).values_list(
+                "id", "data_hash"
+            )
+        }
+
+        changed = []
+        for plan in project.data.get("plans", []):
+            if plan["id"] not in plan_responses:
+                continue
+            houseplan_response, analysis_responses = plan_responses[plan["id"]]
+            houseplan = store_houseplan(project, plan["id"], plan["name"], *houseplan_response)
+            if not houseplan:
+                continue
+            analysis = store_analysis(houseplan, plan["id"], plan["name"], analysis_responses)
+            if houseplan.data_hash != previous.get((HousePlan, houseplan.pk)) or (
+                analysis and analysis.data_hash != previous.get((Analysis, analysis.pk))
+            ):
+                changed.append(houseplan)
+        return changed
+
+    def sync(self, project_list=None, look_back_days=30):
+        """Bring the credential's projects up to date, returns a summary"""
+        if project_list is None:
+            project_list = self.fetch_project_list()
+        new_projects = stub_project_list(self.auth_details, data=project_list)
+
+        changed_ids = self.get_changed_project_ids(project_list, look_back_days=look_back_days)
+        result = {
+            "projects": len(project_list),
+            "new": len(new_projects),
+            "fetched": len(changed_ids),
+            "houseplans": [],
+            "simulations": [],
+        }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for idx in range(0, len(changed_ids), self.chunk_size):
+                chunk = changed_ids[idx : idx + self.chunk_size]
+                for project_id, project_response, plan_responses in self.fetch_trees(
+                    chunk, executor
+                ):
+                    for houseplan in self.store_tree(project_id, project_response, plan_responses):
+                        result["houseplans"].append(houseplan.pk)
+                        try:
+                            simulation = get_or_import_ekotrope_simulation(
+                                houseplan_id=houseplan.pk, use_tasks=False
+                            )
+                        except ValidationError as err:
+                            log.error(f"Simulation {houseplan.pk} failed - {err}")
+                            continue
+                        if simulation:
+                            result["simulations"].append(simulation.pk)
+
+        log.info(
+            "Ekotrope sync for %s: %d projects listed, %d fetched, %d houseplans changed",
+            self.auth_details.user.company,
+            result["projects"],
+            result["fetched"],
+            len(result["houseplans"]),
+        )
+        return result
@@ -1,13 +1,11 @@
-import datetime
 import time
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.db.models import F
-from django.utils.timezone import now
 from infrastructure.utils import elapsed_time
 
-from .models import EkotropeAuthDetails, Project
+from .models import EkotropeAuthDetails
 
 __author__ = "Autumn Valenta"
 __date__ = "10/31/16 09:02"
@@ -16,8 +14,6 @@
     "Steven Klass",
 ]
 
-from .utils import stub_project_list
-
 logger = get_task_logger(__name__)
 
 
@@ -64,27 +60,28 @@ def spread_credentials(company_id=None):
 
 @shared_task(time_limit=60 * 60)
 def import_projects(company_id=None):
-    """We need a reliable way to pull the data periodically. I will poll this few minutes"""
+    """We need a reliable way to pull the data periodically. I will poll this few minutes.
+
+    Each company is synced with one of its credentials; only projects which changed on the Ekotrope
+    side since we last saw them are fetched.
+    """
+    from .sync import EkotropeSyncEngine
+
     start = time.time()
     seen = []
     total = []
-    auth_details = EkotropeAuthDetails.objects.all()
-    look_back = now() - datetime.timedelta(days=30)
+    auth_details = EkotropeAuthDetails.objects.select_related("user__company")
     if company_id:
-        auth_details = EkotropeAuthDetails.objects.filter(user__company_id=company_id)
+        auth_details = auth_details.filter(user__company_id=company_id)
     for ekotrope_auth in auth_details:
         if ekotrope_auth.user.company_id in seen:
             continue
-        new_projects = stub_project_list(ekotrope_auth)
-        for project in new_projects:
-            import_project_tree.delay(ekotrope_auth.id, project["id"])
-            total.append(project["id"])
-        for project in Project.objects.filter(
-            company=ekotrope_auth.user.company, data={}, created_date__gte=look_back
-        ):
-            if project.id not in total:
-                import_project_tree.delay(ekotrope_auth.id, project.id)
-                total.append(project.id)
+        try:
+            result = EkotropeSyncEngine(ekotrope_auth).sync(look_back_days=30)
+        except Exception as err:
+            logger.error("Unable to sync Ekotrope projects for %s - %r", ekotrope_auth, err)
+        else:
+            total += result["houseplans"]
 
         seen.append(ekotrope_auth.user.company.id)
 
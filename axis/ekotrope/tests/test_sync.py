@@ -0,0 +1,128 @@
+"""test_sync.py - Axis"""
+
+import json
+import logging
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django import test
+
+from axis.core.tests.factories import rater_admin_factory
+from axis.ekotrope.models import Analysis, EkotropeAuthDetails, HousePlan, Project
+from axis.ekotrope.sync import EkotropeSyncEngine, RequestsTransport
+from .mock_responses import (
+    mocked_project_list,
+    mocked_request_analysis,
+    mocked_request_houseplan,
+    mocked_request_project,
+)
+
+log = logging.getLogger(__name__)
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:10"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+
+class StubEkotropeServer(ThreadingHTTPServer):
+    """Local stand-in for the Ekotrope API serving the mocked responses"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super(StubEkotropeServer, self).__init__(("127.0.0.1", 0), StubEkotropeHandler)
+        self.project_list = mocked_project_list(None)
+        self.requests = Counter()
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+
+class StubEkotropeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v if k == "codesToCheck" else v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        self.server.requests[parts[0]] += 1
+
+        if parts == ["projects"]:
+            data = self.server.project_list
+        elif parts[0] == "projects":
+            data, _ = mocked_request_project(None, parts[1])
+            stamps = {x["id"]: x["selfOrPlanLastSavedAt"] for x in self.server.project_list}
+            data["selfOrPlanLastSavedAt"] = stamps[parts[1]]
+        elif parts[0] == "houseplans":
+            data, _ = mocked_request_houseplan(None, parts[1])
+        else:
+            data, _ = mocked_request_analysis(
+                None,
+                parts[1],
+                building_type=params["buildingType"],
+                codes_to_check=params.get("codesToCheck"),
+            )
+
+        content = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestEkotropeSyncEngine(test.TestCase):
+    def setUp(self):
+        self.server = StubEkotropeServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        user = rater_admin_factory()
+        self.auth_details = EkotropeAuthDetails.objects.create(
+            username="axis-api", password="password", user=user
+        )
+        transport = RequestsTransport(self.auth_details, base_url=self.server.base_url)
+        self.engine = EkotropeSyncEngine(self.auth_details, transport=transport, max_workers=4)
+
+    def test_sync(self):
+        """Only projects which moved on the remote side are fetched, unchanged data isn't saved"""
+        result = self.engine.sync()
+        self.assertEqual(result["fetched"], 2)
+        self.assertEqual(len(result["houseplans"]), 2)
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(HousePlan.objects.count(), 2)
+        self.assertEqual(Analysis.objects.count(), 2)
+        self.assertEqual(self.server.requests["projects"], 3)
+        self.assertEqual(self.server.requests["houseplans"], 2)
+        self.assertEqual(self.server.requests["planAnalysis"], 64)
+        for obj in list(Project.objects.all()) + list(HousePlan.objects.all()):
+            self.assertIsNotNone(obj.data_hash)
+
+        self.server.requests.clear()
+        result = self.engine.sync()
+        self.assertEqual(result["fetched"], 0)
+        self.assertEqual(dict(self.server.requests), {"projects": 1})
+
+        # A remote save we have no changes for refetches that project but writes nothing below it
+        houseplan = HousePlan.objects.get(project_id="q2R6WDq2")
+        self.server.project_list[0]["selfOrPlanLastSavedAt"] = "2020-05-16T20:12:26.000+0000"
+        self.server.requests.clear()
+        result = self.engine.sync()
+        self.assertEqual(result["fetched"], 1)
+        self.assertEqual(result["houseplans"], [])
+        self.assertEqual(self.server.requests["houseplans"], 1)
+        self.assertEqual(
+            HousePlan.objects.get(pk=houseplan.pk).modified_date, houseplan.modified_date
+        )
+        self.assertEqual(
+            Project.objects.get(id="q2R6WDq2").data["selfOrPlanLastSavedAt"],
+            "2020-05-16T20:12:26.000+0000",
+        )
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 import sys
@@ -103,12 +104,13 @@ def request_analysis(auth_details, id, building_type="EkotropeAsModeled", codes_
     return _request_detail(auth_details, "planAnalysis", id, **data)
 
 
-def stub_project_list(auth_details):
+def stub_project_list(auth_details, data=None):
     from axis.ekotrope.models import Project
     from axis.ekotrope.serializers import ProjectStubSerializer
 
     log.info("Stubbing Ekotrope Project List")
-    data = request_project_list(auth_details)
+    if data is None:
+        data = request_project_list(auth_details)
 
     # Strip list down to only ids we don't already track (or that previously failed the import)
     existing_ids = set(Project.objects.values_list("id", flat=True))
@@ -197,6 +199,11 @@ def import_project_tree(auth_details, id, force_refresh=True):
 
 
 def import_project(auth_details, id):
+    data, request_string = request_project(auth_details, id)
+    return store_project(auth_details, id, data, request_string)
+
+
+def store_project(auth_details, id, data, request_string):
     from axis.ekotrope.models import Project
     from axis.ekotrope.serializers import ProjectSerializer
 
@@ -213,7 +220,6 @@ def import_project(auth_details, id):
         },
     )
 
-    data, request_string = request_project(auth_details, id)
     serializer = ProjectSerializer(project, data=data)
     try:
         serializer.is_valid(raise_exception=True)
@@ -233,9 +239,6 @@ def import_project(auth_details, id):
 
 
 def import_houseplan(auth_details, project, id, name, force_refresh=False):
-    from axis.ekotrope.models import HousePlan
-    from axis.ekotrope.serializers import HousePlanSerializer
-
     houseplan = project.houseplan_set.filter(id=id).first()
 
     if houseplan and houseplan.data and not houseplan.import_failed and not force_refresh:
@@ -243,6 +246,16 @@ def import_houseplan(auth_details, project, id, name, force_refresh=False):
         return houseplan
 
     data, request_string = request_houseplan(auth_details, id)
+    return store_houseplan(project, id, name, data, request_string, houseplan=houseplan)
+
+
+def store_houseplan(project, id, name, data, request_string, houseplan=None):
+    from axis.ekotrope.models import HousePlan
+    from axis.ekotrope.serializers import HousePlanSerializer
+
+    if houseplan is None:
+        houseplan = project.houseplan_set.filter(id=id).first()
+
     serializer = HousePlanSerializer(houseplan, data=data)
     try:
         serializer.is_valid(raise_exception=True)
@@ -273,8 +286,7 @@ def import_houseplan(auth_details, project, id, name, force_refresh=False):
 
 
 def import_analysis(auth_details, houseplan, id, name, force_refresh=False):
-    from axis.ekotrope.models import Analysis
-    from axis.ekotrope.serializers import AnalysisSerializer
+    from axis.ekotrope.validators import DEFAULT_ANALYSES
 
     project = houseplan.project
     analysis = project.analysis_set.filter(id=id).first()
@@ -284,19 +296,30 @@ def import_analysis(auth_details, houseplan, id, name, force_refresh=False):
             log.info("Analysis %r already imported.", id)
             return analysis
 
-    results = None
+    def responses():
+        for building_type, codes_to_check in DEFAULT_ANALYSES:
+            data, request_string = request_analysis(
+                auth_details, id, building_type=building_type, codes_to_check=codes_to_check
+            )
+            yield building_type, codes_to_check, data, request_string
+            time.sleep(0.1)
 
-    from axis.ekotrope.validators import DEFAULT_ANALYSES
+    return store_analysis(houseplan, id, name, responses(), analysis=analysis)
 
-    for building_type, codes_to_check in DEFAULT_ANALYSES:
-        data, request_string = request_analysis(
-            auth_details, id, building_type=building_type, codes_to_check=codes_to_check
-        )
 
-        # with open('/tmp/analysis_%s.json' % building_type, 'w') as fh:
-        #     print("Writing to /tmp/%s.json" % building_type)
-        #     fh.write(json.dumps(data, indent=4))
+def store_analysis(houseplan, id, name, responses, analysis=None):
+    """``responses`` yields ``(building_type, codes_to_check, data, request_string)`` for each of
+    the DEFAULT_ANALYSES; it is consumed lazily so a failed as-modeled analysis stops the rest."""
+    from axis.ekotrope.models import Analysis
+    from axis.ekotrope.serializers import AnalysisSerializer
+
+    project = houseplan.project
+    if analysis is None:
+        analysis = project.analysis_set.filter(id=id).first()
+    existing = analysis
 
+    results = None
+    for building_type, codes_to_check, data, request_string in responses:
         serializer = AnalysisSerializer(analysis, data=data)
         try:
             serializer.is_valid(raise_exception=True)
@@ -330,12 +353,12 @@ def import_analysis(auth_details, houseplan, id, name, force_refresh=False):
             if "building_types" not in results:
                 results["building_types"] = {}
             results["building_types"][building_type] = data
-        time.sleep(0.1)
 
     # One last check - race condition
-    final = Analysis.objects.filter(id=id, project=project, houseplan=houseplan).last()
-    if final:
-        return final
+    if existing is None:
+        final = Analysis.objects.filter(id=id, project=project, houseplan=houseplan).last()
+        if final:
+            return final
 
     return _save_object(
         Analysis,
@@ -350,22 +373,40 @@ def import_analysis(auth_details, houseplan, id, name, force_refresh=False):
     )
 
 
+def get_content_hash(data):
+    """Stable digest of a json payload, used to skip saving unchanged remote data"""
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 def _save_object(model, instance, data):
+    data_hash = get_content_hash(data.get("data"))
     if instance:
+        unchanged = (
+            not instance.import_failed
+            and instance.data_hash == data_hash
+            and all(getattr(instance, k) == v for k, v in data.items() if k != "data")
+        )
+        if unchanged:
+            log.debug("%s %r is unchanged", model.__name__, instance.pk)
+            return instance
+
         for k, v in data.items():
             setattr(instance, k, v)
+        instance.data_hash = data_hash
         instance.import_failed = False
         instance.import_error = None
         instance.import_traceback = None
         instance.import_request = None
         instance.save()
     else:
-        instance = model.objects.create(**data)
+        instance = model.objects.create(data_hash=data_hash, **data)
     return instance
 
 
 def _record_import_error(e, obj):
     obj.import_failed = True
+    obj.data_hash = None
     try:
         obj.import_error = json.dumps(e)
     except TypeError:
@@ -24,7 +24,7 @@
 
 from .log_storage import LogStorage
 from .models import ResultObjectLog, AsynchronousProcessedDocument, CustomerDocument
-from .utils import get_physical_file
+from .utils import clear_chunk_progress, delete_partial_archives, get_physical_file
 
 
 logger = get_task_logger(__name__)
@@ -143,3 +143,18 @@ def download_multiple_customer_documents_task(
 
     task_meta["writing"]["current"] = 1
     self.update_state(state="DONE", meta=task_meta)
+
+
+@shared_task(time_limit=60 * 10)
+def chunked_archive_cleanup_task(result_object_id, directory, archive_task_id):
+    """Error callback of the archive task of ``start_chunked_archive()``, which is also called
+    when any chunk fails.  Removes the partial archives the chunks left behind and marks the
+    document as failed."""
+    app_log = LogStorage(model_id=result_object_id)
+
+    removed = delete_partial_archives(directory)
+    clear_chunk_progress(archive_task_id)
+
+    app_log.error(f"Unable to generate the archive, removed {removed} partial archives")
+    app_log.update_model(throttle_seconds=None)
+    AsynchronousProcessedDocument.objects.filter(id=result_object_id).update(final_status="FAILURE")
@@ -0,0 +1,121 @@
+"""test_utils.py: Django filehandling.tests"""
+
+import datetime
+import io
+import logging
+import os
+import tempfile
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+
+from ..utils import (
+    XLSXParser,
+    delete_partial_archives,
+    get_chunked_archive_meta,
+    merge_partial_archives,
+    store_partial_archive,
+)
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 16:20"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class XLSXParserTests(SimpleTestCase):
+    def setUp(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Homes"
+        sheet.append(["Upload your homes below"])
+        sheet.append([])
+        sheet.append(["Lot Number", "Street Address", None, "Certified"])
+        sheet.append(["1", " 1 Main St\xa0", "ignored", datetime.datetime(2022, 1, 2)])
+        sheet.append([2, "2 Main St", None, None])
+        sheet.append([])
+        sheet.append(["3", "Never read"])
+
+        handle, self.filename = tempfile.mkstemp(suffix=".xlsx")
+        os.close(handle)
+        workbook.save(self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_streaming_results(self):
+        xlsx = XLSXParser(filename=self.filename, uniq_header_column="lot_number")
+        xlsx.load_workbook_and_sheet()
+        try:
+            headers = xlsx.get_columns(
+                equivalence_map=(("Lot Number", "lot_number"), ("Street Address", "street"))
+            )
+            self.assertEqual(headers, ["lot_number", "street", None, "Certified"])
+            self.assertEqual(xlsx.row, 4)
+
+            results = xlsx.iter_results_dictionary(set_lower=True)
+            first = next(results)
+            self.assertEqual(first["lot_number"], "1")
+            self.assertEqual(first["street"], "1 Main St")
+            self.assertEqual(first["certified"], datetime.datetime(2022, 1, 2))
+            self.assertEqual(first["row_number"], 4)
+
+            remaining = list(results)
+            self.assertEqual(len(remaining), 1)
+            self.assertEqual(remaining[0]["lot_number"], 2)
+            self.assertEqual(remaining[0]["row_number"], 5)
+
+            self.assertEqual(xlsx.get_results_dictionary_list(set_lower=True), [first] + remaining)
+        finally:
+            xlsx.close()
+
+
+class ZipArchiveTests(SimpleTestCase):
+    def test_merge_partial_archives(self):
+        """Members come out in partial order and the partials are removed"""
+        partial_names = [
+            store_partial_archive(
+                "test_zip_archives/{}.zip".format(idx),
+                (("{}-{}.pdf".format(idx, x), io.BytesIO(b"%d" % x)) for x in range(3)),
+            )
+            for idx in range(2)
+        ]
+
+        with tempfile.TemporaryFile() as tmp:
+            merge_partial_archives(partial_names, tmp)
+            tmp.seek(0)
+            with zipfile.ZipFile(tmp) as archive:
+                self.assertEqual(
+                    archive.namelist(),
+                    ["0-0.pdf", "0-1.pdf", "0-2.pdf", "1-0.pdf", "1-1.pdf", "1-2.pdf"],
+                )
+                self.assertEqual(archive.read("1-2.pdf"), b"2")
+
+        for partial_name in partial_names:
+            self.assertFalse(default_storage.exists(partial_name))
+
+    def test_delete_partial_archives(self):
+        """Leftover partials of an abandoned archive are removed, a missing directory is fine"""
+        for idx in range(2):
+            store_partial_archive(
+                "test_delete_partial_archives/{}.zip".format(idx),
+                [("{}.pdf".format(idx), io.BytesIO(b"%d" % idx))],
+            )
+
+        self.assertEqual(delete_partial_archives("test_delete_partial_archives"), 2)
+        self.assertEqual(default_storage.listdir("test_delete_partial_archives")[1], [])
+        self.assertEqual(delete_partial_archives("test_delete_partial_archives_missing"), 0)
+
+    def test_get_chunked_archive_meta(self):
+        """An empty archive still reports a total the progress bars can divide by"""
+        self.assertEqual(
+            get_chunked_archive_meta(0),
+            {"processing": {"current": 0, "total": 1}, "writing": {"current": 0, "total": 1}},
+        )
+        self.assertEqual(get_chunked_archive_meta(5, 3)["processing"], {"current": 3, "total": 5})
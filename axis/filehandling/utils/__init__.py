@@ -12,3 +12,11 @@
 from .populate_template_pdf import populate_template_pdf
 from .render_customer_document_from_template import render_customer_document_from_template
 from .store_document_to_model_instance import store_document_to_model_instance
+from .zip_archives import delete_partial_archives, merge_partial_archives, store_partial_archive
+from .chunked_archives import (
+    clear_chunk_progress,
+    finish_chunked_archive,
+    get_chunked_archive_meta,
+    start_chunked_archive,
+    track_chunk_progress,
+)
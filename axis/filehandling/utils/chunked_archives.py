@@ -0,0 +1,141 @@
+"""chunked_archives.py - Axis"""
+
+import tempfile
+
+from celery import chord, group, uuid
+from django.core.cache import cache
+from django.core.files import File
+
+from ..log_storage import LogStorage
+from .zip_archives import merge_partial_archives
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 22:10"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+PROGRESS_TIMEOUT = 60 * 60 * 6
+
+
+def get_chunked_archive_meta(total, processed=0, written=0):
+    """The task meta the progress bars of an ``AsynchronousProcessedDocument`` read"""
+    return {
+        "processing": {"current": processed, "total": max(total, 1)},
+        "writing": {"current": written, "total": 1},
+    }
+
+
+def _progress_key(archive_task_id):
+    return f"chunked_archive_progress_{archive_task_id}"
+
+
+def start_chunked_archive(
+    async_document,
+    chunks,
+    chunk_task,
+    chunk_kwarg,
+    archive_task,
+    partial_root,
+    chunk_kwargs=None,
+    archive_kwargs=None,
+):
+    """
+    Render ``chunks`` in parallel and merge what they render into ``async_document``.
+
+    Each chunk runs ``chunk_task`` with the chunk as ``chunk_kwarg`` along with ``partial_name``,
+    ``progress_task_id`` and ``total``.  It stores a partial archive under ``partial_name`` and
+    calls ``track_chunk_progress()`` per member.  ``archive_task`` gets the partial names and
+    ``total`` and should hand them to ``finish_chunked_archive()``.
+
+    The document follows the archive task, which is also where the chunks report progress.  If
+    anything fails ``chunked_archive_cleanup_task`` removes the partial archives and fails the
+    document.
+    :param async_document: AsynchronousProcessedDocument the archive is saved to
+    :param chunks: lists of the ids each chunk renders
+    :param partial_root: storage directory the partial archives are kept in
+    :param chunk_kwargs: other arguments of every chunk task
+    :param archive_kwargs: other arguments of the archive task
+    :return: the archive task id
+    """
+    from ..tasks import chunked_archive_cleanup_task
+
+    archive_task_id = uuid()
+    async_document.task_id = archive_task_id
+    async_document.task_name = archive_task.name
+    async_document.save()
+
+    total = sum(len(chunk) for chunk in chunks)
+    cache.set(_progress_key(archive_task_id), 0, timeout=PROGRESS_TIMEOUT)
+    archive_task.update_state(
+        task_id=archive_task_id, state="STARTED", meta=get_chunked_archive_meta(total)
+    )
+
+    directory = f"{partial_root}/{archive_task_id}"
+    archive_signature = archive_task.s(total=total, **(archive_kwargs or {})).set(
+        task_id=archive_task_id
+    )
+    archive_signature.link_error(
+        chunked_archive_cleanup_task.si(
+            result_object_id=async_document.id,
+            directory=directory,
+            archive_task_id=archive_task_id,
+        )
+    )
+
+    if not chunks:
+        archive_signature.apply_async(args=([],))
+        return archive_task_id
+
+    chord(
+        group(
+            chunk_task.si(
+                partial_name=f"{directory}/{index:05d}.zip",
+                progress_task_id=archive_task_id,
+                total=total,
+                **{chunk_kwarg: chunk},
+                **(chunk_kwargs or {}),
+            )
+            for index, chunk in enumerate(chunks)
+        )
+    )(archive_signature)
+    return archive_task_id
+
+
+def track_chunk_progress(archive_task, archive_task_id, total):
+    """Count one more rendered member towards the progress of the archive task"""
+    try:
+        processed = cache.incr(_progress_key(archive_task_id))
+    except ValueError:
+        # Progress is informational, don't fail a chunk because the counter expired
+        processed = 0
+    archive_task.update_state(
+        task_id=archive_task_id,
+        state="STARTED",
+        meta=get_chunked_archive_meta(total, processed=processed),
+    )
+
+
+def finish_chunked_archive(archive_task, async_document, partial_names, filename, total):
+    """Stream the partial archives into the document as ``filename`` one member at a time and
+    report the archive task done."""
+    app_log = LogStorage(model_id=async_document.id)
+
+    archive_task.update_state(state="STARTED", meta=get_chunked_archive_meta(total, total))
+
+    with tempfile.TemporaryFile() as tmp:
+        merge_partial_archives(partial_names, tmp)
+        tmp.seek(0)
+        app_log.info("Saving report")
+        async_document.document.save(filename, File(tmp))
+
+    clear_chunk_progress(archive_task.request.id)
+    app_log.info("Done")
+    archive_task.update_state(state="DONE", meta=get_chunked_archive_meta(total, total, 1))
+    app_log.update_model(throttle_seconds=None)
+
+
+def clear_chunk_progress(archive_task_id):
+    """Drop the progress counter once the archive is built or abandoned"""
+    cache.delete(_progress_key(archive_task_id))
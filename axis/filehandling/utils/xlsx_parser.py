@@ -43,19 +43,11 @@ def load_workbook_and_sheet(self, sheet_name=None, data_only=True, read_only=Tru
         else:
             data_sheets = []
             for sheet in self.workbook.sheetnames:
-                data_found = False
-                sheet_obj = self.workbook[sheet]
-                for row in range(1, 40):
-                    if data_found:
+                for value in self.iter_values(self.workbook[sheet], max_row=39, max_col=19):
+                    if value:
+                        log.debug("Cell '%s' ans data", value)
+                        data_sheets.append(sheet)
                         break
-                    for col in range(1, 20):
-                        cell_name = "{}{}".format(get_column_letter(col), row)
-                        cell = sheet_obj[cell_name]
-                        if cell.value:
-                            log.debug("Cell '%s' ans data", cell.value)
-                            data_found = True
-                            data_sheets.append(sheet)
-                            break
             if not len(data_sheets):
                 raise AttributeError("No data found in any sheets.")
             # if len(data_sheets) > 1:
@@ -65,79 +57,67 @@ def load_workbook_and_sheet(self, sheet_name=None, data_only=True, read_only=Tru
             self.sheet = self.workbook[data_sheets[0]]
             cell = self.sheet["A1"]  # Try to get a cell
 
+    def close(self):
+        """Read only workbooks hold on to the file until they are closed"""
+        workbook = getattr(self, "workbook", None)
+        if workbook is not None:
+            workbook.close()
+
+    def iter_values(self, sheet=None, **kwargs):
+        """Every cell value, row by row"""
+        for values in (sheet or self.sheet).iter_rows(values_only=True, **kwargs):
+            for value in values:
+                yield value
+
+    def iter_rows(self, min_row=1, max_row=None):
+        """Lazily yields (row number, values) - read only sheets are parsed as they are read,
+        where looking up individual cells parses the sheet again and again."""
+        rows = self.sheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+        for row, values in enumerate(rows, start=min_row):
+            yield row, values
+
+    def _get_header(self, value, equivalence_map):
+        if equivalence_map and value.lower() in equivalence_map:
+            return equivalence_map[value.lower()]
+        return value
+
     def get_columns(self, uniq_column=None, equivalence_map=None):
         if equivalence_map:
-            equivalence_map = dict(equivalence_map)
+            equivalence_map = {"{}".format(k).lower(): v for k, v in dict(equivalence_map).items()}
         if uniq_column is not None:
             self.uniq_header_column = uniq_column
         self.column_headers = []
+        uniq_header_column = "{}".format(self.uniq_header_column).strip().lower()
         found = False
-        for row in range(1, 40):
-            cell = self.sheet["A{}".format(row)]
-            if not cell.value:
+        row = 0
+        for row, values in self.iter_rows(max_row=39):
+            if not values or not values[0]:
                 continue
-            # log.debug("{}: {}, {}".format(row, cell.value, self.uniq_header_column))
             if self.uniq_header_column is None:
                 found = True
             else:
-                _values = [
-                    self.sheet["{}{}".format(get_column_letter(col), row)] for col in range(1, 1000)
-                ]
-                values = []
-                for col, x in enumerate(_values, start=1):
-                    if x:
-                        try:
-                            values.append(x.value)
-                        except TypeError:
-                            log.warning(
-                                "Unable to figure out value for cell: {}{} on {}".format(
-                                    get_column_letter(col), row, self.filename
-                                )
-                            )
-                            values.append(None)
-                for value in values:
+                for value in values[:999]:
                     if value is None:
                         continue
                     if isinstance(value, str):
                         value = value.replace("\x00", "")
                         value = value.replace("\xa0", " ")
+                        value = self._get_header(value, equivalence_map)
 
-                    if equivalence_map and "{}".format(value).lower() in [
-                        "{}".format(x).lower() for x in equivalence_map.keys()
-                    ]:
-                        eq_keys = [x.lower() for x in equivalence_map.keys()]
-                        eq_values = [x for x in equivalence_map.values()]
-                        idx = eq_keys.index(value.lower())
-                        value = eq_values[idx]
-
-                    if (
-                        "{}".format(value).strip().lower()
-                        == "{}".format(self.uniq_header_column).strip().lower()
-                    ):
+                    if "{}".format(value).strip().lower() == uniq_header_column:
                         # log.debug("Found {} on row {}".format(self.uniq_header_column, row))
                         found = True
                         break
             if found:
                 skipped = 0
-                for col in range(1, 10000):
-                    cell = self.sheet["{}{}".format(get_column_letter(col), row)]
-                    if cell.value:
+                for col, value in enumerate(values[:9999], start=1):
+                    if value:
                         if skipped == 1:
                             log.warning(
                                 "The column prior to %s was skipped..", get_column_letter(col)
                             )
                             skipped = 0
-                        try:
-                            value = "{}".format(cell.value).strip()
-                        except UnicodeEncodeError:
-                            value = cell.value
-                        if equivalence_map and value.lower() in [
-                            x.lower() for x in equivalence_map.keys()
-                        ]:
-                            eq_keys = [x.lower() for x in equivalence_map.keys()]
-                            eq_values = [x for x in equivalence_map.values()]
-                            idx = eq_keys.index(value.lower())
-                            value = eq_values[idx]
+                        value = self._get_header("{}".format(value).strip(), equivalence_map)
                         self.column_headers.append(value)
                     else:
                         self.column_headers.append(None)
@@ -163,48 +143,38 @@ def get_columns(self, uniq_column=None, equivalence_map=None):
         self.row = row + 1
         return self.column_headers
 
-    def get_results_dictionary_list(
+    def iter_results_dictionary(
         self, set_lower=False, add_row_number=True, equivalence_map=None, as_string=False
     ):
-        """This gets the results
-
-        If an equivalence_map map is used it should be in the form of
-            equivalence_map = ((foo, target) (foo2, target))
-        This will map any found foo header to target dictname
-        """
-        # TODO: If there is no data besides the headers
+        """Streaming version of ``get_results_dictionary_list()``.  The headers are mapped once
+        and each record is yielded as soon as its row has been read, cell values keep their
+        type unless ``as_string`` is used."""
         if equivalence_map:
             equivalence_map = dict(equivalence_map)
-        results = []
-        for row in range(self.row, 10000):
-            if not self.sheet["A{}".format(row)].value and not self.sheet["B{}".format(row)].value:
+
+        columns = []
+        for col_label in self.column_headers:
+            idx = self.column_headers.index(col_label)
+            if set_lower:
+                col_label = "{}".format(col_label).lower()
+            if equivalence_map and col_label in equivalence_map.keys():
+                col_label = equivalence_map[col_label]
+            columns.append((idx, col_label))
+
+        for row, values in self.iter_rows(min_row=self.row, max_row=9999):
+            values = values or ()
+            if not any(values[:2]):
                 break
             record = {}
-            for col_label in self.column_headers:
-                col = get_column_letter(self.column_headers.index(col_label) + 1)
-                if set_lower:
-                    col_label = "{}".format(col_label).lower()
-                if equivalence_map and col_label in equivalence_map.keys():
-                    col_label = equivalence_map[col_label]
-
-                # # A way to handle https://bitbucket.org/openpyxl/openpyxl/issue/343
-                cell = self.sheet["{}{}".format(col, row)]
-                try:
-                    value = cell.value
-                except TypeError:
-                    if cell.is_date():
-                        value = None
-                    else:
-                        raise
-                else:
-                    # We want to keep values that shouldn't be strings.
-                    # But in the case we receive a unicode strings,
-                    # we want to make sure it isn't littered with control
-                    # characters that could affect queries down the line.
-                    if isinstance(value, str):
-                        value = value.translate(CTRL_CHARS)
+            for idx, col_label in columns:
+                value = values[idx] if idx < len(values) else None
+                # We want to keep values that shouldn't be strings.
+                # But in the case we receive a unicode strings,
+                # we want to make sure it isn't littered with control
+                # characters that could affect queries down the line.
+                if isinstance(value, str):
+                    value = value.translate(CTRL_CHARS)
 
-                # log.debug("Column: {:<2} Row: {:<2} Label: {:<20} Value: {}".format(col, row,  col_label[0:20],value))
                 if as_string:
                     if value:
                         value = "{}".format(value)
@@ -220,5 +190,23 @@ def get_results_dictionary_list(
                 record[col_label] = value
             if add_row_number:
                 record["row_number"] = row
-            results.append(record)
-        return results
+            yield record
+
+    def get_results_dictionary_list(
+        self, set_lower=False, add_row_number=True, equivalence_map=None, as_string=False
+    ):
+        """This gets the results
+
+        If an equivalence_map map is used it should be in the form of
+            equivalence_map = ((foo, target) (foo2, target))
+        This will map any found foo header to target dictname
+        """
+        # TODO: If there is no data besides the headers
+        return list(
+            self.iter_results_dictionary(
+                set_lower=set_lower,
+                add_row_number=add_row_number,
+                equivalence_map=equivalence_map,
+                as_string=as_string,
+            )
+        )
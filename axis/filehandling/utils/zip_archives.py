@@ -0,0 +1,55 @@
+"""zip_archives.py - Axis"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 18:20"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+
+def store_partial_archive(name, members):
+    """Write ``(filename, stream)`` pairs as they are produced into a zip saved to default storage
+    under ``name``.  Returns the stored name."""
+    with tempfile.TemporaryFile() as tmp:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as archive:
+            for filename, stream in members:
+                archive.writestr(filename, stream.getvalue())
+        tmp.seek(0)
+        return default_storage.save(name, File(tmp))
+
+
+def merge_partial_archives(partial_names, fileobj, delete=True):
+    """Stream the members of the stored partial archives, in order, into a zip on ``fileobj``.
+    Only one member is ever held in memory."""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+        for partial_name in partial_names:
+            with default_storage.open(partial_name, "rb") as partial_file:
+                with zipfile.ZipFile(partial_file) as partial:
+                    for info in partial.infolist():
+                        with partial.open(info) as source:
+                            with archive.open(info.filename, "w") as target:
+                                shutil.copyfileobj(source, target)
+            if delete:
+                default_storage.delete(partial_name)
+    return fileobj
+
+
+def delete_partial_archives(directory):
+    """Remove whatever partial archives are stored under ``directory``, for when the archive they
+    were meant for won't be built.  Returns the number removed."""
+    try:
+        _directories, filenames = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for filename in filenames:
+        default_storage.delete(os.path.join(directory, filename))
+    return len(filenames)
@@ -19,6 +19,8 @@ class GeocoderConfig(technology.TechnologyAppConfig):
     verbose_name = "Geocoder"
 
     GEOCODER_DEFAULT_TIMEOUT = 2
+    # Concurrent engine requests made by Geocode.objects.get_batch_matches()
+    GEOCODER_BATCH_MAX_WORKERS = 4
 
     # Note if you plan to add to this list you will need to run the following to seed in a number
     # of cities to our DB.  Doing this will then enable the geocoder to filter results to these
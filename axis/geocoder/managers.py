@@ -2,6 +2,7 @@
 import logging
 import re
 import string
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from difflib import SequenceMatcher
 
 from django.apps import apps
@@ -9,6 +10,7 @@
 from django.db import models
 from django.db.models import When, Case
 from django.db.models.query import QuerySet
+from django.utils.timezone import now
 
 from axis.geographic.utils.legacy import format_geographic_input
 
@@ -23,6 +25,15 @@
 
 app = apps.get_app_config("geocoder")
 
+ADDRESS_PUNCTUATION = re.compile(r"[%s]" % re.escape("""!"#$%&'()*,./:;<=>?@[]^_`{|}~"""))
+
+
+def get_address_key(raw_address, entity_type):
+    """The canonical form of a lookup, so the same address written differently is only geocoded
+    once."""
+    address = ADDRESS_PUNCTUATION.sub(" ", raw_address.lower())
+    return entity_type, " ".join(address.split())
+
 
 class GeocodeReponseMixin(object):
     def confirmed(self):
@@ -196,7 +207,8 @@ def get_queryset(self):
 
 
 class GeocodeManager(models.Manager):
-    def get_matches(self, raw_address=None, only_confirmed=True, **kwargs):
+    def get_raw_input(self, raw_address=None, **kwargs):
+        """Returns the raw address, entity type and raw parts we geocode the kwargs with"""
         if not raw_address:
             raw_address, raw_parts, entity_type = format_geographic_input(**kwargs)
         else:
@@ -205,15 +217,22 @@ def get_matches(self, raw_address=None, only_confirmed=True, **kwargs):
 
         if not raw_address or (not entity_type and kwargs.values()):
             log.error("No entity type %s  found for kwargs: %s", entity_type, kwargs)
-            return self.model.objects.none()
+            return None, None, {}
 
         # Make sure None items are made blank for db
         raw_parts = {k: (v or "") for k, v in raw_parts.items()}
-        if raw_parts["raw_county"] == "":
+        if raw_parts.get("raw_county") == "":
             raw_parts["raw_county"] = None
-        if raw_parts["raw_state"] == "":
+        if raw_parts.get("raw_state") == "":
             raw_parts["raw_state"] = None
 
+        return raw_address, entity_type, raw_parts
+
+    def get_matches(self, raw_address=None, only_confirmed=True, **kwargs):
+        raw_address, entity_type, raw_parts = self.get_raw_input(raw_address, **kwargs)
+        if raw_address is None:
+            return self.model.objects.none()
+
         geocode, created = self.get_or_create(
             raw_address=raw_address,
             entity_type=entity_type,
@@ -231,3 +250,90 @@ def get_matches(self, raw_address=None, only_confirmed=True, **kwargs):
         geocode.refresh_from_db()
 
         return geocode.get_valid_responses(only_confirmed=only_confirmed)
+
+    def get_batch_matches(self, addresses, only_confirmed=True, max_workers=None, offline=False):
+        """Bulk version of ``get_matches()``.  ``addresses`` is a list of ``get_matches()`` kwargs;
+        the valid responses for each come back in the same order.
+
+        Addresses are reduced to their canonical keys and the geocodes we already have are pulled
+        in a single query.  Only the missing or stale ones go out to the engines, concurrently on
+        at most ``max_workers`` threads.  ``offline`` answers from the bundled
+        ``sources/cached_db.db`` instead of the live engines.
+        """
+        from .engines import GEOCODER_ENGINES
+        from .tasks import fetch_responses, store_responses
+
+        GeocodeResponse = apps.get_model("geocoder", "GeocodeResponse")
+        max_workers = max_workers or app.GEOCODER_BATCH_MAX_WORKERS
+
+        keys, lookups, raw_addresses = [], {}, set()
+        for address in addresses:
+            raw_address, entity_type, raw_parts = self.get_raw_input(**address)
+            if raw_address is None:
+                keys.append(None)
+                continue
+            key = get_address_key(raw_address, entity_type)
+            keys.append(key)
+            lookups.setdefault(key, (raw_address, entity_type, raw_parts))
+            raw_addresses.add(raw_address)
+
+        def get_geocodes(raw_addresses):
+            """Every spelling of a key can have its own geocode, the first spelling wins"""
+            found = {}
+            for geocode in self.filter(raw_address__in=raw_addresses).order_by("id"):
+                key = get_address_key(geocode.raw_address, geocode.entity_type)
+                if key not in lookups:
+                    continue
+                if key not in found or geocode.raw_address == lookups[key][0]:
+                    found[key] = geocode
+            return found
+
+        geocodes = get_geocodes(raw_addresses)
+        stale = [geocode for geocode in geocodes.values() if geocode.can_be_geocoded]
+        if stale:
+            self.filter(id__in=[geocode.id for geocode in stale]).update(modified_date=now())
+
+        # These are created without signals, the engines get asked below.
+        missing = [key for key in lookups if key not in geocodes]
+        created = []
+        if missing:
+            objects = []
+            for key in missing:
+                raw_address, entity_type, raw_parts = lookups[key]
+                geocode = self.model(
+                    raw_address=raw_address, entity_type=entity_type, immediate=True, **raw_parts
+                )
+                if not geocode.raw_country_id and geocode.raw_city:
+                    geocode.raw_country = geocode.raw_city.country
+                objects.append(geocode)
+            self.bulk_create(objects, ignore_conflicts=True)
+            created = get_geocodes([lookups[key][0] for key in missing])
+            geocodes.update(created)
+            created = list(created.values())
+
+        log.info(
+            f"Batch geocoding {len(addresses)} addresses ({len(lookups)} unique) - "
+            f"{len(lookups) - len(missing)} found, {len(stale)} stale, {len(created)} created"
+        )
+
+        jobs = [(geocode, engine) for geocode in stale + created for engine in GEOCODER_ENGINES]
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+                futures = {
+                    executor.submit(
+                        fetch_responses, geocode.raw_address, engine, offline=offline
+                    ): (geocode, engine)
+                    for geocode, engine in jobs
+                }
+                # Engine requests run concurrently, saving stays on this thread.
+                for future in as_completed(futures):
+                    geocode, engine = futures[future]
+                    store_responses(geocode.id, engine, future.result())
+
+        results = []
+        for key in keys:
+            if key is None or key not in geocodes:
+                results.append(GeocodeResponse.objects.none())
+                continue
+            results.append(geocodes[key].get_valid_responses(only_confirmed=only_confirmed))
+        return results
@@ -54,6 +54,37 @@ def get_responses(geocode_id, engine_name, **kwargs):
             log.error(msg, entity_type, raw_address, engine_name, geocode_id, err, exc_info=True)
             response = []
 
+    store_responses(geocode_id, engine_name, response)
+
+    log.debug("%s received %s geocode for %r", engine_name.capitalize(), entity_type, raw_address)
+
+
+def fetch_responses(raw_address, engine_name, offline=False, timeout=None):
+    """Asks a single engine for its places.  This stays away from the database so it can be run
+    from a thread pool; use ``store_responses`` to save the result."""
+    from django.apps import apps
+
+    from .adapters import CachedDataAdapter
+    from .engines import GEOCODER_ENGINES
+
+    kwargs = {"timeout": timeout or apps.get_app_config("geocoder").GEOCODER_DEFAULT_TIMEOUT}
+    if offline:
+        kwargs["adapter_factory"] = CachedDataAdapter
+
+    try:
+        return GEOCODER_ENGINES[engine_name](**kwargs).geocode(raw_address) or []
+    except GeocoderQueryError:
+        logger.warning("Unable to lookup up %s from %s GQueryError", raw_address, engine_name)
+    except Exception as err:
+        msg = "Unable to lookup up %s from %s %s"
+        logger.error(msg, raw_address, engine_name, err, exc_info=True)
+    return []
+
+
+def store_responses(geocode_id, engine_name, response):
+    """Save the places an engine returned"""
+    from .models import GeocodeResponse
+
     # response should be a list of json "places", see .engines.[geocoder].parse_result
     for place in response:
         try:
@@ -68,5 +99,3 @@ def get_responses(geocode_id, engine_name, **kwargs):
                 geocode_id=geocode_id, engine=engine_name, place=place
             ).values_list("id", flat=True)[1:]
             GeocodeResponse.objects.filter(id__in=list(responses_to_delete)).delete()
-
-    log.debug("%s received %s geocode for %r", engine_name.capitalize(), entity_type, raw_address)
@@ -132,6 +132,42 @@ def test_get_unconfirmed_to_confirmed_matches(self):
         self.assertEqual(Geocode.objects.count(), 1)
         self.assertEqual(GeocodeResponse.objects.count(), 4)
 
+    def test_get_batch_matches(self):
+        """Repeated addresses are geocoded once and the results line up with the input"""
+        shouting = self.base_address.copy()
+        shouting["street_line1"] = shouting["street_line1"].upper() + "."
+        addresses = [self.base_address, self.bad_address, shouting]
+
+        matches = Geocode.objects.get_batch_matches(addresses, offline=True)
+        self.assertEqual(len(matches), 3)
+        self.assertEqual(len(matches[0]), 1)
+        self.assertEqual(len(matches[1]), 0)
+        self.assertEqual(list(matches[0]), list(matches[2]))
+
+        self.assertEqual(Geocode.objects.count(), 2)
+        self.assertEqual(GeocodeResponse.objects.count(), 2 * len(GEOCODER_ENGINES.keys()))
+
+        # These are all known now, nothing more gets created
+        matches = Geocode.objects.get_batch_matches(addresses, offline=True)
+        self.assertEqual(len(matches[0]), 1)
+        self.assertEqual(Geocode.objects.count(), 2)
+        self.assertEqual(GeocodeResponse.objects.count(), 2 * len(GEOCODER_ENGINES.keys()))
+
+        # And get_matches picks up the same geocode
+        self.assertEqual(list(Geocode.objects.get_matches(**self.base_address)), list(matches[0]))
+
+    def test_get_batch_matches_other_spelling(self):
+        """A geocode stored under a later spelling of an address is found, not duplicated"""
+        shouting = self.base_address.copy()
+        shouting["street_line1"] = shouting["street_line1"].upper() + "."
+        expected = list(Geocode.objects.get_matches(**shouting))
+        self.assertEqual(Geocode.objects.count(), 1)
+
+        matches = Geocode.objects.get_batch_matches([self.base_address, shouting], offline=True)
+        self.assertEqual(list(matches[0]), expected)
+        self.assertEqual(list(matches[1]), expected)
+        self.assertEqual(Geocode.objects.count(), 1)
+
     def test_back_to_back_regeocode_denied(self):
         """This ensures that you cannot simply hit this thing over and over.  Our timeout is
         short but exists"""
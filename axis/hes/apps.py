@@ -25,6 +25,8 @@ class HESConfig(technology.TechnologyAppConfig):
     sandbox_url = "https://sandbox.hesapi.labworks.org/st_api/serve"
     URL = getattr(settings, "DOE_HES_URL", sandbox_url)
     API_KEY = getattr(settings, "DOE_HES_API_KEY")
+    # Session tokens are shared between tasks for a credential for this long (seconds)
+    SESSION_TOKEN_TIMEOUT = getattr(settings, "DOE_HES_SESSION_TOKEN_TIMEOUT", 60 * 30)
 
     EXTERNAL_ID_ANNOTATION_SLUG = "hpxml_gbr_id"
     ORIENTATION_ANNOTATION_SLUG = "home-orientation"
@@ -3,12 +3,15 @@
 
 import base64
 import datetime
+import functools
+import hashlib
 import logging
 import os
 import re
 from io import BytesIO
 
 from django.apps import apps
+from django.core.cache import cache
 
 import requests
 from lxml import etree
@@ -61,6 +64,29 @@ class DOEValidationError(Exception):
     pass
 
 
+def retry_on_expired_session(method):
+    """A shared session token can be dropped on the DOE side before our copy expires.  When a call
+    made with a cached token fails, forget the token and try once more with a fresh one."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.session_token:
+            self.get_session_token()
+        if not self.session_token_from_cache:
+            return method(self, *args, **kwargs)
+        try:
+            return method(self, *args, **kwargs)
+        except (DOEAPIError, DOEValidationError) as err:
+            if "session" not in "{}".format(err).lower():
+                raise
+            log.info("Cached DOE session token was rejected - authenticating again")
+            self.invalidate_session_token()
+            self.get_session_token()
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class DOEInterface:
     """This provides an interface to the DOE HES Calculator.
 
@@ -130,6 +156,9 @@ def __init__(self, **kwargs):
         self.dump_file = False
         self.session_token = None
         self.building_id = None
+        # Tasks share one session token per credential through the cache
+        self.shared_session = kwargs.get("shared_session", False)
+        self.session_token_from_cache = False
         self.dump_requests = kwargs.get("dump_requests")
         self.dump_responses = kwargs.get("dump_responses")
         if None in [self.username, self.password, self.api_key]:
@@ -238,12 +267,29 @@ def request_token(self, request):
         """Broke out so we can test this"""
         return self.post(self.base_url, headers=self.headers, data=request.encode("utf-8"))
 
+    @property
+    def session_cache_key(self):
+        key = "|".join([self.base_url, self.api_key, self.username])
+        return "hes_session_token_%s" % hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def invalidate_session_token(self):
+        """Forget our session token, and the shared one if that is where it came from"""
+        if self.shared_session and cache.get(self.session_cache_key) == self.session_token:
+            cache.delete(self.session_cache_key)
+        self.session_token = None
+        self.session_token_from_cache = False
+
     def get_session_token(self):
         """Authenticate and get a session token
         https://hes-documentation.labworks.org/home/api-definitions/api-methods/get_session_token
         """
         if self.session_token:
             return
+        if self.shared_session:
+            self.session_token = cache.get(self.session_cache_key)
+            if self.session_token:
+                self.session_token_from_cache = True
+                return self.session_token
         info = {"user_key": self.api_key, "user_name": self.username, "password": self.password}
         data = self.get_soap_wrapper("get_session_token", **info)
         response = self.post(self.base_url, headers=self.headers, data=data.encode("utf-8"))
@@ -255,6 +301,9 @@ def get_session_token(self):
                 err.error_string + " Username: %s Password: %s" % (self.username, self.password)
             )
         self.session_token = data["session_token"]
+        self.session_token_from_cache = False
+        if self.shared_session:
+            cache.set(self.session_cache_key, self.session_token, timeout=app.SESSION_TOKEN_TIMEOUT)
         return self.session_token
 
     def destroy_session_token(self):
@@ -271,10 +320,11 @@ def destroy_session_token(self):
             raise DOEAPIError(err.error_string)
         if data.get("result") != "OK":
             raise DOEAPIError(data.get("result"))
-        self.session_token = None
+        self.invalidate_session_token()
 
     # TODO: Type-hint `hpxml` - do we need to support all three types currently supported? Are they actually
     #  all being used? What type is being assumed when we try to call read()?
+    @retry_on_expired_session
     def submit_hpxml_inputs(self, hpxml) -> int:
         """Submit HPXML to DOE
         https://hes-documentation.labworks.org/home/api-definitions/api-methods/submit_hpxml_inputs
@@ -355,6 +405,7 @@ def retrieve_file(self, url, extension=None):
 
         return {"name": file_name, "page": page, "document": BytesIO(request.content)}
 
+    @retry_on_expired_session
     def validate_inputs(self, building_id):
         """Validate
         https://hes-documentation.labworks.org/home/api-definitions/api-methods/validate_inputs
@@ -383,6 +434,7 @@ def validate_inputs(self, building_id):
                 msg += " - %(field)s: [%(type)s] %(message)s\n" % issue
             raise DOEValidationError(msg)
 
+    @retry_on_expired_session
     def generate_label(
         self,
         building_id: int,
@@ -500,6 +552,7 @@ def _present_data(self, data):
                     pass
         return data
 
+    @retry_on_expired_session
     def retrieve_label_results(self, building_id):
         """https://hes-documentation.labworks.org/home/api-definitions/
         api-methods/retrieve_label_results"""
@@ -530,6 +583,7 @@ def retrieve_label_results(self, building_id):
             raise DOEAPIError("%s" % error)
         return self._present_data(data)
 
+    @retry_on_expired_session
     def retrieve_extended_results(self, building_id):
         """https://hes-documentation.labworks.org/home/api-definitions/
         api-methods/retrieve_extended_results"""
@@ -48,7 +48,7 @@ def generate_label(status_id: int, credential_id: int, orientation: Orientation)
                 home_pdf.delete()
         objects.delete()
 
-    doe = DOEInterface(credential_id=credential_id)
+    doe = DOEInterface(credential_id=credential_id, shared_session=True)
 
     try:
         data = doe.generate_label(hes_simulation.building_id)
@@ -27,7 +27,7 @@ def get_results(status_id, credential_id, orientation):
 
     simulation_fields = [f.name for f in hes_simulation._meta.fields if f.name not in ["id"]]
 
-    doe = DOEInterface(credential_id=credential_id)
+    doe = DOEInterface(credential_id=credential_id, shared_session=True)
     data = doe.retrieve_label_results(building_id=hes_simulation.building_id)
     save_required = False
 
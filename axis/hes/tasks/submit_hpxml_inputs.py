@@ -59,7 +59,7 @@ def submit_hpxml_inputs(
         orientation=orientation,
     )
 
-    doe = DOEInterface(credential_id=credential_id)
+    doe = DOEInterface(credential_id=credential_id, shared_session=True)
     try:
         hes_sim.building_id = doe.submit_hpxml_inputs(hpxml)
         hes_sim.status = UPLOADED
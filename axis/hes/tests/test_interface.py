@@ -43,6 +43,26 @@ def test_get_session_token_with_hes_credentials(self, _mock_post):
         doe.get_session_token()
         self.assertEqual(doe.session_token, "3pajidhl5m9n1kh9v8r8n4282d")
 
+    @mock.patch("axis.hes.hes.DOEInterface.post", side_effect=doe_mocked_soap_responses)
+    def test_shared_session_token(self, _mock_post):
+        """Interfaces for the same credential reuse the cached token until it is destroyed"""
+        creds = HESCredentialFactory()
+        doe = DOEInterface(credential_id=creds.pk, shared_session=True)
+        doe.invalidate_session_token()
+        doe.get_session_token()
+        self.assertEqual(_mock_post.call_count, 1)
+
+        other = DOEInterface(credential_id=creds.pk, shared_session=True)
+        other.get_session_token()
+        self.assertEqual(other.session_token, "3pajidhl5m9n1kh9v8r8n4282d")
+        self.assertTrue(other.session_token_from_cache)
+        self.assertEqual(_mock_post.call_count, 1)
+
+        other.destroy_session_token()
+        self.assertEqual(_mock_post.call_count, 2)
+        DOEInterface(credential_id=creds.pk, shared_session=True).get_session_token()
+        self.assertEqual(_mock_post.call_count, 3)
+
     @mock.patch("axis.hes.hes.DOEInterface.post", side_effect=doe_mocked_soap_responses)
     def test_get_session_token_fail(self, _mock_post):
         """Verify a bad password fails session"""
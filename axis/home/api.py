@@ -54,7 +54,12 @@
     HIRLInvoiceItemSerializer,
 )
 from .state_machine import HomeStatusStateMachine
-from .utils import get_required_annotations_form, get_eps_data, HomeCertification
+from .utils import (
+    get_required_annotations_form,
+    get_eps_data,
+    HomeCertification,
+    HomeStatusProgressBatch,
+)
 from ..customer_neea.rtf_calculator.calculator import NEEAV3Calculator
 from ..filehandling.models import CustomerDocument
 from ..floorplan.api_v3.serializers import FloorplanFromBlgSerializer
@@ -483,7 +488,10 @@ def progress(self, request, *args, **kwargs):
 
         return Response(
             obj.get_progress_analysis(
-                as_list=True, skip_certification_check=True, user=self.request.user
+                as_list=True,
+                skip_certification_check=True,
+                user=self.request.user,
+                use_cache=True,
             )
         )
 
@@ -497,9 +505,9 @@ def progress_multiple(self, request, *args, **kwargs):
         data = {
             "object_list": {
                 o.pk: o.get_progress_analysis(
-                    as_list=True, skip_certification_check=True, user=request.user
+                    as_list=True, skip_certification_check=True, user=request.user, use_cache=True
                 )
-                for o in objects
+                for o in HomeStatusProgressBatch(objects)
             }
         }
 
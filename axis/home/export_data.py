@@ -1,15 +1,20 @@
 """export_data.py: Django home"""
 
+import csv
 import datetime
 import inspect
+import io
 import itertools
 import logging
 import numbers
 import operator
+import pickle
 import pprint
 import re
+import tempfile
 import time
 from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from functools import partial
 from itertools import zip_longest
@@ -17,7 +22,8 @@
 from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import connections
 from django.db.models import Max, Sum, Case, When, F
 from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
@@ -28,7 +34,8 @@
 from openpyxl import Workbook
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 from openpyxl.comments import Comment
-from openpyxl.styles import Font, numbers as excel_numbers
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle, numbers as excel_numbers
 from openpyxl.utils import get_column_letter
 
 from axis.checklist.xls_checklist import XLSChecklist
@@ -42,6 +49,12 @@
 from axis.qa.models import QARequirement, QAStatus
 from axis.qa.state_machine import QAStateMachine
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 __author__ = "Steven Klass"
 __date__ = "1/23/14 9:45 AM"
 __copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
@@ -65,6 +78,64 @@
 CellObject = namedtuple(
     "CellObj", ["attr", "pretty_name", "clean_method", "section", "raw_value", "value"]
 )
+ColData = namedtuple("ColData", ["attr", "section", "pretty_name"])
+ExportSection = namedtuple("ExportSection", ["label", "step", "gatherers"])
+
+
+class MergedRow(object):
+    """Collects the raw rows gathered for a single key while merging.  Values are only cleaned
+    and laid out per column once every row for the key is in."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, result_vals):
+        self.rows.append(result_vals)
+
+    def get_cell_objects(self, prefixes, cleaners, key_idx, default_none, join_resulting_values):
+        """Lay the rows out as `CellObject`s.  ``prefixes`` are the structure tuples for each
+        column and ``cleaners`` the resolved clean methods."""
+        if len(self.rows) == 1:
+            # By far the most common case - one row for a key.
+            cells = []
+            for idx, raw_value in enumerate(self.rows[0]):
+                clean_method = cleaners[idx]
+                value = clean_method(raw_value) if clean_method else raw_value
+                if value is None:
+                    value = default_none
+                raw_values = raw_value if idx == key_idx else [raw_value]
+                cells.append(CellObject._make(prefixes[idx] + (raw_values, value)))
+            return cells
+
+        cells = []
+        for idx, raw_values in enumerate(zip(*self.rows)):
+            raw_values = list(raw_values)
+            clean_method = cleaners[idx]
+            values = [clean_method(v) for v in raw_values] if clean_method else raw_values
+            values = [v if v is not None else default_none for v in values]
+            # Handle the primary key - it should only have one..
+            if idx == key_idx:
+                assert len(set(raw_values)) == 1, "Primary Key Raw result is not unique {}".format(
+                    raw_values
+                )
+                assert len(set(values)) == 1, "Primary Key result is not unique {}".format(values)
+                raw_values, value = raw_values[0], values[0]
+            elif len(values) > 1 and join_resulting_values:
+                value = ", ".join(["{}".format(v) for v in values])
+            elif len(values) == 1:
+                value = values[0]
+            else:
+                value = default_none
+            cells.append(CellObject._make(prefixes[idx] + (raw_values, value)))
+        return cells
+
+
+# These mirror SHORT_DATE_FORMAT / SHORT_DATETIME_FORMAT for reading dates back into typed columns
+TYPED_DATE_FORMATS = ["%m/%d/%Y", "%m/%d/%y"]
+TYPED_DATETIME_FORMATS = ["%m/%d/%Y %H:%M"]
+DATE_LIKE_RE = re.compile(r"^\d{1,2}/\d{1,2}/\d{2,4}( \d{1,2}:\d{2})?$")
 
 ReportOn = {
     "status": "Energy Efficiency Programs",
@@ -161,6 +232,12 @@ def __init__(self, *args, **kwargs):
         self._data = []
         self.max_num = kwargs.get("max_num", None)
         self.reuse_storage = kwargs.get("reuse_storage", True)
+        self.chunk_size = kwargs.get("chunk_size", None)
+        self.parallel_sections = kwargs.get("parallel_sections", False)
+        self.section_workers = kwargs.get("section_workers", 4)
+        self._spool = None
+        self._spool_count = 0
+        self._pinned_report = False
 
         self.default_none = "-"
         self.default_true = "Yes"
@@ -277,6 +354,49 @@ def set_cell_datetime_value(self, cell, value, style_args):
     def set_cell_explicit_value(self, cell, value):
         cell.value = value
 
+    def set_cell_typed_value(self, cell, value):
+        """Set the value on a cell based on its type and return the style arguments for it"""
+        # PyXL gets a bit too fancy.. uuid can be interpretted as a big number.
+        comment = None
+        style_args = {}
+        if isinstance(value, tuple):
+            value, comment = value
+        if isinstance(value, float):
+            self.set_cell_float_value(cell, value, style_args)
+        elif isinstance(value, int):
+            self.set_cell_integer_value(cell, value, style_args)
+        elif isinstance(value, datetime.datetime):
+            self.set_cell_datetime_value(cell, value, style_args)
+        elif isinstance(value, datetime.date):
+            self.set_cell_date_value(cell, value, style_args)
+        elif isinstance(value, Decimal):
+            self.set_cell_decimal_value(cell, value, style_args)
+        elif isinstance(value, str):
+            # Do unicode escape for strings
+            # to avoid openpyxl.utils.exceptions.IllegalCharacterError
+            value = re.sub(ILLEGAL_CHARACTERS_RE, "", value)
+            if value.isdigit() or value.lstrip("-").isdigit():
+                self.set_cell_integer_value(cell, value, style_args)
+            elif (
+                value.replace(".", "", 1).isdigit()
+                or value.lstrip("-").replace(".", "", 1).isdigit()
+            ):
+                self.set_cell_float_value(cell, value, style_args)
+            elif value.startswith("$"):
+                self.set_cell_currency_value(cell, value, style_args)
+            elif value.endswith("%"):
+                self.set_cell_percentage_value(cell, value, style_args)
+            else:
+                self.set_cell_explicit_value(cell, value)
+
+            if comment:
+                cell.comment = Comment(comment, "Axis")
+        elif isinstance(value, Hashid):
+            self.set_cell_explicit_value(cell, str(value))
+        else:
+            cell.value = value
+        return style_args
+
     def get_formatted_datetime(self, value):
         """Return the string components - as TZ Aware issue exist when setting the format the
         writer"""
@@ -494,62 +614,38 @@ def merge_results(self, baseline_results, structure, key="id"):
               (attr, pretty_name, clean_method, section, raw_value, value=9)],
 
         """
-        # log.debug("Received {} results".format(len(baseline_results)))
+        # The key position and clean methods are resolved once for the whole section.
+        key_idx = next((idx for idx, item in enumerate(structure) if item.attr == key), None)
+        cleaners = [self.get_clean_callable(item.clean_method) for item in structure]
+
         results = OrderedDict()
         for result_vals in baseline_results:
-            # log.debug(" - Sub result conains {} entries".format(len(result_vals)))
-            # Get the index number from the structure for the index, then get the value
-            key_idx = structure.index(next((item for item in structure if item.attr == key)))
+            if key_idx is None:
+                raise ValueError("Key {!r} is not part of the structure".format(key))
             key_val = result_vals[key_idx]
-            if key_val not in results.keys():
-                # This will add two place holders for lists of values at the end.
-                results[key_val] = [list(v) + [[], []] for v in structure[:]]
-                # log.debug(" - Added new key {}".format(key_val))
-            result = results[key_val]
-
-            assert len(result_vals) == len(result), "Mismatch in the number of values vs results.."
-
-            for idx, raw_value in enumerate(result_vals):
-                clean_value = raw_value
-                result[idx][-2].append(raw_value)
-                clean_method = result[idx][2]
-                # log.debug("  - Inserting raw value {} into index {}".format(raw_value, idx))
-                if clean_method:
-                    if callable(clean_method):
-                        clean_value = clean_method(raw_value)
-                    else:
-                        clean_value = getattr(self, clean_method)(raw_value)
-                clean_value = clean_value if clean_value is not None else self.default_none
-                # if clean_value != raw_value:
-                #     log.debug("   - Adding clean value {} into index {}".format(clean_value, idx))
-                result[idx][-1].append(clean_value)
-
-        # Now though these into our final structure.
-        # log.debug("Building Final Structure")
-        for dict_key, source_result_set in results.items():
-            for idx, result in enumerate(source_result_set):
-                # Handle the primary key - it should only have one..
-                if result[0] == key:
-                    assert (
-                        len(set(result[-2])) == 1
-                    ), "Primary Key Raw result is not unique {}".format(result[-2])
-                    assert len(set(result[-1])) == 1, "Primary Key result is not unique {}".format(
-                        result[-1]
-                    )
-                    result[-2] = result[-2][0]
-                    result[-1] = result[-1][0]
-                    # log.debug(" - Trimming Primary Key - {}".format(result[-1]))
-                elif len(result[-1]) > 1 and self.join_resulting_values:
-                    result[-1] = ", ".join(["{}".format(v) for v in result[-1]])
-                    # log.debug(" - Multiple values found - {}".format(result[-1]))
-                elif len(result[-1]) == 1:
-                    result[-1] = result[-1][0]
-                    # log.debug(" - Single values found - {}".format(result[-1]))
-                else:
-                    result[-1] = self.default_none
-                    # log.debug(" - No value found - {}".format(result[-1]))
-                source_result_set[idx] = CellObject(*result)
-        return list(results.values())
+            row = results.get(key_val)
+            if row is None:
+                row = results[key_val] = MergedRow()
+
+            assert len(result_vals) == len(
+                structure
+            ), "Mismatch in the number of values vs results.."
+
+            row.add(result_vals)
+
+        prefixes = [tuple(item[:4]) for item in structure]
+        return [
+            row.get_cell_objects(
+                prefixes, cleaners, key_idx, self.default_none, self.join_resulting_values
+            )
+            for row in results.values()
+        ]
+
+    def get_clean_callable(self, clean_method):
+        """Clean methods are either callables or the name of a method on this class"""
+        if clean_method and not callable(clean_method):
+            return getattr(self, clean_method)
+        return clean_method
 
     def get_home_data(self):
         include_eto_region = (
@@ -5621,12 +5717,18 @@ def munge_data(self, result_dict, new_data, key="id", verbose=False):
             if len(new_data):
                 log.debug(pprint.pformat(new_data[-1]))
             log.debug("Result Keys: %r", list(result_dict.keys()))
-        for item in new_data:
+
+        # Sections share a layout so the key position found for one item is checked first.
+        key_idx = None
+        last_idx = len(new_data) - 1 if verbose else None
+        for idx, item in enumerate(new_data):
             if not len(item):
                 log.warning("Zero length item found..")
                 continue
-            _id = next((x for x in item if x.attr == key)).value
-            if verbose and new_data.index(item) == len(new_data) - 1:
+            if key_idx is None or key_idx >= len(item) or item[key_idx].attr != key:
+                key_idx = next((i for i, x in enumerate(item) if x.attr == key))
+            _id = item[key_idx].value
+            if verbose and idx == last_idx:
                 log.debug("ID %r", _id)
                 log.debug("Initial Length %r", len(result_dict[_id]))
 
@@ -5646,7 +5748,7 @@ def munge_data(self, result_dict, new_data, key="id", verbose=False):
 
             result_dict[_id] += item
 
-            if verbose and new_data.index(item) == len(new_data) - 1:
+            if verbose and idx == last_idx:
                 log.debug("ID %r", _id)
                 log.debug("Final Length %r", len(result_dict[_id]))
                 log.debug("Result item: %s", pprint.pformat(result_dict[_id]))
@@ -5667,181 +5769,292 @@ def get_datasets(self, report=False):
         self._dataset = list(results.values())
         return self._dataset
 
-    def build_datasets(self, report=False):
-        results = OrderedDict([(x, []) for x in self.get_queryset().values_list("id", flat=True)])
+    def gather_datasets(self, report=False):
+        """Gather all of the data, in batches if we were given a ``chunk_size``.  Pinned columns
+        leave the batches to be gathered while `iter_data` is being written."""
+        if self.has_pinned_columns:
+            self._pinned_report = report
+            return
+        if self.chunk_size:
+            return self.spool_datasets(report=report)
+        return self.get_datasets(report=report)
+
+    @property
+    def has_pinned_columns(self):
+        """Specified columns which are kept even when empty don't depend on the data, so batched
+        rows can be written as they are gathered instead of waiting on every batch."""
+        return bool(self.chunk_size and self.specified_columns and self.retain_empty)
+
+    def get_pinned_columns(self):
+        """The columns when `has_pinned_columns`, in the order they were specified"""
+        name_map = self.get_column_name_map()
+        return [
+            ColData(attr, None, name_map.get(attr, attr))
+            for attr in self.specified_columns
+            if self.show_column(attr) and (attr != "id" or self.output_ids)
+        ]
+
+    def get_home_status_id_chunks(self):
+        """Split the queryset ids into ``chunk_size`` batches, keeping the queryset order"""
+        ids = list(self.get_queryset().values_list("id", flat=True))
+        for start in range(0, len(ids), self.chunk_size):
+            yield ids[start : start + self.chunk_size]
+
+    def iter_datasets(self, report=False):
+        """Yield the gathered rows one batch of ``chunk_size`` home statuses at a time.  Every
+        section is gathered for a batch before moving on so memory follows the batch size."""
+        queryset = self.get_queryset(report=report)
+        chunks = list(self.get_home_status_id_chunks())
+        try:
+            for idx, chunk in enumerate(chunks, start=1):
+                start = time.time()
+                self._queryset = EEPProgramHomeStatus.objects.filter(id__in=chunk)
+                self.clear_queryset_caches()
+                results = self.build_datasets(report=report)
+                self.log.debug(
+                    "Gathered batch %s/%s (%s) (%.2fs)",
+                    idx,
+                    len(chunks),
+                    len(chunk),
+                    time.time() - start,
+                )
+                yield from results.values()
+        finally:
+            self._queryset = queryset
+            self.clear_queryset_caches()
+
+    def clear_queryset_caches(self):
+        """Drop any section data cached against the current queryset"""
+        if hasattr(self, "relationship_data"):
+            del self.relationship_data
+
+    def get_row_values(self, row):
+        """The ``attr: value`` pairs of a gathered row, first value wins"""
+        values = OrderedDict()
+        for coldata in row:
+            values.setdefault(coldata.attr, coldata.value)
+        return values
+
+    def spool_datasets(self, report=False):
+        """Gather the data in batches.  The columns depend on every row so the finished rows are
+        spooled to a temporary file until the columns are known and are then read back by
+        `iter_data`."""
+        if self._spool is not None:
+            return
+
+        start = time.time()
+        column_data = OrderedDict()
+        self._spool = tempfile.TemporaryFile()
+        self._spool_count = 0
+        try:
+            for row in self.iter_datasets(report=report):
+                self.update_column_data(column_data, row)
+                values = self.get_row_values(row)
+                pickle.dump(values, self._spool, protocol=pickle.HIGHEST_PROTOCOL)
+                self._spool_count += 1
+        except BaseException:
+            self.close_spool()
+            raise
+
+        self._columns = self.get_columns_from_column_data(column_data)
+        self.log.debug("All data gathered.. (%.2fs)", time.time() - start)
+        self.update_task(current=15)
+
+    def close_spool(self):
+        """Drop the spooled rows"""
+        if self._spool is not None:
+            self._spool.close()
+        self._spool = None
+        self._spool_count = 0
+
+    def get_sections(self):
+        """The sections of data to gather in column order.  Each section is a
+        `ExportSection(label, step, gatherers)` where ``gatherers`` are the data methods and the
+        keyword arguments used to munge their data."""
+        sections = []
+
+        def add_section(label, step, *gatherers):
+            gatherers = [g if isinstance(g, tuple) else (g, {}) for g in gatherers]
+            sections.append(ExportSection(label, step, gatherers))
 
         if "home" in self.report_on:
-            self.log.debug("Gathering Home data")
-            self.update_task(current=1)
-            data = self.get_home_data()
-            results = self.munge_data(results, data)
+            add_section("Home", 1, self.get_home_data)
         else:
             self.log.debug("Excluding Home data")
 
         if self.include_home_status_data:
-            data = self.get_status_data()
-            results = self.munge_data(results, data)
-
-            data = self.get_historical_certifier_data()
-            results = self.munge_data(results, data, verbose=False)
+            add_section(
+                "Home Status",
+                None,
+                self.get_status_data,
+                (self.get_historical_certifier_data, {"verbose": False}),
+            )
 
         if "subdivision" in self.report_on:
-            self.log.debug("Gathering Subdivision data")
-            self.update_task(current=2)
-            data = self.get_subdivision_data()
-            results = self.munge_data(results, data)
+            add_section("Subdivision", 2, self.get_subdivision_data)
 
             if "community" in self.report_on:
-                self.log.debug("Gathering Community data")
-                self.update_task(current=3)
-                data = self.get_community_data()
-                results = self.munge_data(results, data)
+                add_section("Community", 3, self.get_community_data)
 
             if self.include_builder_agreement_data:
-                self.log.debug("Gathering Builder Agreement data")
-                data = self.get_builder_agreement_data()
-                results = self.munge_data(results, data)
+                add_section("Builder Agreement", None, self.get_builder_agreement_data)
         else:
             self.log.debug("Excluding Subdivision / Community data")
 
         if "relationships" in self.report_on:
-            self.log.debug("Gathering Association data")
-            self.update_task(current=4)
-            data = self.get_relationships_data()
-            results = self.munge_data(results, data)
+            add_section("Association", 4, self.get_relationships_data)
         else:
             self.log.debug("Excluding Association data")
 
         if "eep_program" in self.report_on:
-            self.log.debug("Gathering Program data")
-            self.update_task(current=5)
-            data = self.get_eep_program_data()
-            results = self.munge_data(results, data)
+            add_section("Program", 5, self.get_eep_program_data)
         else:
             self.log.debug("Excluding Program data")
 
         if "ipp" in self.report_on:
-            self.log.debug("Gathering Incentive data")
-            self.update_task(current=6)
-            data = self.get_incentive_data()
-            results = self.munge_data(results, data)
+            add_section("Incentive", 6, self.get_incentive_data)
         else:
             self.log.debug("Excluding Incentive data")
 
         if "invoicing" in self.report_on:
-            self.log.debug("Gathering Invoicing data")
-            self.update_task(current=7)
-            data = self.get_invoicing_data()
-            results = self.munge_data(results, data, key="home_status_id")
+            add_section("Invoicing", 7, (self.get_invoicing_data, {"key": "home_status_id"}))
         else:
             self.log.debug("Excluding Incentive data")
 
         if "sampleset" in self.report_on:
-            self.log.debug("Gathering Sampleset data")
-            self.update_task(current=8)
-            data = self.get_sampleset_data()
-            results = self.munge_data(results, data)
+            add_section("Sampleset", 8, self.get_sampleset_data)
         else:
             self.log.debug("Excluding Sampleset data")
 
         if "annotations" in self.report_on:
-            self.log.debug("Gathering Annotation data")
-            self.update_task(current=9)
-            data = self.get_annotation_data()
-            results = self.munge_data(results, data)
+            add_section("Annotation", 9, self.get_annotation_data)
         else:
             self.log.debug("Excluding Annotation data")
 
         if "checklist_answers" in self.report_on:
-            self.log.debug("Gathering Checklist Answer data")
-            self.update_task(current=10)
-            data = self.get_collection_answer_data()
-            results = self.munge_data(results, data)
-
-            data = self.get_checklist_answer_data()
-            results = self.munge_data(results, data)
+            add_section(
+                "Checklist Answer",
+                10,
+                self.get_collection_answer_data,
+                self.get_checklist_answer_data,
+            )
         else:
             self.log.debug("Excluding Checklist Answer data")
 
         if "qa" in self.report_on:
-            self.log.debug("Gathering QA data")
-            self.update_task(current=11)
-            data = self.get_qa_data()
-            results = self.munge_data(results, data)
-
-            data = self.get_qa_cycle_time_data()
-            results = self.munge_data(results, data)
+            add_section("QA", 11, self.get_qa_data, self.get_qa_cycle_time_data)
         else:
             self.log.debug("Excluding QA data")
 
         if "customer_aps" in self.report_on:
-            self.log.debug("Gathering Customer APS data")
-            self.update_task(current=12)
-            data = self.get_customer_aps_data()
-            results = self.munge_data(results, data)
+            add_section("Customer APS", 12, self.get_customer_aps_data)
         else:
             self.log.debug("Excluding Customer APS data")
 
         if "customer_eto" in self.report_on:
-            self.log.debug("Gathering Customer ETO data")
-            self.update_task(current=13)
-            data = self.get_customer_eto_data()
-            results = self.munge_data(results, data)
-            data = self.get_customer_eto_permit_data()
-            results = self.munge_data(results, data)
+            add_section(
+                "Customer ETO",
+                13,
+                self.get_customer_eto_data,
+                self.get_customer_eto_permit_data,
+            )
         else:
             self.log.debug("Excluding Customer APS data")
 
         if "floorplan" in self.report_on:
-            self.log.debug("Gathering Floorplan data")
-            self.update_task(current=6)
-            data = self.get_floorplan_data()
-            results = self.munge_data(results, data)
+            add_section("Floorplan", 6, self.get_floorplan_data)
         else:
             self.log.debug("Excluding Floorplan data")
 
         if "simulation_basic" in self.report_on:
-            self.log.debug("Gathering Simulation Basic data")
-            self.update_task(current=14)
-            data = self.get_remrate_data()
-            results = self.munge_data(results, data)
-            data = self.get_ekotrope_data()
-            results = self.munge_data(results, data)
+            add_section(
+                "Simulation Basic",
+                14,
+                self.get_remrate_data,
+                self.get_ekotrope_data,
+            )
         elif "simulation_advanced" in self.report_on:
-            self.log.debug("Gathering Simulation Advanced data")
-            self.update_task(current=14)
-            data = self.get_remrate_data(advanced=True)
-            results = self.munge_data(results, data)
-            data = self.get_ekotrope_data(advanced=True)
-            results = self.munge_data(results, data)
+            add_section(
+                "Simulation Advanced",
+                14,
+                partial(self.get_remrate_data, advanced=True),
+                partial(self.get_ekotrope_data, advanced=True),
+            )
         else:
             self.log.debug("Excluding REM/Rate data")
             self.log.debug("Excluding Ekotrope data")
 
         if "hes_data" in self.report_on:
-            self.log.debug("Gathering HES data")
-            self.update_task(current=15)
-            data = self.get_hes_data()
-            results = self.munge_data(results, data)
+            add_section("HES", 15, self.get_hes_data)
         else:
             self.log.debug("Excluding HES data")
 
         if "neea_standard_protocol_calculator" in self.report_on:
-            self.log.debug("Gathering NEEA Standard Protocol Calculator data")
-            self.update_task(current=16)
-            data = self.get_customer_neea_standard_protocol_calculator_data()
-            results = self.munge_data(results, data)
+            add_section(
+                "NEEA Standard Protocol Calculator",
+                16,
+                self.get_customer_neea_standard_protocol_calculator_data,
+            )
         else:
             self.log.debug("Excluding NEEA Standard Protocol Calculator data")
 
         if "ngbs_data" in self.report_on:
-            self.log.debug("Gathering NGBS data")
-            self.update_task(current=17)
-            data = self.get_ngbs_data()
-            results = self.munge_data(results, data)
+            add_section("NGBS", 17, self.get_ngbs_data)
         else:
             self.log.debug("Excluding NGBS data")
 
+        return sections
+
+    def gather_section(self, section):
+        """Run each of the data methods for a section"""
+        return [method() for method, _munge_kwargs in section.gatherers]
+
+    def gather_section_in_thread(self, section):
+        """Gather a section on a pool thread.  Django gives each thread its own connection so
+        it must be closed when the thread is done with it."""
+        try:
+            return self.gather_section(section)
+        finally:
+            connections.close_all()
+
+    def prime_shared_caches(self, sections):
+        """Some data methods are shared by several sections and cache their result on the
+        exporter.  Gather those once up front so parallel sections only ever read them."""
+        labels = {section.label for section in sections}
+        if labels & {"Home Status", "Association"}:
+            self.get_relationships_data()
+
+    def build_datasets(self, report=False):
+        results = OrderedDict([(x, []) for x in self.get_queryset().values_list("id", flat=True)])
+
+        sections = self.get_sections()
+
+        if self.parallel_sections and len(sections) > 1:
+            self.prime_shared_caches(sections)
+            # The sections are independent read-only queries.  Let them all run at once and then
+            # merge them back in order so the columns are always laid out the same way.
+            self.log.debug("Gathering %d sections in parallel", len(sections))
+            max_workers = min(self.section_workers, len(sections))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self.gather_section_in_thread, section) for section in sections
+                ]
+                for section, future in zip(sections, futures):
+                    datasets = future.result()
+                    if section.step:
+                        self.update_task(current=section.step)
+                    for (_method, munge_kwargs), data in zip(section.gatherers, datasets):
+                        results = self.munge_data(results, data, **munge_kwargs)
+            return results
+
+        for section in sections:
+            self.log.debug("Gathering %s data", section.label)
+            if section.step:
+                self.update_task(current=section.step)
+            for method, munge_kwargs in section.gatherers:
+                data = method()
+                results = self.munge_data(results, data, **munge_kwargs)
+
         return results
 
     def get_columns(self):
@@ -5963,82 +6176,92 @@ def print_columns(self):
                 print("- Section: {}".format(section))
             print("  - {}".format(column.pretty_name))
 
-    @property
-    def columns(self):
-        """Get the columns"""
-
-        ColData = namedtuple("ColData", ["attr", "section", "pretty_name"])
-
-        if self._columns:
-            return self._columns
-
-        self.log.debug("Gathering columns")
-
-        data = self.get_datasets()
-        stime = time.time()
-
-        column_data = OrderedDict()
-
-        current_step = 15
-
-        for idx, row in enumerate(data):
-            for section_name in self.get_columns():
-                for raw_column in row:
-                    if time.time() - stime >= 2:
-                        current_step += 1
-                        self.update_task(current=current_step)
-                        self.log.debug(
-                            "Processing %s Columns  %s/%s",
-                            raw_column.pretty_name,
-                            data.index(row),
-                            len(data),
-                        )
-                        stime = time.time()
-
-                    # Don't consider this if it's not the right column or if it's an "id"
-                    if section_name != raw_column.section:
-                        continue
-                    if raw_column.attr == "id" and self.output_ids is False:
-                        continue
+    def update_column_data(self, column_data, row):
+        """Count the columns used by a single row of gathered data"""
+        for section_name in self.get_columns():
+            for raw_column in row:
+                # Don't consider this if it's not the right column or if it's an "id"
+                if section_name != raw_column.section:
+                    continue
+                if raw_column.attr == "id" and self.output_ids is False:
+                    continue
 
-                    if not self.show_column(raw_column.attr):
-                        continue
+                if not self.show_column(raw_column.attr):
+                    continue
 
-                    if raw_column.section not in column_data:
-                        column_data[raw_column.section] = OrderedDict()
+                if raw_column.section not in column_data:
+                    column_data[raw_column.section] = OrderedDict()
 
-                    # Get the pretty name..
-                    pretty_name = raw_column.pretty_name
-                    try:
-                        pretty_name = self.get_column_name_map()[raw_column.attr]
-                    except KeyError:
-                        pass
+                # Get the pretty name..
+                pretty_name = raw_column.pretty_name
+                try:
+                    pretty_name = self.get_column_name_map()[raw_column.attr]
+                except KeyError:
+                    pass
 
-                    column = ColData(raw_column.attr, raw_column.section, pretty_name)
+                column = ColData(raw_column.attr, raw_column.section, pretty_name)
 
-                    if column not in column_data[raw_column.section].keys():
-                        column_data[raw_column.section][column] = 1
+                if column not in column_data[raw_column.section].keys():
+                    column_data[raw_column.section][column] = 1
 
-                    # If it's actually been used consider it.
-                    if not self.retain_empty and raw_column.value in [None, self.default_none, ""]:
-                        continue
+                # If it's actually been used consider it.
+                if not self.retain_empty and raw_column.value in [None, self.default_none, ""]:
+                    continue
 
-                    column_data[raw_column.section][column] += 1
+                column_data[raw_column.section][column] += 1
+        return column_data
 
-        self._columns = []
+    def get_columns_from_column_data(self, column_data):
+        """Pick the used columns out of the counts built by `update_column_data`"""
+        columns = []
         for section in column_data.keys():
             for column in column_data[section].keys():
                 if column_data[section][column] > 1:
-                    self._columns.append(column)
+                    columns.append(column)
 
         # Regigger the column order if you gave us a specified column order
         if len(self.specified_columns):
             cols = []
             for col in self.specified_columns:
-                f_col = next((x for x in self._columns if x.attr == col), None)
+                f_col = next((x for x in columns if x.attr == col), None)
                 if f_col:
                     cols.append(f_col)
-            self._columns = cols
+            columns = cols
+        return columns
+
+    @property
+    def columns(self):
+        """Get the columns"""
+
+        if self._columns:
+            return self._columns
+
+        self.log.debug("Gathering columns")
+
+        if self.has_pinned_columns:
+            self._columns = self.get_pinned_columns()
+            return self._columns
+
+        if self.chunk_size:
+            self.spool_datasets()
+            return self._columns
+
+        data = self.get_datasets()
+        stime = time.time()
+
+        column_data = OrderedDict()
+
+        current_step = 15
+
+        for idx, row in enumerate(data):
+            if time.time() - stime >= 2:
+                current_step += 1
+                self.update_task(current=current_step)
+                self.log.debug("Processing Columns %s/%s", idx, len(data))
+                stime = time.time()
+            self.update_column_data(column_data, row)
+
+        self._columns = self.get_columns_from_column_data(column_data)
 
         ret = "" if self.retain_empty else "Not "
         self.log.debug("%sRetaining all columns", ret)
@@ -6069,26 +6292,70 @@ def data(self):
 
         current_step = 35
 
-        for home in datasets:
+        for idx, home in enumerate(datasets):
             if time.time() - stime >= 2:
                 current_step += 1
                 self.update_task(current=current_step)
-                self.log.debug("Processing Home %s/%s", datasets.index(home), len(datasets))
+                self.log.debug("Processing Home %s/%s", idx, len(datasets))
                 stime = time.time()
-            data = []
-            for column in self.columns:
-                cdata = next((coldata for coldata in home if coldata.attr == column.attr), None)
-                if not self.show_column(column.attr):
-                    continue
-                data.append(cdata.value if cdata and cdata.value else self.default_none)
-            try:
-                if set(data) != {self.default_none}:
-                    self._data.append(data)
-            except TypeError:
+            values = OrderedDict()
+            for coldata in home:
+                values.setdefault(coldata.attr, coldata.value)
+            data = self.get_row_data(values)
+            if data is not None:
                 self._data.append(data)
         self.log.debug("Done Processing data")
         return self._data
 
+    def get_row_data(self, values):
+        """Lay out a row of ``attr: value`` pairs against the columns.  Empty rows return None"""
+        data = []
+        for column in self.columns:
+            if not self.show_column(column.attr):
+                continue
+            value = values.get(column.attr)
+            data.append(value if value else self.default_none)
+        try:
+            if set(data) == {self.default_none}:
+                return None
+        except TypeError:
+            pass
+        return data
+
+    def get_data_length(self):
+        """The number of rows `iter_data` will produce at most"""
+        if self.has_pinned_columns:
+            return self.get_queryset().count()
+        if self.chunk_size:
+            self.spool_datasets()
+            return self._spool_count
+        return len(self.data)
+
+    def iter_data(self):
+        """Yield the finished rows.  When a ``chunk_size`` is given the rows are read back from
+        the spool one at a time instead of building `data`.  The spool is consumed doing so, and
+        closed however the iteration ends.  Pinned columns skip the spool altogether."""
+        if not self.chunk_size:
+            yield from self.data
+            return
+
+        if self.has_pinned_columns:
+            for row in self.iter_datasets(report=self._pinned_report):
+                data = self.get_row_data(self.get_row_values(row))
+                if data is not None:
+                    yield data
+            return
+
+        try:
+            self.spool_datasets()
+            self._spool.seek(0)
+            for _idx in range(self._spool_count):
+                data = self.get_row_data(pickle.load(self._spool))
+                if data is not None:
+                    yield data
+        finally:
+            self.close_spool()
+
     def print_sample(self, max_num=2, start_num=0, as_dict=False):
         self.max_num = max_num
         results = []
@@ -6129,6 +6396,9 @@ def __init__(self, *args, **kwargs):
         self.subject = kwargs.get("subject", "Project Export")
         self.description = kwargs.get("description", "Axis Generated Document")
         self.max_num = kwargs.get("max_num", None)
+        self.streaming = kwargs.get("streaming", False)
+        self._streaming_styles = {}
+        self.export_format = kwargs.get("export_format") or "xlsx"
 
         kwargs = {
             "user_id": kwargs.get("user_id"),
@@ -6139,6 +6409,9 @@ def __init__(self, *args, **kwargs):
             "retain_empty": kwargs.get("retain_empty_field", False),
             "task": kwargs.get("task"),
             "specified_columns": kwargs.get("specified_columns", []),
+            "chunk_size": kwargs.get("chunk_size"),
+            "parallel_sections": kwargs.get("parallel_sections", False),
+            "section_workers": kwargs.get("section_workers", 4),
         }
         super(HomeDataXLSExport, self).__init__(**kwargs)
 
@@ -6255,10 +6528,17 @@ def add_filter_text(self, sheet, row, column):
         return row + 2, 1
 
     def write(self, return_workbook=False, output="HomesStatusExport.xlsx"):
+        if self.export_format == "csv":
+            return self.write_csv(output=output)
+        if self.export_format == "parquet":
+            return self.write_parquet(output=output)
+        if self.streaming:
+            return self.write_streaming(return_workbook=return_workbook, output=output)
+
         self.update_task = partial(self.update_task_progress, total=50)
         self.update_task(current=1)
 
-        self.get_datasets(report=True)
+        self.gather_datasets(report=True)
         self.log.debug("Starting to write export")
         workbook = Workbook()
         today = formats.date_format(datetime.date.today(), "SHORT_DATE_FORMAT")
@@ -6289,59 +6569,20 @@ def write(self, return_workbook=False, output="HomesStatusExport.xlsx"):
         row += 1
 
         stime = time.time()
-        data_length = len(self.data)
+        data_length = self.get_data_length()
 
         self.update_task = partial(self.update_task_progress, step=1, total=data_length + 4)
 
-        for row_data in self.data:
+        for current, row_data in enumerate(self.iter_data()):
             column = 1
             if time.time() - stime >= 2:
-                current = self.data.index(row_data)
                 self.update_task(current=current)
                 self.log.debug("Writing %s/%s", current, data_length)
                 stime = time.time()
 
             for value in list(row_data):
                 cell = sheet.cell(row=row, column=column)
-                # PyXL gets a bit too fancy.. uuid can be interpretted as a big number.
-                comment = None
-                style_args = {}
-                if isinstance(value, tuple):
-                    value, comment = value
-                if isinstance(value, float):
-                    self.set_cell_float_value(cell, value, style_args)
-                elif isinstance(value, int):
-                    self.set_cell_integer_value(cell, value, style_args)
-                elif isinstance(value, datetime.datetime):
-                    self.set_cell_datetime_value(cell, value, style_args)
-                elif isinstance(value, datetime.date):
-                    self.set_cell_date_value(cell, value, style_args)
-                elif isinstance(value, Decimal):
-                    self.set_cell_decimal_value(cell, value, style_args)
-                elif isinstance(value, str):
-                    # Do unicode escape for strings
-                    # to avoid openpyxl.utils.exceptions.IllegalCharacterError
-                    value = re.sub(ILLEGAL_CHARACTERS_RE, "", value)
-                    if value.isdigit() or value.lstrip("-").isdigit():
-                        self.set_cell_integer_value(cell, value, style_args)
-                    elif (
-                        value.replace(".", "", 1).isdigit()
-                        or value.lstrip("-").replace(".", "", 1).isdigit()
-                    ):
-                        self.set_cell_float_value(cell, value, style_args)
-                    elif value.startswith("$"):
-                        self.set_cell_currency_value(cell, value, style_args)
-                    elif value.endswith("%"):
-                        self.set_cell_percentage_value(cell, value, style_args)
-                    else:
-                        self.set_cell_explicit_value(cell, value)
-
-                    if comment:
-                        cell.comment = Comment(comment, "Axis")
-                elif isinstance(value, Hashid):
-                    self.set_cell_explicit_value(cell, str(value))
-                else:
-                    cell.value = value
+                style_args = self.set_cell_typed_value(cell, value)
                 self.set_cell_default_style(cell, **style_args)
                 sheet.column_dimensions[get_column_letter(column)].width = self.default_col_width
                 column += 1
@@ -6367,24 +6608,309 @@ def write(self, return_workbook=False, output="HomesStatusExport.xlsx"):
         self.log.debug("Done to saving export")
         return output
 
+    def get_output_labels(self):
+        """Column names for the flat file formats.  These must line up with every column and be
+        unique for Parquet."""
+        labels, seen = [], {}
+        for coldata in self.columns:
+            label = self.column_map.get(coldata.attr, coldata.pretty_name) or coldata.attr
+            seen[label] = seen.get(label, 0) + 1
+            if seen[label] > 1:
+                label = "{} ({})".format(label, seen[label])
+            labels.append(label)
+        return labels
+
+    def get_output_rows(self):
+        """Yield the rows for the flat file formats while keeping the task up to date"""
+        stime = time.time()
+        data_length = self.get_data_length()
+        self.update_task = partial(self.update_task_progress, step=1, total=data_length + 1)
 
-def get_bulk_items(**kwargs):
-    obj = HomeDataXLSExport(**kwargs)
-    total = obj.get_queryset().count()
-
-    count_by, start = 100, 0
-    while True:
-        kwargs["max_num"] = start + count_by
-        if kwargs["max_num"] > total:
-            del kwargs["max_num"]
-        obj = HomeDataXLSExport(**kwargs)
-        obj.get_datasets()
-        if not kwargs.get("max_num"):
-            obj.write()
-            break
-        start += count_by
-        print("5 Seconds cleared to kill: ")
-        time.sleep(5)
+        for current, row_data in enumerate(self.iter_data()):
+            if time.time() - stime >= 2:
+                self.update_task(current=current)
+                self.log.debug("Writing %s/%s", current, data_length)
+                stime = time.time()
+            yield [value[0] if isinstance(value, tuple) else value for value in row_data]
+
+        self.update_task(current=data_length + 1)
+
+    def write_csv(self, output="HomesStatusExport.csv"):
+        """Stream the export as a UTF-8 CSV.  There is no styling or title block - just the
+        header and the data."""
+        self.update_task = partial(self.update_task_progress, total=50)
+        self.update_task(current=1)
+
+        self.gather_datasets(report=True)
+        self.log.debug("Starting to write CSV export")
+
+        if hasattr(output, "write"):
+            stream = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        else:
+            stream = open(output, "w", encoding="utf-8", newline="")
+
+        try:
+            writer = csv.writer(stream)
+            writer.writerow(self.get_output_labels())
+            for row_data in self.get_output_rows():
+                writer.writerow(
+                    [str(value) if isinstance(value, Hashid) else value for value in row_data]
+                )
+        finally:
+            if hasattr(output, "write"):
+                stream.flush()
+                stream.detach()
+            else:
+                stream.close()
+
+        self.log.debug("Done to saving export")
+        return output
+
+    def get_typed_value(self, value):
+        """Read a cleaned export value back into a python type for a typed column"""
+        if value is None or value == self.default_none or value == "":
+            return None
+        if isinstance(value, Hashid):
+            return str(value)
+        if not isinstance(value, str):
+            return value
+
+        value = re.sub(ILLEGAL_CHARACTERS_RE, "", value).strip()
+        unsigned = value.lstrip("-")
+        if unsigned.isdigit():
+            # Keep leading zeros (zipcodes) as they are
+            if len(unsigned) > 1 and unsigned.startswith("0"):
+                return value
+            return int(value)
+        if unsigned.replace(".", "", 1).isdigit():
+            return float(value)
+        if value.startswith("$"):
+            try:
+                return Decimal(value[1:].replace(",", ""))
+            except ArithmeticError:
+                return value
+        if value.endswith("%"):
+            try:
+                return float(value[:-1]) / 100
+            except ValueError:
+                return value
+        if DATE_LIKE_RE.match(value):
+            for date_format in TYPED_DATETIME_FORMATS:
+                try:
+                    return datetime.datetime.strptime(value, date_format)
+                except ValueError:
+                    pass
+            for date_format in TYPED_DATE_FORMATS:
+                try:
+                    return datetime.datetime.strptime(value, date_format).date()
+                except ValueError:
+                    pass
+        return value
+
+    def get_typed_array(self, values):
+        """Build a typed arrow array for a column.  Mixed columns fall back to strings."""
+        typed_values = [self.get_typed_value(value) for value in values]
+        kinds = {type(value) for value in typed_values if value is not None}
+
+        arrow_type = None
+        if kinds == {bool}:
+            arrow_type = pyarrow.bool_()
+        elif kinds == {int}:
+            arrow_type = pyarrow.int64()
+        elif kinds and kinds <= {int, float}:
+            arrow_type = pyarrow.float64()
+        elif kinds and kinds <= {int, Decimal}:
+            scale = max(
+                [-v.as_tuple().exponent for v in typed_values if isinstance(v, Decimal)] + [0]
+            )
+            arrow_type = pyarrow.decimal128(38, scale)
+        elif kinds == {datetime.date}:
+            arrow_type = pyarrow.date32()
+        elif kinds == {datetime.datetime}:
+            aware = any(v.tzinfo for v in typed_values if v is not None)
+            arrow_type = pyarrow.timestamp("us", tz="UTC" if aware else None)
+
+        if arrow_type is not None:
+            try:
+                return pyarrow.array(typed_values, type=arrow_type)
+            except (pyarrow.ArrowException, ValueError, TypeError):
+                pass
+        return pyarrow.array(
+            [str(v) if t is not None else None for v, t in zip(values, typed_values)],
+            type=pyarrow.string(),
+        )
+
+    def write_parquet(self, output="HomesStatusExport.parquet"):
+        """Write the export as a columnar Parquet file with typed columns"""
+        if pyarrow is None:
+            raise ImproperlyConfigured("pyarrow is required to export Parquet files")
+
+        self.update_task = partial(self.update_task_progress, total=50)
+        self.update_task(current=1)
+
+        self.gather_datasets(report=True)
+        self.log.debug("Starting to write Parquet export")
+
+        labels = self.get_output_labels()
+        columns = [[] for _label in labels]
+        for row_data in self.get_output_rows():
+            for idx, value in enumerate(row_data):
+                columns[idx].append(value)
+
+        table = pyarrow.Table.from_arrays(
+            [self.get_typed_array(values) for values in columns], names=labels
+        )
+        pyarrow.parquet.write_table(table, output)
+
+        self.log.debug("Done to saving export")
+        return output
+
+    def get_streaming_style(self, workbook, number_format=None):
+        """Return the named style for a number format on the write-only workbook.  Styles are
+        built once per format rather than building fonts for every cell."""
+        if number_format not in self._streaming_styles:
+            style = NamedStyle(
+                name="Axis Export {}".format(len(self._streaming_styles)),
+                font=Font(name="Arial", size=12, bold=False),
+            )
+            if number_format:
+                style.number_format = number_format
+            workbook.add_named_style(style)
+            self._streaming_styles[number_format] = style.name
+        return self._streaming_styles[number_format]
+
+    def get_streaming_cell(self, sheet, value=None, style_method=None):
+        cell = WriteOnlyCell(sheet, value=value)
+        if style_method:
+            style_method(cell)
+        return cell
+
+    def add_streaming_filter_rows(self, sheet):
+        """Mirrors `add_filter_text` for a write-only sheet.  Rows must be appended in order so
+        both rows of filter pairs are built up side by side and merged ranges are registered
+        up front."""
+        sheet.append(
+            [
+                self.get_streaming_cell(
+                    sheet, "Filters used:", style_method=self.set_cell_large_style
+                )
+            ]
+        )
+
+        bold_font = Font(name="Arial", size=12, bold=True)
+
+        def label_style(cell):
+            self.set_cell_default_style(cell)
+            cell.font = bold_font
+
+        first_row, second_row = [], []
+        # The title block and the "Filters used" label take the first four rows.
+        row, column = 5, 1
+        for row_1, row_2 in zip_longest(*(iter(self.filters),) * 2):
+            for row_values, row_idx, pair in (
+                (first_row, row, row_1),
+                (second_row, row + 1, row_2),
+            ):
+                if pair is None:
+                    continue
+                title, value = pair
+                row_values.extend([None] * (column - 1 - len(row_values)))
+                row_values.append(self.get_streaming_cell(sheet, title, label_style))
+                row_values.append(
+                    self.get_streaming_cell(sheet, value, self.set_cell_default_style)
+                )
+                sheet.merged_cells.add(
+                    "{start}{row}:{end}{row}".format(
+                        start=get_column_letter(column + 1),
+                        end=get_column_letter(column + 3),
+                        row=row_idx,
+                    )
+                )
+            column += 4
+
+        sheet.append(first_row)
+        sheet.append(second_row)
+
+    def write_streaming(self, return_workbook=False, output="HomesStatusExport.xlsx"):
+        """Write the export using a write-only workbook.  Rows are flushed to the writer as they
+        are appended so the workbook never holds every cell in memory."""
+        self.update_task = partial(self.update_task_progress, total=50)
+        self.update_task(current=1)
+
+        self.gather_datasets(report=True)
+        self.log.debug("Starting to write streaming export")
+        workbook = Workbook(write_only=True)
+        today = formats.date_format(datetime.date.today(), "SHORT_DATE_FORMAT")
+        sheet = workbook.create_sheet(index=0, title=self.subject[:31])
+        # Write-only sheets need their dimensions before any rows are added.
+        for column in range(1, len(self.columns) + 1):
+            sheet.column_dimensions[get_column_letter(column)].width = self.default_col_width
+        sheet.merged_cells.add("A1:A2")
+
+        sheet.append([None, self.get_streaming_cell(sheet, self.title, self.set_cell_title_style)])
+        run_by = "Ran by user: {} on {}".format(self.user.get_full_name(), today)
+        sheet.append(
+            [None, self.get_streaming_cell(sheet, run_by, self.set_cell_italic_small_style)]
+        )
+        sheet.append([])
+
+        if len(self.filters):
+            self.add_streaming_filter_rows(sheet)
+        sheet.append([])
+
+        header = []
+        for coldata in self.columns:
+            label = self.column_map.get(coldata.attr, coldata.pretty_name)
+            if not label:
+                log.info("No header for column %s skipping", coldata.attr)
+                continue
+            header.append(self.get_streaming_cell(sheet, label, self.set_cell_header_style))
+        sheet.append(header)
+
+        stime = time.time()
+        data_length = self.get_data_length()
+
+        self.update_task = partial(self.update_task_progress, step=1, total=data_length + 4)
+
+        for current, row_data in enumerate(self.iter_data()):
+            if time.time() - stime >= 2:
+                self.update_task(current=current)
+                self.log.debug("Writing %s/%s", current, data_length)
+                stime = time.time()
+
+            values = []
+            for value in row_data:
+                cell = WriteOnlyCell(sheet)
+                style_args = self.set_cell_typed_value(cell, value)
+                cell.style = self.get_streaming_style(workbook, style_args.get("number_format"))
+                values.append(cell)
+            sheet.append(values)
+
+        self.log.debug("Adding properties and logo")
+        self.update_task(current=data_length + 1)
+
+        workbook.properties = self.properties()
+        self.update_task(current=data_length + 2)
+
+        self.add_logo(workbook, sheet)
+        self.update_task(current=data_length + 3)
+
+        if return_workbook:
+            self.log.debug("Done to building export")
+            self.update_task(current=data_length + 4)
+            return workbook
+
+        self.log.debug("Saving export")
+        workbook.save(output)
+        self.update_task(current=data_length + 4)
+        self.log.debug("Done to saving export")
+        return output
+
+
+def get_bulk_items(chunk_size=100, output="HomesStatusExport.xlsx", **kwargs):
+    """Export with a single exporter gathering ``chunk_size`` home statuses at a time"""
+    obj = HomeDataXLSExport(chunk_size=chunk_size, streaming=True, **kwargs)
+    return obj.write(output=output)
 
 
 if __name__ == "__main__":
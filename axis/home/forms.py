@@ -9,6 +9,7 @@
 
 
 import datetime
+import importlib.util
 import logging
 from collections import OrderedDict
 
@@ -99,6 +100,11 @@
 ]
 
 SIMULATION_TYPE_CHOICES = [("basic", "Simulation Basic"), ("advanced", "Simulation Advanced")]
+EXPORT_FORMAT_CHOICES = [
+    ("xlsx", "Excel (.xlsx)"),
+    ("csv", "CSV (.csv)"),
+    ("parquet", "Parquet (.parquet)"),
+]
 
 
 def EEPPROGRAMHOMESTATUS_STATE_CHOICES():
@@ -824,6 +830,9 @@ class HomeStatusReportForm(forms.ModelForm):
     customer_eto_field = forms.BooleanField(widget=forms.CheckboxInput(), required=False)
     customer_hirl_field = forms.BooleanField(widget=forms.CheckboxInput(), required=False)
     retain_empty_field = forms.BooleanField(widget=forms.CheckboxInput(), required=False)
+    export_format = forms.ChoiceField(
+        choices=EXPORT_FORMAT_CHOICES, required=False, initial="xlsx", label="File Format"
+    )
 
     class Meta:
         model = AsynchronousProcessedDocument
@@ -865,12 +874,21 @@ def __init__(self, *args, **kwargs):
 
         self.fields["simulation_field"].widget.attrs["type"] = "radio"
 
+        # Parquet needs pyarrow installed
+        if importlib.util.find_spec("pyarrow") is None:
+            self.fields["export_format"].choices = [
+                choice for choice in EXPORT_FORMAT_CHOICES if choice[0] != "parquet"
+            ]
+
     def clean_task_name(self):
         """This is the task name"""
         from .tasks import export_home_data
 
         return export_home_data
 
+    def clean_export_format(self):
+        return self.cleaned_data.get("export_format") or "xlsx"
+
     def clean(self):
         """Validate the dates"""
         cleaned_data = super(HomeStatusReportForm, self).clean()
@@ -49,6 +49,12 @@ def add_arguments(self, parser):
         parser.add_argument(
             "--filename", action="store", dest="filename", help="Output File (depending on action)"
         )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            dest="parallel",
+            help="Gather the report sections at the same time",
+        )
 
     def set_options(
         self,
@@ -58,6 +64,7 @@ def set_options(
         search=None,
         report_on=None,
         max_num=None,
+        parallel=False,
         **options,
     ):
         if not any([user]):
@@ -114,6 +121,8 @@ def set_options(
         result["report_on"] = report_on
         if max_num:
             result["max_num"] = max_num
+        if parallel:
+            result["parallel_sections"] = True
 
         if filename:
             if not os.path.exists(os.path.dirname(os.path.expanduser(filename))):
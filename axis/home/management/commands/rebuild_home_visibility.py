@@ -0,0 +1,70 @@
+"""rebuild_home_visibility.py - Axis"""
+
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from axis.home.models import Home, HomeVisibility
+
+log = logging.getLogger(__name__)
+
+__author__ = "Steven K"
+__date__ = "10/18/26 14:05"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven K",
+]
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the company / home visibility table"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            dest="verify",
+            help="Only report the rows which are out of date - fails if there are any",
+        )
+        parser.add_argument(
+            "--home",
+            action="append",
+            dest="home_ids",
+            type=int,
+            help="Limit to these home ids",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            action="store",
+            dest="chunk_size",
+            type=int,
+            default=1000,
+            help="Homes handled per pass",
+        )
+
+    def handle(self, verify=False, home_ids=None, chunk_size=1000, **options):
+        if not home_ids:
+            home_ids = set(Home.objects.values_list("id", flat=True))
+            home_ids |= set(HomeVisibility.objects.values_list("home_id", flat=True).distinct())
+
+        created, updated, deleted = HomeVisibility.objects.sync(
+            home_ids, commit=not verify, chunk_size=chunk_size
+        )
+
+        verb = "Missing" if verify else "Created"
+        self.stdout.write(
+            "%d homes checked.  %s %d, %s %d, %s %d rows"
+            % (
+                len(home_ids),
+                verb,
+                created,
+                "Stale" if verify else "Updated",
+                updated,
+                "Extra" if verify else "Deleted",
+                deleted,
+            )
+        )
+
+        if verify and any([created, updated, deleted]):
+            raise CommandError("Home visibility is out of date - run without --verify to repair")
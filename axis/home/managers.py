@@ -16,7 +16,7 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.db import models, IntegrityError
+from django.db import models, IntegrityError, transaction
 from django.db.models import F, Value, CharField, Exists
 from django.db.models import IntegerField
 from django.db.models import OuterRef, Subquery
@@ -52,6 +52,119 @@ def filter_by_company_and_home(self, home, company):
         return docs.exclude(company__company_type=company.company_type)
 
 
+def get_home_visibility_rows(relationships, associations):
+    """
+    Works out the ``HomeVisibility`` rows from home relationship values (company_id, home_id,
+    is_owned, is_viewable, is_attached) and active, unhidden home status association values
+    (company_id, home_id).  This mirrors ``RelationshipQuerySet.show_attached()``.
+
+    Returns {(company_id, home_id, show_attached): (via_relationship, via_association)}
+    """
+    rows = defaultdict(lambda: [False, False])
+    for company_id, home_id, is_owned, is_viewable, is_attached in relationships:
+        if is_owned:
+            rows[(company_id, home_id, False)][0] = True
+        if (is_viewable and is_owned) or (is_attached and not is_owned):
+            rows[(company_id, home_id, True)][0] = True
+    for company_id, home_id in associations:
+        rows[(company_id, home_id, False)][1] = True
+        rows[(company_id, home_id, True)][1] = True
+    return {key: tuple(value) for key, value in rows.items()}
+
+
+class HomeVisibilityManager(models.Manager):
+    """Keeps ``HomeVisibility`` in line with the relationships and associations"""
+
+    def get_expected_rows(self, home_ids):
+        from .models import Home, EEPProgramHomeStatus
+
+        relationships = Relationship.objects.filter(
+            content_type=ContentType.objects.get_for_model(Home), object_id__in=home_ids
+        ).values_list("company_id", "object_id", "is_owned", "is_viewable", "is_attached")
+
+        Associations = EEPProgramHomeStatus.associations.rel.related_model
+        associations = Associations.objects.filter(
+            is_active=True, is_hidden=False, eepprogramhomestatus__home_id__in=home_ids
+        ).values_list("company_id", "eepprogramhomestatus__home_id")
+
+        return get_home_visibility_rows(relationships, associations)
+
+    def sync(self, home_ids, commit=True, create=True, chunk_size=1000):
+        """
+        Brings the rows for ``home_ids`` in line with their relationships and associations.  With
+        ``commit=False`` nothing is written, which is how the table gets verified.  ``create=False``
+        is for deletions, where the home itself may be on its way out and only ever loses rows.
+
+        Returns (created, updated, deleted) row counts.
+        """
+        home_ids = sorted(set(home_ids))
+        counts = [0, 0, 0]
+        for start in range(0, len(home_ids), chunk_size):
+            chunk = home_ids[start : start + chunk_size]
+            for idx, count in enumerate(self._sync(chunk, commit=commit, create=create)):
+                counts[idx] += count
+        return tuple(counts)
+
+    def _sync(self, home_ids, commit=True, create=True):
+        expected = self.get_expected_rows(home_ids)
+
+        current = {}
+        values = self.filter(home_id__in=home_ids).values_list(
+            "id", "company_id", "home_id", "show_attached", "via_relationship", "via_association"
+        )
+        for pk, company_id, home_id, show_attached, via_relationship, via_association in values:
+            current[(company_id, home_id, show_attached)] = (
+                pk,
+                (via_relationship, via_association),
+            )
+
+        to_create, to_update, to_delete = [], [], []
+        for key, (pk, sources) in current.items():
+            if key not in expected:
+                to_delete.append(pk)
+            elif expected[key] != sources:
+                via_relationship, via_association = expected[key]
+                to_update.append(
+                    self.model(
+                        id=pk, via_relationship=via_relationship, via_association=via_association
+                    )
+                )
+        if create:
+            for key, (via_relationship, via_association) in expected.items():
+                if key in current:
+                    continue
+                company_id, home_id, show_attached = key
+                to_create.append(
+                    self.model(
+                        company_id=company_id,
+                        home_id=home_id,
+                        show_attached=show_attached,
+                        via_relationship=via_relationship,
+                        via_association=via_association,
+                    )
+                )
+
+        if commit:
+            with transaction.atomic():
+                if to_delete:
+                    self.filter(id__in=to_delete).delete()
+                if to_update:
+                    self.bulk_update(to_update, ["via_relationship", "via_association"])
+                if to_create:
+                    self.bulk_create(to_create, ignore_conflicts=True)
+
+        return len(to_create), len(to_update), len(to_delete)
+
+    def get_relationship_home_ids(self, relationships):
+        """The homes behind a queryset of relationships - take these before updating it"""
+        from .models import Home
+
+        home_ids = relationships.filter(
+            content_type=ContentType.objects.get_for_model(Home)
+        ).values_list("object_id", flat=True)
+        return list(home_ids)
+
+
 class HomeManager(models.Manager):
     """A generic manager with metros"""
 
@@ -66,19 +179,17 @@ def filter_by_multiple_companies(self, companies, **kwargs):
 
     def filter_by_company(self, company, **kwargs):
         """A way to trim down the list of objects by company"""
-        show_attached = kwargs.pop("show_attached", False)
-        relationship_homes = company.relationships.get_homes(show_attached=show_attached).filter(
-            **kwargs
-        )
-        home_ids = list(relationship_homes.values_list("id", flat=True))
-
-        from .models import EEPProgramHomeStatus
-
-        Associations = EEPProgramHomeStatus.associations.rel.related_model
-        associations = Associations.objects.filter(company=company, is_active=True, is_hidden=False)
-        home_ids.extend(associations.values_list("eepprogramhomestatus__home_id", flat=True))
+        from .models import HomeVisibility
 
-        return self.filter(id__in=home_ids)
+        show_attached = kwargs.pop("show_attached", False)
+        visibility = HomeVisibility.objects.filter(company=company, show_attached=show_attached)
+        if kwargs:
+            # Home filters only ever narrowed down the related homes, not the associated ones.
+            home_kwargs = {"home__{}".format(key): value for key, value in kwargs.items()}
+            visibility = visibility.filter(
+                Q(via_association=True) | Q(via_relationship=True, **home_kwargs)
+            )
+        return self.filter(id__in=visibility.values("home_id"))
 
     def filter_by_user(self, user, **kwargs):
         """A way to trim down the list of objects by user"""
@@ -146,6 +257,43 @@ def get_aps_ms_for_user_qs(self, user, **kwargs):
     def get_homes_for_scheduling(self, company, id_list):
         return self.filter_by_company(company=company).exclude(id__in=id_list)
 
+    @staticmethod
+    def coerce_multi_family(is_multi_family: bool | str | None) -> bool:
+        """Uploaded values of "yes" or "x" mark a home as multi-family"""
+        if isinstance(is_multi_family, str):
+            return is_multi_family.lower() in ["yes", "x"]
+        return is_multi_family if is_multi_family is not None else False
+
+    def get_geocode_lookup(
+        self,
+        street_line1: str,
+        city: City,
+        state: str | None = None,
+        zipcode: str | None = None,
+        street_line2: str | None = None,
+        country: Country | None = None,
+        is_multi_family: bool | str = False,
+    ) -> dict:
+        """The ``Geocode`` lookup ``verify_and_create_for_user()`` uses for an address.  State
+        and country default to the city's."""
+        if isinstance(street_line1, str):
+            street_line1 = street_line1.strip()
+        if isinstance(zipcode, str):
+            zipcode = zipcode.strip()
+        if isinstance(street_line2, str):
+            street_line2 = street_line2.strip()
+        if state is None and city.state:
+            state = city.state
+        if country is None and city.country:
+            country = city.country
+
+        lookup = dict(street_line1=street_line1, city=city, state=state, zipcode=zipcode)
+        if not self.coerce_multi_family(is_multi_family) and street_line2:
+            lookup["street_line2"] = street_line2
+        if country:
+            lookup["country"] = country.abbr
+        return lookup
+
     def verify_and_create_for_user(
         self,
         user: User,
@@ -198,12 +346,7 @@ def verify_and_create_for_user(
         if street_line2 in ["", None]:
             street_line2 = None
 
-        if isinstance(is_multi_family, str):
-            if is_multi_family.lower() in ["yes", "x"]:
-                is_multi_family = True
-            else:
-                is_multi_family = False
-        is_multi_family = is_multi_family if is_multi_family is not None else False
+        is_multi_family = self.coerce_multi_family(is_multi_family)
 
         company = user.company
 
@@ -280,12 +423,15 @@ def verify_and_create_for_user(
         # Perform geocoding to get updated values where possible.
         # These will be used to create the home.
 
-        lookup = dict(street_line1=street_line1, city=city, state=state, zipcode=zipcode)
-
-        if not is_multi_family and street_line2:
-            lookup["street_line2"] = street_line2
-        if country:
-            lookup["country"] = country.abbr
+        lookup = self.get_geocode_lookup(
+            street_line1=street_line1,
+            street_line2=street_line2,
+            city=city,
+            state=state,
+            zipcode=zipcode,
+            country=country,
+            is_multi_family=is_multi_family,
+        )
 
         # Now if we look this address up and we find a match what should we be doing?
         # Example we upload an address was previously unconfirmed..
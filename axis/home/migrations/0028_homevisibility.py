@@ -0,0 +1,103 @@
+# Generated by Django 4.2 on 2026-10-18 14:05
+
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def get_home_visibility_rows(relationships, associations):
+    """A frozen copy of ``axis.home.managers.get_home_visibility_rows()``"""
+    rows = defaultdict(lambda: [False, False])
+    for company_id, home_id, is_owned, is_viewable, is_attached in relationships:
+        if is_owned:
+            rows[(company_id, home_id, False)][0] = True
+        if (is_viewable and is_owned) or (is_attached and not is_owned):
+            rows[(company_id, home_id, True)][0] = True
+    for company_id, home_id in associations:
+        rows[(company_id, home_id, False)][1] = True
+        rows[(company_id, home_id, True)][1] = True
+    return {key: tuple(value) for key, value in rows.items()}
+
+
+def populate_home_visibility(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Relationship = apps.get_model("relationship", "Relationship")
+    Association = apps.get_model("home", "EEPProgramHomeStatusAssociation")
+    HomeVisibility = apps.get_model("home", "HomeVisibility")
+
+    home_ct = ContentType.objects.filter(app_label="home", model="home").first()
+    if home_ct is None:
+        return
+
+    relationships = Relationship.objects.filter(content_type=home_ct).values_list(
+        "company_id", "object_id", "is_owned", "is_viewable", "is_attached"
+    )
+    associations = Association.objects.filter(is_active=True, is_hidden=False).values_list(
+        "company_id", "eepprogramhomestatus__home_id"
+    )
+    home_ids = set(apps.get_model("home", "Home").objects.values_list("id", flat=True))
+
+    rows = []
+    for key, (via_relationship, via_association) in get_home_visibility_rows(
+        relationships.iterator(), associations.iterator()
+    ).items():
+        company_id, home_id, show_attached = key
+        if home_id not in home_ids:
+            continue
+        rows.append(
+            HomeVisibility(
+                company_id=company_id,
+                home_id=home_id,
+                show_attached=show_attached,
+                via_relationship=via_relationship,
+                via_association=via_association,
+            )
+        )
+    HomeVisibility.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("company", "0035_auto_20230418_0717"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("relationship", "0004_alter_relationship_id"),
+        ("home", "0027_remove_historicalhome_is_accessory_structure_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HomeVisibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("show_attached", models.BooleanField()),
+                ("via_relationship", models.BooleanField(default=False)),
+                ("via_association", models.BooleanField(default=False)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="company.company",
+                    ),
+                ),
+                (
+                    "home",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visibilities",
+                        to="home.home",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("company", "show_attached", "home")},
+            },
+        ),
+        migrations.RunPython(populate_home_visibility, migrations.RunPython.noop),
+    ]
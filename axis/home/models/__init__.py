@@ -1,6 +1,7 @@
 from .eep_program_home_status import EEPProgramHomeStatus
 from .home import Home
 from .home_photo import HomePhoto
+from .home_visibility import HomeVisibility
 from .standard_disclosure_settings import StandardDisclosureSettings
 
 __author__ = "Artem Hruzd"
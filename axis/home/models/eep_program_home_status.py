@@ -12,6 +12,7 @@
 import inspect
 import logging
 import sys
+import uuid
 from collections import namedtuple
 
 from django.apps import apps
@@ -99,6 +100,11 @@
     # 'smart-thermostat-brand': '',
 }
 
+# The inputs the certification requirements read.  Each one carries a version token per home
+# status, and a cached progress analysis is only good for the tokens it was computed against.
+REQUIREMENT_DEPENDENCIES = ("answers", "relationships", "floorplan", "annotations", "sampleset")
+REQUIREMENT_CACHE_TIMEOUT = 60 * 30
+
 
 class EEPProgramHomeStatus(StateModel, WorkflowStatusHomeStatusCompatMixin):
     """This is where all the action takes place.  We can get the status
@@ -651,6 +657,69 @@ def update_stats(self, audit=False, raise_exception=False, brief_audit=True):  #
         self.pct_complete = pct_complete
         self.save()
 
+    def get_progress_analysis(self, user=None, use_cache=False, **kwargs):
+        """Returns ``get_progress_analysis()``.  With ``use_cache`` it comes from the cache while
+        none of the inputs tracked by ``invalidate_requirements_cache()`` have changed.  The
+        requirements read more than those inputs, so only read-only displays (progress bars)
+        should use it - anything deciding eligibility or a state transition must not.
+        ``update_home_states()`` and the certification checks therefore always recompute."""
+        if not use_cache or not self.pk:
+            return super(EEPProgramHomeStatus, self).get_progress_analysis(user=user, **kwargs)
+
+        cache_key = self.get_requirements_cache_key(user=user, **kwargs)
+        data = cache.get(cache_key)
+        if data is None:
+            data = super(EEPProgramHomeStatus, self).get_progress_analysis(user=user, **kwargs)
+            cache.set(cache_key, data, REQUIREMENT_CACHE_TIMEOUT)
+        return data
+
+    @classmethod
+    def get_requirements_version_key(cls, home_status_id, dependency):
+        return "home-status-requirements-{}-{}".format(home_status_id, dependency)
+
+    def get_requirements_versions(self):
+        """Returns the version token for each of ``REQUIREMENT_DEPENDENCIES``.  A missing token
+        (never set, invalidated or evicted) is replaced with a new one, so a result cached against
+        the old token can't be picked up again."""
+        keys = [self.get_requirements_version_key(self.pk, dep) for dep in REQUIREMENT_DEPENDENCIES]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                token = uuid.uuid4().hex
+                if not cache.add(key, token, REQUIREMENT_CACHE_TIMEOUT * 2):
+                    token = cache.get(key, token)
+                versions[key] = token
+        return [versions[key] for key in keys]
+
+    def get_requirements_cache_key(self, user=None, **kwargs):
+        """Returns a cache key for a progress analysis of this home status"""
+        key = [
+            self.pk,
+            self.state,
+            self.certification_date,
+            self.eep_program_id,
+            self.company_id,
+            self.home_id,
+            self.floorplan_id,
+            self.collection_request_id,
+            user.pk if user else None,
+            sorted(kwargs.items()),
+        ] + self.get_requirements_versions()
+        return "home-status-progress-{}".format(hashlib.sha1(repr(key).encode("utf-8")).hexdigest())
+
+    @classmethod
+    def invalidate_requirements_cache(cls, home_status_ids, dependencies=None):
+        """Drops the version tokens of ``dependencies`` (default all) for the home statuses, which
+        retires any progress analysis cached for them."""
+        dependencies = dependencies or REQUIREMENT_DEPENDENCIES
+        keys = [
+            cls.get_requirements_version_key(home_status_id, dependency)
+            for home_status_id in set(home_status_ids)
+            for dependency in dependencies
+        ]
+        if keys:
+            cache.delete_many(keys)
+
     def is_eligible_for_certification(self, skip_certification_check=False):
         """Returns a single boolean for the result of ``get_progress_analysis()``"""
         data = self.get_progress_analysis(
@@ -1186,6 +1255,10 @@ def get_sampleset(self):
         return None
 
     def get_samplesethomestatus(self):
+        prefetched = getattr(self, "_prefetched_requirement_kwargs", {})
+        if "samplesethomestatus" in prefetched:
+            return prefetched["samplesethomestatus"]
+
         if not self.pk:
             from axis.sampleset.models import SampleSetHomeStatus
 
@@ -1306,6 +1379,13 @@ def get_completion_test_kwargs(self, user=None, **kwargs):
 
         kwargs = super(EEPProgramHomeStatus, self).get_completion_test_kwargs(user, **kwargs)
 
+        # Batch evaluation (see ``axis.home.utils.HomeStatusProgressBatch``) crunches some of these
+        # for many home statuses at once.
+        prefetched = getattr(self, "_prefetched_requirement_kwargs", {})
+
+        def crunched(name, method):
+            return prefetched[name] if name in prefetched else method()
+
         sampleset_homestatus = self.get_samplesethomestatus()
 
         collector = None
@@ -1324,6 +1404,8 @@ def get_completion_test_kwargs(self, user=None, **kwargs):
                 .select_related("instrument__response_policy")
                 .get_breakdown("instrument__measure_id")
             )
+        elif "answers" in prefetched:
+            inputs = {answer._measure: answer for answer in prefetched["answers"]}
         else:
             answers = self.get_answers_for_home()
             inputs = {
@@ -1345,9 +1427,15 @@ def get_completion_test_kwargs(self, user=None, **kwargs):
                 "home_status": kwargs["workflow_status"],
                 # Crunched data
                 "builder": self.home.get_builder(),
-                "eep_companies": self.eep_program.owner.relationships.get_companies(),
-                "accepted_companies": self.home.relationships.get_accepted_companies(),
-                "unaccepted_companies": self.home.relationships.get_unaccepted_companies(),
+                "eep_companies": crunched(
+                    "eep_companies", self.eep_program.owner.relationships.get_companies
+                ),
+                "accepted_companies": crunched(
+                    "accepted_companies", self.home.relationships.get_accepted_companies
+                ),
+                "unaccepted_companies": crunched(
+                    "unaccepted_companies", self.home.relationships.get_unaccepted_companies
+                ),
                 "samplesethomestatus": sampleset_homestatus,
                 "sampleset": (sampleset_homestatus.sampleset if sampleset_homestatus else None),
                 "inputs": inputs,
@@ -1398,6 +1486,10 @@ def get_unanswered_questions(self, collector=None, **kwargs):
             # print({"Answered": answered_measure_pks, "Remaining": inst_values})
             return instruments
         else:
+            prefetched = getattr(self, "_prefetched_requirement_kwargs", {})
+            if "answered_question_ids" in prefetched:
+                return self.get_all_questions().exclude(id__in=prefetched["answered_question_ids"])
+
             if self.eep_program.is_qa_program:
                 answers = self.get_qaanswers_for_home().values_list("id", flat=True)
             else:
@@ -1408,6 +1500,15 @@ def get_unanswered_questions(self, collector=None, **kwargs):
                 .exclude(qaanswer__id__in=list(answers))
             )
 
+    def _get_unanswered_question_list(self, **kwargs):
+        """The legacy checklist questions from ``get_unanswered_questions()``, taken from the
+        batch crunched questions when ``HomeStatusProgressBatch`` has attached them."""
+        prefetched = getattr(self, "_prefetched_requirement_kwargs", {})
+        if "answered_question_ids" in prefetched:
+            answered = prefetched["answered_question_ids"]
+            return [q for q in prefetched["questions"] if q.id not in answered]
+        return list(self.get_unanswered_questions(**kwargs))
+
     def get_all_questions(self, collector=None, **kwargs):
         from axis.checklist.models import Question
 
@@ -1466,10 +1567,9 @@ def get_required_questions_remaining_status(self, checklist_url, **kwargs):
             # This will be checked with alternate logic in "get_uncovered_questions_status()"
             return None
 
-        instruments = self.get_unanswered_questions(**kwargs)
-
         collector = kwargs.get("collector")
         if collector:
+            instruments = self.get_unanswered_questions(**kwargs)
             instruments = instruments.filter(response_policy__required=True)
             if instruments.exists():
                 msg = "There are %d required checklist questions remaining." % instruments.count()
@@ -1477,7 +1577,7 @@ def get_required_questions_remaining_status(self, checklist_url, **kwargs):
             return PassingStatusTuple(data=0)
 
         # Legacy
-        questions = instruments
+        questions = self._get_unanswered_question_list(**kwargs)
         required_unanswered_count = len([q for q in questions if not q.is_optional])
 
         kwargs = {"n": required_unanswered_count}
@@ -1502,7 +1602,7 @@ def get_optional_questions_remaining_status(self, checklist_url, **kwargs):
             return None
 
         optional_unanswered_count = len(
-            [q for q in self.get_unanswered_questions(**kwargs) if q.is_optional]
+            [q for q in self._get_unanswered_question_list(**kwargs) if q.is_optional]
         )
 
         kwargs = {"n": optional_unanswered_count}
@@ -0,0 +1,40 @@
+"""home_visibility.py: """
+
+from django.db import models
+
+from axis.home.managers import HomeVisibilityManager
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 14:05"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+
+class HomeVisibility(models.Model):
+    """
+    The homes a company can see, flattened out of the home Relationships and the home status
+    Associations.  There is one row per company / home / ``show_attached`` mode the home shows up
+    under, and ``Home.objects.filter_by_company()`` reads it instead of collecting the ids.
+
+    This is maintained by the relationship / association signals; ``rebuild_home_visibility``
+    verifies and repairs it.
+    """
+
+    company = models.ForeignKey("company.Company", on_delete=models.CASCADE, related_name="+")
+    home = models.ForeignKey("home.Home", on_delete=models.CASCADE, related_name="visibilities")
+    show_attached = models.BooleanField()
+
+    # Where the visibility comes from.  Filtering homes by their fields only applies to the
+    # relationship side, like it always has.
+    via_relationship = models.BooleanField(default=False)
+    via_association = models.BooleanField(default=False)
+
+    objects = HomeVisibilityManager()
+
+    class Meta:
+        unique_together = ("company", "show_attached", "home")
+
+    def __str__(self):
+        return "{} - {} ({})".format(self.company_id, self.home_id, self.show_attached)
@@ -4,7 +4,8 @@
 import logging
 
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save, post_delete
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import Signal
 from django.utils import formats
 
@@ -14,8 +15,9 @@
     NEEABPAHomeCertifiedRaterMessage,
     NEEABPAHomeCertifiedUtilityMessage,
 )
-from axis.home.models import Home, EEPProgramHomeStatus
+from axis.home.models import Home, EEPProgramHomeStatus, HomeVisibility
 from axis.home.tasks import update_home_stats, update_home_states
+from axis.home.utils import get_sampleset_home_status_ids
 
 User = get_user_model()
 
@@ -42,7 +44,39 @@ def register_signals():
         incentive_payment_status_create_handler, sender=EEPProgramHomeStatus
     )
 
+    from axis.annotation.models import Annotation
     from axis.checklist.models import CollectedInput, Answer, QAAnswer
+    from axis.floorplan.models import Floorplan
+    from axis.relationship.models import Relationship
+    from axis.remrate_data.models import Simulation as RemrateSimulation
+    from axis.sampleset.models import SampleSet, SampleSetHomeStatus
+    from simulation.models import Simulation
+
+    # Connected ahead of the handlers below so the progress displays never lag the answers.
+    for model in [CollectedInput, Answer, QAAnswer]:
+        post_save.connect(invalidate_requirements_on_answer, sender=model)
+        post_delete.connect(invalidate_requirements_on_answer, sender=model)
+    Associations = EEPProgramHomeStatus.associations.rel.related_model
+    post_save.connect(update_visibility_on_relationship, sender=Relationship)
+    post_delete.connect(update_visibility_on_relationship, sender=Relationship)
+    post_save.connect(update_visibility_on_association, sender=Associations)
+    post_delete.connect(update_visibility_on_association, sender=Associations)
+    post_delete.connect(update_visibility_on_home_status_delete, sender=EEPProgramHomeStatus)
+
+    post_save.connect(invalidate_requirements_on_relationship, sender=Relationship)
+    post_delete.connect(invalidate_requirements_on_relationship, sender=Relationship)
+    post_save.connect(invalidate_requirements_on_annotation, sender=Annotation)
+    post_delete.connect(invalidate_requirements_on_annotation, sender=Annotation)
+    post_save.connect(invalidate_requirements_on_floorplan, sender=Floorplan)
+    post_save.connect(invalidate_requirements_on_simulation, sender=Simulation)
+    post_save.connect(invalidate_requirements_on_simulation, sender=RemrateSimulation)
+    m2m_changed.connect(
+        invalidate_requirements_on_floorplans_changed,
+        sender=EEPProgramHomeStatus.floorplans.through,
+    )
+    post_save.connect(invalidate_requirements_on_sampleset, sender=SampleSet)
+    post_save.connect(invalidate_requirements_on_sampleset_membership, sender=SampleSetHomeStatus)
+    post_delete.connect(invalidate_requirements_on_sampleset_membership, sender=SampleSetHomeStatus)
 
     post_save.connect(update_stats_on_answer, sender=CollectedInput)
     post_delete.connect(update_stats_on_answer, sender=CollectedInput)
@@ -52,6 +86,130 @@ def register_signals():
     post_delete.connect(update_stats_on_answer, sender=QAAnswer)
 
 
+def update_visibility_on_relationship(sender, instance, **kwargs):
+    """Keep ``HomeVisibility`` current for home relationships"""
+    if kwargs.get("raw") or instance.content_type.model_class() != Home:
+        return
+    HomeVisibility.objects.sync([instance.object_id], create=kwargs["signal"] is post_save)
+
+
+def update_visibility_on_association(sender, instance, **kwargs):
+    """Keep ``HomeVisibility`` current for home status associations"""
+    if kwargs.get("raw"):
+        return
+
+    home_ids = EEPProgramHomeStatus.objects.filter(id=instance.eepprogramhomestatus_id).values_list(
+        "home_id", flat=True
+    )
+    HomeVisibility.objects.sync(list(home_ids), create=kwargs["signal"] is post_save)
+
+
+def update_visibility_on_home_status_delete(sender, instance, **kwargs):
+    """Associations cascading away with the home status can't find their home any more"""
+    HomeVisibility.objects.sync([instance.home_id], create=False)
+
+
+def invalidate_requirements_on_answer(sender, instance, **kwargs):
+    """Answers given on a sampled home count for the rest of its sampleset"""
+    if kwargs.get("raw"):
+        return
+
+    if getattr(instance, "home_status_id", None):
+        home_status_ids = [instance.home_status_id]
+    elif instance.home_id:
+        home_status_ids = list(
+            EEPProgramHomeStatus.objects.filter(home_id=instance.home_id).values_list(
+                "id", flat=True
+            )
+        )
+    else:
+        return
+
+    EEPProgramHomeStatus.invalidate_requirements_cache(
+        get_sampleset_home_status_ids(home_status_ids), ["answers", "sampleset"]
+    )
+
+
+def invalidate_requirements_on_relationship(sender, instance, **kwargs):
+    from axis.subdivision.models import Subdivision
+
+    if kwargs.get("raw"):
+        return
+
+    stats = EEPProgramHomeStatus.objects.none()
+    if instance.content_type.model_class() == Home:
+        stats = EEPProgramHomeStatus.objects.filter(home_id=instance.object_id)
+    elif instance.content_type.model_class() == Subdivision:
+        stats = EEPProgramHomeStatus.objects.filter(home__subdivision_id=instance.object_id)
+
+    EEPProgramHomeStatus.invalidate_requirements_cache(
+        stats.values_list("id", flat=True), ["relationships"]
+    )
+
+
+def invalidate_requirements_on_annotation(sender, instance, **kwargs):
+    if kwargs.get("raw") or instance.content_type.model_class() != EEPProgramHomeStatus:
+        return
+    EEPProgramHomeStatus.invalidate_requirements_cache([instance.object_id], ["annotations"])
+
+
+def invalidate_requirements_on_floorplan(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+
+    home_status_ids = set(instance.homestatuses.values_list("id", flat=True))
+    home_status_ids |= set(instance.active_for_homestatuses.values_list("id", flat=True))
+    EEPProgramHomeStatus.invalidate_requirements_cache(home_status_ids, ["floorplan"])
+
+
+def invalidate_requirements_on_floorplans_changed(sender, instance, action, reverse, **kwargs):
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+
+    if not reverse:
+        home_status_ids = [instance.pk]
+    else:
+        home_status_ids = kwargs.get("pk_set") or instance.homestatuses.values_list("id", flat=True)
+    EEPProgramHomeStatus.invalidate_requirements_cache(home_status_ids, ["floorplan"])
+
+
+def invalidate_requirements_on_simulation(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+
+    field = "remrate_target" if sender._meta.app_label == "remrate_data" else "simulation"
+    stats = EEPProgramHomeStatus.objects.filter(
+        Q(**{"floorplan__{}".format(field): instance})
+        | Q(**{"floorplans__{}".format(field): instance})
+    )
+    EEPProgramHomeStatus.invalidate_requirements_cache(
+        stats.values_list("id", flat=True), ["floorplan"]
+    )
+
+
+def invalidate_requirements_on_sampleset(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+
+    home_status_ids = instance.samplesethomestatus_set.values_list("home_status_id", flat=True)
+    EEPProgramHomeStatus.invalidate_requirements_cache(home_status_ids, ["answers", "sampleset"])
+
+
+def invalidate_requirements_on_sampleset_membership(sender, instance, **kwargs):
+    from axis.sampleset.models import SampleSetHomeStatus
+
+    if kwargs.get("raw"):
+        return
+
+    home_status_ids = {instance.home_status_id}
+    home_status_ids |= set(
+        SampleSetHomeStatus.objects.current()
+        .filter(sampleset_id=instance.sampleset_id)
+        .values_list("home_status_id", flat=True)
+    )
+    EEPProgramHomeStatus.invalidate_requirements_cache(home_status_ids, ["answers", "sampleset"])
+
+
 def update_stats_on_answer(sender, instance, **kwargs):
     if kwargs.get("raw"):
         return
@@ -41,7 +41,12 @@
     PivotalAdminDailyEmail,
 )
 from axis.home.models import EEPProgramHomeStatus
-from axis.home.utils import write_home_program_reports, HomeCertification
+from axis.home.utils import (
+    write_home_program_reports,
+    HomeCertification,
+    HomeStatusProgressBatch,
+    get_sampleset_home_status_ids,
+)
 
 customer_hirl_app = apps.get_app_config("customer_hirl")
 logger = get_task_logger(__name__)
@@ -176,6 +181,9 @@ def export_home_data(self, result_object_id, **kwargs):
     from axis.home.export_data import HomeDataXLSExport
 
     kwargs["task"] = self
+    # Large exports run out of worker memory with a fully built workbook.
+    kwargs.setdefault("streaming", True)
+    kwargs.setdefault("chunk_size", 500)
 
     app_log = LogStorage(model_id=result_object_id)
 
@@ -189,7 +197,7 @@ def export_home_data(self, result_object_id, **kwargs):
 
     export = HomeDataXLSExport(log=app_log, **kwargs)
     new_filename = tempfile.NamedTemporaryFile(
-        delete=True, suffix=".xlsx", prefix="Home-Status-Export_"
+        delete=True, suffix=".{}".format(export.export_format), prefix="Home-Status-Export_"
     )
     export.write(output=new_filename)
 
@@ -288,24 +296,17 @@ def update_home_states(
     else:
         raise ValueError("Provide eepprogramhomestatus_ids or eepprogramhomestatus_id")
 
-    home_statuses = EEPProgramHomeStatus.objects.filter(id__in=home_status_ids)
-
-    sample_set_home_status_ids = []
-    for home_status in home_statuses:
-        ss_statuses = home_status.get_current_sampleset_home_statuses()
-        if len(ss_statuses):
-            sample_set_home_status_ids += list(ss_statuses.values_list("id", flat=True))
-
     user = None
     if user_id:
         user = User.objects.get(id=user_id)
 
     home_statuses = EEPProgramHomeStatus.objects.filter(
-        id__in=set(home_status_ids + sample_set_home_status_ids)
-    ).select_related("eep_program", "customer_hirl_project")
+        id__in=get_sampleset_home_status_ids(home_status_ids)
+    ).select_related("customer_hirl_project")
 
     updated = {}
-    for stat in home_statuses:
+    batch = HomeStatusProgressBatch(home_statuses)
+    for stat in batch:
         while True:
             if stat.eep_program.slug in customer_hirl_app.HIRL_PROJECT_EEP_PROGRAM_SLUGS:
                 next_state_transition = _get_customer_hirl_next_state_transition(
@@ -341,6 +342,8 @@ def update_home_states(
                     except AttributeError:
                         pass
                     updated["%s" % stat.id] = next_state_transition
+                    # The next transition is decided against the new state
+                    batch.prefetch([stat])
             else:
                 # log.debug("Ending")
                 break
@@ -460,26 +463,15 @@ def update_home_stats(**kwargs):
     }
 
     if kwargs.get("eepprogramhomestatus_id"):
-        kwgs["id"] = kwargs.get("eepprogramhomestatus_id")
-        status = EEPProgramHomeStatus.objects.get(id=kwgs["id"])
-        ss_statuses = status.get_current_sampleset_home_statuses()
-        if len(ss_statuses):
-            kwgs["id__in"] = [kwgs["id"]] + list(ss_statuses.values_list("id", flat=True))
-            kwgs.pop("id")
-
+        kwgs["id__in"] = get_sampleset_home_status_ids([kwargs.get("eepprogramhomestatus_id")])
     elif kwargs.get("eepprogramhomestatus_ids") and len(kwargs.get("eepprogramhomestatus_ids")):
-        kwgs["id__in"] = kwargs.get("eepprogramhomestatus_ids")
-        statuses = EEPProgramHomeStatus.objects.filter(id__in=kwgs["id__in"])
-        for status in statuses:
-            ss_statuses = status.get_current_sampleset_home_statuses()
-            if len(ss_statuses):
-                kwgs["id__in"] += list(ss_statuses.values_list("id", flat=True))
+        kwgs["id__in"] = get_sampleset_home_status_ids(kwargs.get("eepprogramhomestatus_ids"))
     else:
         log.warning("Not updating eep program home status must be bound")
         return "Unsuccessful Stat Update.  This needs to be bound by and id or a group of ids."
 
     stats = EEPProgramHomeStatus.objects.filter(**kwgs)
-    for stat in stats:
+    for stat in HomeStatusProgressBatch(stats):
         stat.update_stats()
 
     if stats.count() > 1:
@@ -0,0 +1,137 @@
+"""export_merge.py - Axis
+
+Synthetic export sections for the merge tests.  ``benchmark()`` times the merge engine against
+the previous one on them from a shell:
+
+    from axis.home.tests.export_merge import benchmark
+    benchmark(rows=50000, columns=20, sections=3)
+"""
+
+import inspect
+import logging
+import random
+import timeit
+from collections import OrderedDict
+
+from axis.home.export_data import BaseHomeStatusDataDump, CellObject, CellParser
+
+__author__ = "Steven K"
+__date__ = "10/18/26 10:12"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven K",
+]
+
+log = logging.getLogger(__name__)
+
+
+class BenchmarkDataDump(BaseHomeStatusDataDump):
+    """Only what merging needs - there is no user or queryset behind this"""
+
+    def __init__(self, *args, **kwargs):
+        self.default_none = "-"
+        self.default_true = "Yes"
+        self.default_false = "No"
+        self.join_resulting_values = True
+
+
+class LegacyBenchmarkDataDump(BenchmarkDataDump):
+    """The merge / munge implementations the current ones replaced, kept to measure against"""
+
+    def merge_results(self, baseline_results, structure, key="id"):
+        results = OrderedDict()
+        for result_vals in baseline_results:
+            key_idx = structure.index(next((item for item in structure if item.attr == key)))
+            key_val = result_vals[key_idx]
+            if key_val not in results.keys():
+                results[key_val] = [list(v) + [[], []] for v in structure[:]]
+            result = results[key_val]
+
+            assert len(result_vals) == len(result), "Mismatch in the number of values vs results.."
+
+            for idx, raw_value in enumerate(result_vals):
+                clean_value = raw_value
+                result[idx][-2].append(raw_value)
+                clean_method = result[idx][2]
+                if clean_method:
+                    if callable(clean_method):
+                        clean_value = clean_method(raw_value)
+                    else:
+                        clean_value = getattr(self, clean_method)(raw_value)
+                clean_value = clean_value if clean_value is not None else self.default_none
+                result[idx][-1].append(clean_value)
+
+        for dict_key, source_result_set in results.items():
+            for idx, result in enumerate(source_result_set):
+                if result[0] == key:
+                    assert len(set(result[-2])) == 1
+                    assert len(set(result[-1])) == 1
+                    result[-2] = result[-2][0]
+                    result[-1] = result[-1][0]
+                elif len(result[-1]) > 1 and self.join_resulting_values:
+                    result[-1] = ", ".join(["{}".format(v) for v in result[-1]])
+                elif len(result[-1]) == 1:
+                    result[-1] = result[-1][0]
+                else:
+                    result[-1] = self.default_none
+                source_result_set[idx] = CellObject(*result)
+        return list(results.values())
+
+    def munge_data(self, result_dict, new_data, key="id", verbose=False):
+        for item in new_data:
+            if not len(item):
+                continue
+            _id = next((x for x in item if x.attr == key)).value
+            if verbose and new_data.index(item) == len(new_data) - 1:
+                log.debug("ID %r", _id)
+            if _id not in result_dict:
+                raise ValueError("Unexpected %r (%s)" % (_id, inspect.stack()[1][3]))
+            result_dict[_id] += item
+        return result_dict
+
+
+def get_synthetic_section(rows, columns, section="benchmark", multiples=0.1, seed=None):
+    """Build a structure and raw value list with ``rows`` ids in it.  A share of the ids show up
+    twice (``multiples``) like a home with two associated companies would."""
+    randomizer = random.Random(seed)
+
+    structure = [CellParser("id", "ID", None, section)]
+    for idx in range(1, columns):
+        clean_method = "get_formatted_boolean" if idx % 5 == 0 else None
+        attr = "{}__column_{}".format(section, idx)
+        structure.append(CellParser(attr, "Column {}".format(idx), clean_method, section))
+
+    ids = list(range(1, rows + 1))
+    ids += randomizer.sample(ids, int(rows * multiples))
+    randomizer.shuffle(ids)
+
+    results = []
+    for _id in ids:
+        values = [_id]
+        for idx in range(1, columns):
+            values.append(randomizer.choice([None, idx, "value {}".format(idx), True]))
+        results.append(values)
+    return structure, results
+
+
+def run_merge(dump, structure, results, sections):
+    merged = OrderedDict((x, []) for x in sorted({row[0] for row in results}))
+    for _section in range(sections):
+        data = dump.merge_results(results, structure)
+        merged = dump.munge_data(merged, data)
+    return merged
+
+
+def benchmark(rows=50000, columns=20, sections=3, repeat=3):
+    """Best times (seconds) of the current and previous merge on ``sections`` synthetic sections
+    of ``rows`` ids, along with the speedup"""
+    structure, results = get_synthetic_section(rows, columns, seed=rows)
+    timings = {}
+    for label, dump in [("current", BenchmarkDataDump()), ("legacy", LegacyBenchmarkDataDump())]:
+        timings[label] = min(
+            timeit.repeat(
+                lambda: run_merge(dump, structure, results, sections), repeat=repeat, number=1
+            )
+        )
+    timings["speedup"] = timings["legacy"] / timings["current"]
+    return timings
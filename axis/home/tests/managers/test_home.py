@@ -10,13 +10,22 @@
 import logging
 import time
 
+from django.core import management
+from django.core.management import CommandError
+from django.test import TestCase
+
+from axis.company.tests.factories import base_company_factory
 from axis.core.tests.client import AxisClient
 from axis.core.tests.factories import builder_admin_factory
 from axis.core.tests.testcases import AxisTestCase
+from axis.core.tests.test_views import DevNull
 from axis.geocoder.engines import GEOCODER_ENGINES
 from axis.geocoder.models import Geocode, GeocodeResponse
 from axis.geographic.tests.factories import real_city_factory
-from axis.home.models import Home
+from axis.home.models import Home, HomeVisibility
+from axis.home.tests.factories import eep_program_custom_home_status_factory
+from axis.home.utils import associate_companies_to_homestatus
+from axis.relationship.models import Relationship
 from axis.scheduling.models import ConstructionStage
 
 log = logging.getLogger(__name__)
@@ -302,6 +311,34 @@ def test_basic_verify(self):
         self.assertEqual(home.history.count(), 1)
         self.assertEqual(home.history.get().history_user, self.builder)
 
+    def test_get_geocode_lookup(self):
+        """Uploaded values are normalized the way verify_and_create_for_user() sees them"""
+        lookup = Home.objects.get_geocode_lookup(
+            street_line1=" 291 S Park Grove Ln ",
+            street_line2=" Unit 4 ",
+            city=self.city,
+            zipcode="85296 ",
+            is_multi_family="no",
+        )
+        self.assertEqual(lookup["street_line1"], "291 S Park Grove Ln")
+        self.assertEqual(lookup["street_line2"], "Unit 4")
+        self.assertEqual(lookup["zipcode"], "85296")
+        self.assertEqual(lookup["state"], self.city.state)
+        self.assertEqual(lookup["country"], self.city.country.abbr)
+
+        for is_multi_family in [True, "Yes", "x"]:
+            lookup = Home.objects.get_geocode_lookup(
+                street_line1="291 S Park Grove Ln",
+                street_line2="Unit 4",
+                city=self.city,
+                zipcode="85296",
+                is_multi_family=is_multi_family,
+            )
+            self.assertNotIn("street_line2", lookup)
+
+        self.assertFalse(Home.objects.coerce_multi_family("true"))
+        self.assertFalse(Home.objects.coerce_multi_family(None))
+
     def test_basic_verify_and_create_confirmed(self):
         """Test for verify_and_create_for_user"""
         self.assertEqual(Geocode.objects.count(), 0)
@@ -529,3 +566,68 @@ def test_create_unconfirmed_multi_family(self):
 
         self.assertEqual(Geocode.objects.count(), 1)
         self.assertEqual(GeocodeResponse.objects.count(), len(list(GEOCODER_ENGINES.keys())))
+
+
+class HomeVisibilityTests(TestCase):
+    """The visibility table has to agree with the relationships / associations behind it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = real_city_factory("Ames", "IA")
+        cls.rater = base_company_factory(company_type="rater", city=cls.city)
+        cls.builder = base_company_factory(company_type="builder", city=cls.city)
+        cls.utility = base_company_factory(company_type="utility", city=cls.city)
+        cls.home_status = eep_program_custom_home_status_factory(
+            company=cls.rater,
+            floorplan__owner=cls.rater,
+            home__builder_org=cls.builder,
+            home__city=cls.city,
+        )
+        cls.home = cls.home_status.home
+
+    def get_relationship_home_ids(self, company, show_attached=False):
+        return set(company.relationships.get_homes(show_attached=show_attached).values_list("id"))
+
+    def test_filter_by_company(self):
+        for company in [self.rater, self.builder, self.utility]:
+            for show_attached in [True, False]:
+                self.assertEqual(
+                    set(
+                        Home.objects.filter_by_company(
+                            company, show_attached=show_attached
+                        ).values_list("id")
+                    ),
+                    self.get_relationship_home_ids(company, show_attached=show_attached),
+                )
+        self.assertIn(self.home, Home.objects.filter_by_company(self.builder))
+        self.assertEqual(Home.objects.filter_by_company(self.builder, city=None).count(), 0)
+
+    def test_relationship_removed(self):
+        self.assertTrue(Home.objects.filter_by_company(self.builder).exists())
+        for relationship in self.home.relationships.filter(company=self.builder):
+            relationship.delete()
+        self.assertFalse(Home.objects.filter_by_company(self.builder).exists())
+
+    def test_association(self):
+        self.assertFalse(Home.objects.filter_by_company(self.utility).exists())
+        associate_companies_to_homestatus(self.home_status, self.utility)
+        self.assertIn(self.home, Home.objects.filter_by_company(self.utility))
+        self.assertIn(self.home, Home.objects.filter_by_company(self.utility, city=None))
+
+        self.home_status.associations.all().delete()
+        self.assertFalse(Home.objects.filter_by_company(self.utility).exists())
+
+    def test_rebuild_command(self):
+        management.call_command("rebuild_home_visibility", "--verify", stdout=DevNull())
+
+        Relationship.objects.filter(company=self.rater).update(is_owned=False, is_attached=True)
+        HomeVisibility.objects.filter(company=self.builder).delete()
+        with self.assertRaises(CommandError):
+            management.call_command("rebuild_home_visibility", "--verify", stdout=DevNull())
+
+        management.call_command("rebuild_home_visibility", stdout=DevNull())
+        management.call_command("rebuild_home_visibility", "--verify", stdout=DevNull())
+        self.assertEqual(
+            set(Home.objects.filter_by_company(self.rater).values_list("id")),
+            self.get_relationship_home_ids(self.rater),
+        )
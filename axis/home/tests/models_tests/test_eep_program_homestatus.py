@@ -11,7 +11,7 @@
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Q
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from axis.company.tests.factories import (
@@ -4929,3 +4929,74 @@ def test_annotate_customer_hirl_client_coi_expiration_status(self):
                 ],
                 list(client_coi_statuses),
             )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_get_progress_analysis_cached(self):
+        """The progress analysis is reused until one of the inputs it depends on changes"""
+        home_status = EEPProgramHomeStatus.objects.first()
+        expected = home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+
+        with mock.patch.object(
+            EEPProgramHomeStatus, "get_completion_requirements", return_value=[]
+        ):
+            data = home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+            self.assertEqual(data, expected)
+
+            data = home_status.get_progress_analysis(skip_certification_check=True)
+            self.assertEqual(data["requirements"], {})
+
+            EEPProgramHomeStatus.invalidate_requirements_cache([home_status.id], ["answers"])
+            data = home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+            self.assertEqual(data["requirements"], {})
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_get_progress_analysis_cache_invalidated_by_signal(self):
+        """Changing the floorplans retires the cached progress analysis"""
+        home_status = EEPProgramHomeStatus.objects.first()
+        home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+
+        with mock.patch.object(
+            EEPProgramHomeStatus, "get_completion_requirements", return_value=[]
+        ):
+            home_status.floorplans.clear()
+            data = home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+            self.assertEqual(data["requirements"], {})
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_eligibility_is_not_cached(self):
+        """Eligibility sees inputs the progress cache doesn't track, such as a new QA status"""
+        from axis.certification.utils import (
+            FailingStatusTuple,
+            PassingStatusTuple,
+            requirement_test,
+        )
+        from axis.qa.tests.factories import qa_status_factory
+
+        home_status = EEPProgramHomeStatus.objects.first()
+
+        @requirement_test("QA Pending")
+        def get_qa_pending_status(**kwargs):
+            if home_status.qastatus_set.exists():
+                return FailingStatusTuple(data=None, message="QA is pending", url=None)
+            return PassingStatusTuple(data=None)
+
+        with mock.patch.object(
+            EEPProgramHomeStatus,
+            "get_completion_requirements",
+            return_value=[get_qa_pending_status],
+        ):
+            home_status.get_progress_analysis(skip_certification_check=True, use_cache=True)
+            self.assertTrue(
+                home_status.is_eligible_for_certification(skip_certification_check=True)
+            )
+
+            qa_status_factory(home_status=home_status)
+            self.assertFalse(
+                home_status.is_eligible_for_certification(skip_certification_check=True)
+            )
@@ -1,24 +1,36 @@
 """test_export_data.py - Axis"""
 
+import csv
+import json
 import logging
+import os
 import tempfile
+import unittest
+from unittest import mock
 from decimal import Decimal
 
 from django.apps import apps
 from django.core import management
+from django.test import TestCase, TransactionTestCase
 
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 from axis.checklist.tests.mixins import CollectedInputMixin
 from axis.core.models import User
 from axis.core.tests.test_views import DevNull
-from axis.core.tests.testcases import AxisTestCase
+from axis.core.tests.testcases import AxisTestCase, AxisTestCaseUserMixin
 from axis.customer_hirl.models import HIRLProject, HIRLProjectRegistration
 from axis.customer_hirl.tests.factories import hirl_green_energy_badge_factory
 from axis.eep_program.models import EEPProgram
 from axis.geographic.tests.factories import real_city_factory
-from axis.home.export_data import HomeDataXLSExport, ReportOn
+from axis.home.export_data import CellParser, HomeDataXLSExport, ReportOn
 from axis.home.models import EEPProgramHomeStatus
 from axis.invoicing.models import Invoice, InvoiceItemGroup
 from axis.invoicing.tests.factories import invoice_factory
@@ -383,6 +395,172 @@ def test_values_field_inspectors(self):
         self.assertNotIn(", ", data[0]["Project Status"])
         self.assertNotIn(", ", data[0]["Rater of Record"])
 
+    def test_streaming(self):
+        """The write-only workbook should hold the same table as the in-memory one"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status"]
+
+        obj = HomeDataXLSExport(**kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=kwargs["filename"])
+        expected = self.get_results(kwargs["filename"])
+
+        streaming_filename = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False).name
+        obj = HomeDataXLSExport(streaming=True, **kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=streaming_filename)
+        data = self.get_results(streaming_filename)
+
+        self.assertEqual(len(data), obj.get_queryset().count())
+        self.assertEqual(data, expected)
+
+    def test_sections(self):
+        """Sections are laid out in column order whether or not they are gathered in parallel"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "relationships", "checklist_answers", "simulation_basic"]
+
+        obj = HomeDataXLSExport(parallel_sections=True, **kwargs)
+        obj.update_task = lambda **kw: None
+        sections = obj.get_sections()
+
+        self.assertEqual(
+            [section.label for section in sections],
+            ["Home", "Home Status", "Association", "Checklist Answer", "Simulation Basic"],
+        )
+        self.assertEqual(len(sections[-1].gatherers), 2)
+
+    def test_chunked(self):
+        """Gathering in batches should produce the same table as gathering everything at once"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status", "relationships"]
+
+        obj = HomeDataXLSExport(**kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=kwargs["filename"])
+        expected = self.get_results(kwargs["filename"])
+
+        chunked_filename = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False).name
+        obj = HomeDataXLSExport(chunk_size=1, streaming=True, **kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=chunked_filename)
+        data = self.get_results(chunked_filename)
+
+        self.assertGreater(obj.get_queryset().count(), 1)
+        self.assertEqual(data, expected)
+
+    def test_chunked_pinned_columns(self):
+        """Specified columns kept when empty are known up front, so rows come out of the first
+        batch before the rest are gathered, and the table matches the unbatched one"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status"]
+
+        obj = HomeDataXLSExport(**kwargs)
+        obj.update_task = lambda **kw: None
+        kwargs["specified_columns"] = [column.attr for column in obj.columns[:6]]
+
+        obj = HomeDataXLSExport(**kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=kwargs["filename"])
+        expected = self.get_results(kwargs["filename"])
+
+        obj = HomeDataXLSExport(chunk_size=1, **kwargs)
+        obj.update_task = lambda **kw: None
+        self.assertTrue(obj.has_pinned_columns)
+        with mock.patch.object(obj, "build_datasets", wraps=obj.build_datasets) as build:
+            obj.gather_datasets(report=True)
+            rows = obj.iter_data()
+            next(rows)
+            self.assertEqual(build.call_count, 1)
+            rows.close()
+        self.assertIsNone(obj._spool)
+
+        chunked_filename = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False).name
+        obj = HomeDataXLSExport(chunk_size=1, **kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=chunked_filename)
+        self.assertEqual(self.get_results(chunked_filename), expected)
+
+    def test_chunked_spool_closed(self):
+        """An abandoned read of the spooled rows still closes the spool"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status"]
+
+        obj = HomeDataXLSExport(chunk_size=1, **kwargs)
+        obj.update_task = lambda **kw: None
+        rows = obj.iter_data()
+        next(rows)
+        spool = obj._spool
+        rows.close()
+        self.assertTrue(spool.closed)
+        self.assertIsNone(obj._spool)
+
+    def test_csv(self):
+        """The flat formats carry a single header row and a row per home status"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status"]
+
+        csv_filename = tempfile.NamedTemporaryFile(suffix=".csv", delete=False).name
+        obj = HomeDataXLSExport(export_format="csv", **kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=csv_filename)
+
+        with open(csv_filename, newline="", encoding="utf-8") as fh:
+            rows = list(csv.reader(fh))
+
+        self.assertEqual(len(rows), obj.get_queryset().count() + 1)
+        self.assertIn("Street Line 1", rows[0])
+        self.assertEqual(len({len(row) for row in rows}), 1)
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parquet(self):
+        """Parquet columns are typed when every value agrees and are strings otherwise"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status"]
+
+        parquet_filename = tempfile.NamedTemporaryFile(suffix=".parquet", delete=False).name
+        obj = HomeDataXLSExport(export_format="parquet", **kwargs)
+        obj.update_task = lambda: None
+        obj.write(output=parquet_filename)
+
+        table = pyarrow.parquet.read_table(parquet_filename)
+        self.assertEqual(table.num_rows, obj.get_queryset().count())
+        self.assertIn("Street Line 1", table.column_names)
+
+        self.assertEqual(obj.get_typed_array(["1", "2", None]).type, pyarrow.int64())
+        self.assertEqual(obj.get_typed_array(["1", "2.5"]).type, pyarrow.float64())
+        self.assertEqual(obj.get_typed_array(["$1,200.50", "$3.00"]).type.scale, 2)
+        self.assertEqual(obj.get_typed_array(["01234", "85296"]).type, pyarrow.string())
+        self.assertEqual(obj.get_typed_array(["1", "Yes"]).type, pyarrow.string())
+
+
+class ProjectStatusReportParallelTests(
+    ProjectStatusReportMixin, AxisTestCaseUserMixin, TransactionTestCase
+):
+    """The section pool threads open their own connections so they can only see committed data"""
+
+    def setUp(self):
+        type(self).setUpTestData()
+
+    def test_parallel_matches_serial(self):
+        """Gathering the sections in parallel should produce the same table as one at a time"""
+        kwargs = self.default_kwargs
+        kwargs["report_on"] = ["home", "status", "relationships", "checklist_answers"]
+
+        obj = HomeDataXLSExport(**kwargs)
+        obj.update_task = lambda **kw: None
+        obj.write(output=kwargs["filename"])
+        expected = self.get_results(kwargs["filename"])
+
+        parallel_filename = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False).name
+        obj = HomeDataXLSExport(parallel_sections=True, **kwargs)
+        obj.update_task = lambda **kw: None
+        obj.write(output=parallel_filename)
+        data = self.get_results(parallel_filename)
+
+        self.assertGreater(len(obj.get_sections()), 1)
+        self.assertTrue(len(expected))
+        self.assertEqual(data, expected)
+
 
 class ProjectStatusReportHomeTests(ProjectStatusReportMixin, AxisTestCase):
     def test_report_on_home(self):
@@ -1320,3 +1498,66 @@ def test_report_on_ipp(self):
             "No",
         )
         self.assertEqual(data[0]["Green Building Registry ID"], "Fuddy Duddy")
+
+
+class ProjectStatusReportMergeTests(TestCase):
+    """The merge engine must match the layout of the implementation it replaced"""
+
+    def test_merge_matches_legacy(self):
+        """Compared against the output the previous merge / munge implementation gave"""
+        from axis.home.tests.export_merge import (
+            BenchmarkDataDump,
+            get_synthetic_section,
+            run_merge,
+        )
+
+        structure, results = get_synthetic_section(40, 6, seed=1)
+        current = run_merge(BenchmarkDataDump(), structure, results, 2)
+        current = json.loads(json.dumps([[k, [list(x) for x in v]] for k, v in current.items()]))
+
+        filename = os.path.join(os.path.dirname(__file__), "sources", "export_merge_expected.json")
+        with open(filename) as expected_file:
+            expected = json.load(expected_file)
+        self.assertEqual([x[0] for x in current], [x[0] for x in expected])
+        self.assertEqual(current, expected)
+
+    def test_merge_matches_legacy_implementation(self):
+        """The reference implementation kept for the benchmark agrees on a larger run too"""
+        from axis.home.tests.export_merge import (
+            BenchmarkDataDump,
+            LegacyBenchmarkDataDump,
+            get_synthetic_section,
+            run_merge,
+        )
+
+        def as_lists(merged):
+            return [[k, [list(x) for x in v]] for k, v in merged.items()]
+
+        structure, results = get_synthetic_section(500, 12, seed=2)
+        current = run_merge(BenchmarkDataDump(), structure, results, 3)
+        legacy = run_merge(LegacyBenchmarkDataDump(), structure, results, 3)
+        self.assertEqual(as_lists(current), as_lists(legacy))
+
+    def test_benchmark(self):
+        """Both engines are timed so the speedup shows up in the results"""
+        from axis.home.tests.export_merge import benchmark
+
+        timings = benchmark(rows=200, columns=6, sections=2, repeat=1)
+        self.assertEqual(set(timings), {"current", "legacy", "speedup"})
+        self.assertAlmostEqual(timings["speedup"], timings["legacy"] / timings["current"])
+
+    def test_merge_joins_multiple_values(self):
+        from axis.home.tests.export_merge import BenchmarkDataDump
+
+        structure = [
+            CellParser("id", "ID", None, "test"),
+            CellParser("name", "Name", None, "test"),
+            CellParser("active", "Active", "get_formatted_boolean", "test"),
+        ]
+        results = [(1, "A", True), (2, None, False), (1, "B", False)]
+        data = BenchmarkDataDump().merge_results(results, structure)
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual([x.value for x in data[0]], [1, "A, B", "Yes, No"])
+        self.assertEqual([x.value for x in data[1]], [2, "-", "No"])
+        self.assertEqual(data[0][1].raw_value, ["A", "B"])
@@ -17,7 +17,8 @@
 from axis.geographic.utils.country import resolve_country
 from axis.home.tasks import associate_nightly_companies_to_homestatuses
 from axis.home.tests.factories import eep_program_custom_home_status_factory
-from axis.home.utils import associate_companies_to_homestatuses
+from axis.home.models import EEPProgramHomeStatus
+from axis.home.utils import associate_companies_to_homestatuses, HomeStatusProgressBatch
 
 log = logging.getLogger(__name__)
 
@@ -107,3 +108,53 @@ def test_associate_companies_to_homestatuses_country_location(self):
 
         self.assertEqual(self.home_status.associations.count(), 1)
         self.assertEqual(self.home_status.associations.get().company.pk, self.neea.pk)
+
+    def test_progress_batch(self):
+        """The batch crunched data gives the same analysis as the per home status lookups"""
+        expected = self.home_status.get_progress_analysis(as_list=True, use_cache=False)
+
+        home_statuses = list(HomeStatusProgressBatch(EEPProgramHomeStatus.objects.all()))
+        self.assertEqual(len(home_statuses), 1)
+        home_status = home_statuses[0]
+
+        prefetched = home_status._prefetched_requirement_kwargs
+        self.assertEqual(
+            set(prefetched["accepted_companies"].values_list("id", flat=True)),
+            set(self.home.relationships.get_accepted_companies().values_list("id", flat=True)),
+        )
+        self.assertIsNone(prefetched["samplesethomestatus"])
+
+        data = home_status.get_progress_analysis(as_list=True, use_cache=False)
+        self.assertEqual(data, expected)
+
+    def test_progress_batch_chunks(self):
+        """Every home status comes through in id order, each with its own answers crunched"""
+        second = eep_program_custom_home_status_factory(
+            company=self.rater,
+            eep_program=self.home_status.eep_program,
+            home__builder_org=self.builder,
+            home__city=self.city,
+        )
+
+        batch = HomeStatusProgressBatch(EEPProgramHomeStatus.objects.all(), chunk_size=1)
+        home_statuses = list(batch)
+        self.assertEqual([x.id for x in home_statuses], sorted([self.home_status.id, second.id]))
+
+        for home_status in home_statuses:
+            prefetched = home_status._prefetched_requirement_kwargs
+            self.assertEqual(prefetched["samplesethomestatus"], None)
+            if "answered_question_ids" not in prefetched:
+                continue
+            expected = EEPProgramHomeStatus.objects.get(id=home_status.id)
+            self.assertEqual(
+                set(home_status.get_unanswered_questions().values_list("id", flat=True)),
+                set(expected.get_unanswered_questions().values_list("id", flat=True)),
+            )
+            self.assertEqual(
+                {q.id for q in home_status._get_unanswered_question_list()},
+                set(expected.get_unanswered_questions().values_list("id", flat=True)),
+            )
+            self.assertEqual(
+                [a.id for a in prefetched["answers"]],
+                sorted(expected.get_answers_for_home().values_list("id", flat=True)),
+            )
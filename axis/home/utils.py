@@ -12,7 +12,7 @@
 import logging
 import os
 import time
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from functools import partial
 from io import BytesIO
 from zipfile import ZipFile
@@ -20,6 +20,7 @@
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
 from django.db.models.query_utils import Q
 from django.urls import reverse
 from django.utils.timezone import now
@@ -1233,3 +1234,192 @@ def associate_nightly_companies_to_homestatuses():
             ],
         }
     )
+
+
+def get_sampleset_home_status_ids(home_status_ids):
+    """Home statuses sharing a current sampleset with any of ``home_status_ids`` (included)"""
+    from axis.sampleset.models import SampleSetHomeStatus
+
+    memberships = SampleSetHomeStatus.objects.current().filter(home_status_id__in=home_status_ids)
+    home_status_ids = set(home_status_ids)
+    home_status_ids |= set(
+        SampleSetHomeStatus.objects.current()
+        .filter(sampleset_id__in=memberships.values_list("sampleset_id", flat=True))
+        .values_list("home_status_id", flat=True)
+    )
+    return home_status_ids
+
+
+class HomeStatusProgressBatch(object):
+    """
+    Iterates a queryset of home statuses with the data their requirement checks share crunched up
+    front.  The program owner companies and checklist questions are looked up once per owner or
+    program, and the home relationships, sampleset memberships and checklist answers once per chunk
+    of home statuses, rather than a few queries apiece.
+
+        batch = HomeStatusProgressBatch(queryset)
+        for home_status in batch:
+            home_status.is_eligible_for_certification()
+
+    Anything which changes a home status along the way (a state transition) has to ``prefetch()``
+    it again before it's re-evaluated.
+    """
+
+    def __init__(self, queryset, chunk_size=500):
+        self.queryset = queryset.select_related(
+            "home",
+            "home__subdivision",
+            "company",
+            "eep_program",
+            "eep_program__owner",
+            "floorplan",
+            "floorplan__simulation",
+            "collection_request",
+        ).order_by("id")
+        self.chunk_size = chunk_size
+        self._eep_companies = {}
+        self._program_questions = {}
+
+    def __iter__(self):
+        last_id = 0
+        while True:
+            chunk = list(self.queryset.filter(id__gt=last_id)[: self.chunk_size])
+            if not chunk:
+                break
+            self.prefetch(chunk)
+            yield from chunk
+            last_id = chunk[-1].id
+
+    def __len__(self):
+        return self.queryset.count()
+
+    def get_eep_companies(self, owner):
+        """The companies the program owner has relationships with"""
+        from axis.company.models import Company
+
+        if owner.id not in self._eep_companies:
+            company_ids = owner.relationships.get_companies().values_list("id", flat=True)
+            self._eep_companies[owner.id] = Company.objects.filter(id__in=list(company_ids))
+        return self._eep_companies[owner.id]
+
+    def get_home_companies(self, home_statuses):
+        """Returns {home_id: (accepted_company_ids, unaccepted_company_ids)}"""
+        from django.contrib.contenttypes.models import ContentType
+        from axis.home.models import Home
+        from axis.relationship.models import Relationship
+
+        home_companies = {home_status.home_id: ([], []) for home_status in home_statuses}
+        relationships = Relationship.objects.filter(
+            content_type=ContentType.objects.get_for_model(Home),
+            object_id__in=list(home_companies.keys()),
+        ).values_list("object_id", "company_id", "is_owned", "company__is_customer")
+        for home_id, company_id, is_owned, is_customer in relationships:
+            accepted, unaccepted = home_companies[home_id]
+            if is_owned or not is_customer:
+                accepted.append(company_id)
+            else:
+                unaccepted.append(company_id)
+        return home_companies
+
+    def get_program_questions(self, eep_program):
+        """The checklist questions of the program"""
+        from axis.checklist.models import Question
+
+        if eep_program.id not in self._program_questions:
+            questions = list(Question.objects.filter_by_eep(eep_program))
+            self._program_questions[eep_program.id] = questions
+        return self._program_questions[eep_program.id]
+
+    def get_answers(self, home_statuses):
+        """
+        Returns {home_status_id: (answers, answered_question_ids)} for the checklist (not
+        collection request) home statuses, looked up once per company and program.  Homes which
+        pick up sampleset answers are left out and look theirs up as usual.
+        """
+        from axis.checklist.models import Answer, QAAnswer
+        from axis.home.models import EEPProgramHomeStatus
+
+        home_statuses = [x for x in home_statuses if not x.collection_request_id]
+        sampled_home_ids = set(
+            EEPProgramHomeStatus.objects.filter(home_id__in={x.home_id for x in home_statuses})
+            .in_sampleset()
+            .values_list("home_id", flat=True)
+        )
+
+        groups = defaultdict(list)
+        for home_status in home_statuses:
+            # Like ``filter_by_home_status()`` QA programs never go through sampling
+            if home_status.eep_program.is_qa_program or home_status.home_id not in sampled_home_ids:
+                groups[(home_status.company_id, home_status.eep_program_id)].append(home_status)
+
+        results = {}
+        for group in groups.values():
+            company, eep_program = group[0].company, group[0].eep_program
+            question_ids = [question.id for question in self.get_program_questions(eep_program)]
+            filters = {"question_id__in": question_ids, "home_id__in": {x.home_id for x in group}}
+
+            answers = defaultdict(list)
+            queryset = Answer.objects.filter_by_company(company).filter(**filters).distinct()
+            for answer in queryset.annotate(_measure=F("question__slug")).order_by("id"):
+                answers[answer.home_id].append(answer)
+
+            answered = defaultdict(set)
+            if eep_program.is_qa_program:
+                queryset = QAAnswer.objects.filter_by_company(company).filter(**filters)
+                for home_id, question_id in queryset.values_list("home_id", "question_id"):
+                    answered[home_id].add(question_id)
+            else:
+                for home_id, home_answers in answers.items():
+                    answered[home_id] = {answer.question_id for answer in home_answers}
+
+            for home_status in group:
+                results[home_status.id] = (
+                    answers[home_status.home_id],
+                    answered[home_status.home_id],
+                )
+        return results
+
+    def get_samplesethomestatuses(self, home_statuses):
+        """Returns {home_status_id: SampleSetHomeStatus} for the current memberships"""
+        from axis.sampleset.models import SampleSetHomeStatus
+
+        memberships = (
+            SampleSetHomeStatus.objects.current()
+            .filter(home_status__in=home_statuses)
+            .select_related("sampleset")
+            .order_by("id")
+        )
+        samplesethomestatuses = {}
+        for membership in memberships:
+            if membership.home_status_id in samplesethomestatuses:
+                log.error(
+                    "Multiple SampleSetHomeStatus for HomeStatus: %s", membership.home_status_id
+                )
+                continue
+            samplesethomestatuses[membership.home_status_id] = membership
+        return samplesethomestatuses
+
+    def prefetch(self, home_statuses):
+        """Attaches the crunched data that ``get_completion_test_kwargs()`` picks up"""
+        from axis.company.models import Company
+
+        home_companies = self.get_home_companies(home_statuses)
+        samplesethomestatuses = self.get_samplesethomestatuses(home_statuses)
+        answers = self.get_answers(home_statuses)
+        for home_status in home_statuses:
+            accepted, unaccepted = home_companies[home_status.home_id]
+            home_status._prefetched_requirement_kwargs = {
+                "eep_companies": self.get_eep_companies(home_status.eep_program.owner),
+                "accepted_companies": Company.objects.filter(id__in=accepted),
+                "unaccepted_companies": Company.objects.filter(id__in=unaccepted),
+                "samplesethomestatus": samplesethomestatuses.get(home_status.id),
+            }
+            if home_status.id in answers:
+                home_answers, answered_question_ids = answers[home_status.id]
+                home_status._prefetched_requirement_kwargs.update(
+                    {
+                        "questions": self.get_program_questions(home_status.eep_program),
+                        "answers": home_answers,
+                        "answered_question_ids": answered_question_ids,
+                    }
+                )
@@ -9,14 +9,14 @@
 from django.conf import settings
 
 from django.contrib.auth import get_user_model
+from axis.core.utils import get_previous_day_start_end_times
 from axis.relationship.utils import get_companies_by_path
 from .models import Message
 from .messages import MESSAGE_REGISTRY
 from .utils import (
     send_alert,
     send_read_receipts,
-    get_digest_report,
-    get_digest_email_obj,
+    send_digest_emails,
     get_user_message_preference,
 )
 
@@ -87,8 +87,6 @@ def send_digest_email(**kwargs):
     """
     log = kwargs.get("log", logger)
 
-    user_reports, start, end = get_digest_report()
-
     if settings.SERVER_TYPE not in [
         settings.PRODUCTION_SERVER_TYPE,
         settings.LOCALHOST_SERVER_TYPE,
@@ -96,16 +94,9 @@ def send_digest_email(**kwargs):
         log.warning("Refusing to send digest email for SERVER_TYPE %s", settings.SERVER_TYPE)
         return
 
-    for user_id in user_reports:
-        report = user_reports[user_id]
-        if (
-            report.get("count", 0) == 0
-            or report.get("threshold_display", "Unsubscribed") == "Unsubscribed"
-        ):
-            continue
-        user = User.objects.get(id=user_id)
-        email = get_digest_email_obj(user, report, start, end)
-        email.send()
+    start, end = get_previous_day_start_end_times()
+    sent = send_digest_emails(start, end)
+    log.info("Sent %d digest emails for %s - %s", sent, start, end)
 
 
 @shared_task(ignore_result=True)
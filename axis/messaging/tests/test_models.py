@@ -25,8 +25,14 @@
 from axis.core.tests.factories import rater_user_factory, basic_user_factory
 from .factories import modern_message_registry_factory, message_factory, modern_message_cls_factory
 from ..messages import MESSAGE_CATEGORIES
-from ..models import Message, MessagingPreference
-from ..utils import get_preferences_report, DEFAULT_COMPANY_MESSAGING_PREFERENCES
+from ..models import DigestPreference, Message, MessagingPreference
+from ..serializers import UserDigestSerializer
+from ..utils import (
+    get_preferences_report,
+    iter_digest_reports,
+    send_digest_emails,
+    DEFAULT_COMPANY_MESSAGING_PREFERENCES,
+)
 
 log = logging.getLogger(__name__)
 User = get_user_model()
@@ -703,3 +709,37 @@ def test_send_email_with_disable_email_waffle_switch(self):
             user=rater_common_user,
         )
         self.assertEqual(len(mail.outbox), 0)
+
+
+class DigestEmailTestCase(TestCase):
+    """The batched digest matches the per user serializer"""
+
+    def test_batched_digest(self):
+        start, end = now() - timedelta(days=1), now() + timedelta(minutes=1)
+
+        everything = rater_user_factory()
+        alerts = rater_user_factory(company=everything.company)
+        unsubscribed = rater_user_factory(company=everything.company)
+        DigestPreference.objects.create(user=everything, threshold="all")
+        DigestPreference.objects.create(user=alerts, threshold="alerts")
+
+        for user in (everything, alerts, unsubscribed):
+            message_factory(user=user, sender=everything)
+            message_factory(user=user, sender=everything, date_sent=now())
+
+        reports = dict(iter_digest_reports(start, end, batch_size=2))
+        self.assertEqual(set(reports), {everything.id, alerts.id, unsubscribed.id})
+
+        for user, threshold in ((everything, "all"), (alerts, "alerts"), (unsubscribed, "")):
+            context = {"start": start, "end": end, "threshold": threshold}
+            self.assertEqual(
+                reports[user.id], dict(UserDigestSerializer(user, context=context).data)
+            )
+        self.assertEqual(reports[everything.id]["count"], 2)
+        self.assertEqual(reports[alerts.id]["count"], 1)
+        self.assertEqual(reports[unsubscribed.id]["count"], 0)
+
+        self.assertEqual(send_digest_emails(start, end, chunk_size=1), 2)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox), sorted([everything.email, alerts.email])
+        )
@@ -23,9 +23,9 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.contenttypes.models import ContentType
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db.models import Count
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
@@ -40,6 +40,10 @@
 log = logging.getLogger(__name__)
 User = get_user_model()
 
+# Users worked through per digest query batch, and emails handed to the mail connection at once
+DIGEST_BATCH_SIZE = 500
+DIGEST_EMAIL_CHUNK_SIZE = 50
+
 SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
 
 DEFAULT_MESSAGE_TITLES = {
@@ -470,20 +474,19 @@ def get_digest_report(user_id=None):
     from .models import Message, DigestPreference
     from .serializers import UserDigestSerializer
 
-    report = {}
-
     start, end = get_previous_day_start_end_times()
-    all_messages = Message.objects.since(start, end)
 
-    if user_id is not None:
-        all_messages = all_messages.filter(user__id=user_id)
+    if user_id is None:
+        report = dict(iter_digest_reports(start, end))
+        return report, start, end
 
+    all_messages = Message.objects.since(start, end).filter(user__id=user_id)
     per_user_report = all_messages.values("user").annotate(n=Count("user")).filter(n__gt=0)
     serializer_context = {
         "start": start,
         "end": end,
     }
-    if user_id and not per_user_report:
+    if not per_user_report:
         user = User.objects.get(id=user_id)
         preference, created = DigestPreference.objects.get_or_create(user=user)
         serializer_context["threshold"] = preference.threshold
@@ -495,12 +498,64 @@ def get_digest_report(user_id=None):
         preference, created = DigestPreference.objects.get_or_create(user=user)
         serializer_context["threshold"] = preference.threshold
         breakdown = UserDigestSerializer(user, context=serializer_context).data
+        return breakdown, start, end
+
+
+def iter_digest_reports(start, end, user_ids=None, batch_size=DIGEST_BATCH_SIZE):
+    """
+    Yields ``(user_id, report)`` for every user with messages between ``start`` and ``end``, with
+    the same report ``UserDigestSerializer`` builds.  Users are worked through ``batch_size`` at a
+    time - one grouped query finds them, and each batch costs one preference query plus one
+    message query per threshold in use.  A missing preference is reported as unsubscribed.
+    """
+    from .models import Message, DigestPreference
+    from .serializers import MessageSerializer
+
+    threshold_displays = dict(DigestPreference.DIGEST_CHOICES)
+    unsubscribed = DigestPreference.UNSUBSCRIBED_DIGEST_THRESHOLD
+
+    all_messages = Message.objects.since(start, end)
+    if user_ids is not None:
+        all_messages = all_messages.filter(user_id__in=user_ids)
+
+    per_user_report = (
+        all_messages.values("user")
+        .annotate(n=Count("id"))
+        .filter(n__gt=0)
+        .order_by("user")
+        .values_list("user", flat=True)
+    )
+    per_user_report = list(per_user_report)
 
-        if user_id:
-            return breakdown, start, end
+    for idx in range(0, len(per_user_report), batch_size):
+        batch = per_user_report[idx : idx + batch_size]
+        thresholds = dict(
+            DigestPreference.objects.filter(user_id__in=batch).values_list("user_id", "threshold")
+        )
 
-        report[entry["user"]] = breakdown
-    return report, start, end
+        by_threshold = {}
+        for user_id in batch:
+            by_threshold.setdefault(thresholds.get(user_id, unsubscribed), []).append(user_id)
+
+        messages = {}
+        for threshold, threshold_user_ids in by_threshold.items():
+            if threshold == unsubscribed:
+                continue
+            queryset = (
+                all_messages.filter(user_id__in=threshold_user_ids)
+                .threshold(threshold)
+                .select_related("user")
+            )
+            for item in MessageSerializer(queryset, many=True).data:
+                messages.setdefault(item["user"], []).append(item)
+
+        for user_id in batch:
+            user_messages = messages.get(user_id, [])
+            yield user_id, {
+                "messages": user_messages,
+                "count": len(user_messages),
+                "threshold_display": threshold_displays.get(thresholds.get(user_id, unsubscribed)),
+            }
 
 
 def get_simple_hostname():
@@ -586,22 +641,29 @@ def get_notification_email_obj(message, required=False):
     return msg
 
 
-def get_digest_email_obj(user, report, start, stop):
-    from_email = settings.DEFAULT_FROM_EMAIL
-
+def get_digest_email_context(start, stop):
+    """The part of the digest email context every recipient shares"""
     server_domain = (
         "{}".format(settings.SERVER_TYPE)
         if settings.SERVER_TYPE != settings.PRODUCTION_SERVER_TYPE
         else "axis"
     )
-    context = {
-        "user": user,
-        "report": report,
+    return {
         "start_date": start,
         "end_date": stop,
         "domain": "%s.pivotalenergy.net" % server_domain,
     }
 
+
+def get_digest_email_obj(user, report, start, stop, shared_context=None, templates=None):
+    """Build the digest email for ``user``.  Batched senders pass in ``shared_context`` (see
+    ``get_digest_email_context``) and the loaded ``(text, html)`` templates to reuse them."""
+    from_email = settings.DEFAULT_FROM_EMAIL
+
+    if shared_context is None:
+        shared_context = get_digest_email_context(start, stop)
+    context = dict(shared_context, user=user, report=report)
+
     new_report = report.copy()
     for idx, item in enumerate(new_report.get("messages")[:]):
         content = re.sub(
@@ -611,8 +673,13 @@ def get_digest_email_obj(user, report, start, stop):
         new_report["messages"][idx] = item
     context["report"] = new_report
 
-    text_message = render_to_string("messaging/digest_email.txt", context)
-    html_message = render_to_string("messaging/digest_email.html", context)
+    if templates is None:
+        text_message = render_to_string("messaging/digest_email.txt", context)
+        html_message = render_to_string("messaging/digest_email.html", context)
+    else:
+        text_template, html_template = templates
+        text_message = text_template.render(context)
+        html_message = html_template.render(context)
 
     msg = EmailMultiAlternatives(
         subject="Axis Notifications Digest",
@@ -624,6 +691,50 @@ def get_digest_email_obj(user, report, start, stop):
     return msg
 
 
+def send_digest_emails(start, end, user_ids=None, chunk_size=DIGEST_EMAIL_CHUNK_SIZE):
+    """Send the digest to everybody with something in it.  Templates and the shared context are
+    loaded once and the mail goes out ``chunk_size`` at a time over a single connection.  Returns
+    the number of emails sent."""
+    shared_context = get_digest_email_context(start, end)
+    templates = (
+        get_template("messaging/digest_email.txt"),
+        get_template("messaging/digest_email.html"),
+    )
+
+    def iter_emails():
+        reports = (
+            (user_id, report)
+            for user_id, report in iter_digest_reports(start, end, user_ids=user_ids)
+            if report.get("count", 0) and report.get("threshold_display") != "Unsubscribed"
+        )
+        while True:
+            batch = [item for _, item in zip(range(DIGEST_BATCH_SIZE), reports)]
+            if not batch:
+                return
+            users = User.objects.in_bulk([user_id for user_id, _ in batch])
+            for user_id, report in batch:
+                yield get_digest_email_obj(
+                    users[user_id],
+                    report,
+                    start,
+                    end,
+                    shared_context=shared_context,
+                    templates=templates,
+                )
+
+    sent = 0
+    with get_connection() as connection:
+        chunk = []
+        for email in iter_emails():
+            chunk.append(email)
+            if len(chunk) >= chunk_size:
+                sent += connection.send_messages(chunk) or 0
+                chunk = []
+        if chunk:
+            sent += connection.send_messages(chunk) or 0
+    return sent
+
+
 @shared_task(time_limit=60 * 5, default_retry_delay=15, max_retries=3, ignore_result=True)
 def send_message_task(
     message_id: int,
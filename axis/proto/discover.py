@@ -445,6 +445,13 @@ def axis_merge(self, obj, to):
         move_documents = obj.customer_documents.all()
         move_documents.update(object_id=to.id)
 
+        # The moves above skip the signals that keep this current
+        from axis.home.models import HomeVisibility
+        from axis.search.models import SearchDocument
+
+        HomeVisibility.objects.sync([obj.id, to.id])
+        SearchDocument.objects.sync_objects({to.__class__: [obj.id, to.id]})
+
 
 class StrictHomeDiscoverer(HomeDiscoverer):
     def filter_candidate_queryset(self, proto_obj, queryset, **kwargs):
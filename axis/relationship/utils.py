@@ -334,6 +334,14 @@ def _create_or_update_spanning_relationship_for_obj(
                     content_type=ContentType.objects.get_for_model(target_obj),
                     object_id=target_obj.id,
                 ).update(is_viewable=False, is_attached=False)
+                if target_obj._meta.label == "home.Home":
+                    from axis.home.models import HomeVisibility
+
+                    HomeVisibility.objects.sync([target_obj.id])
+
+                from axis.search.models import SearchDocument
+
+                SearchDocument.objects.sync_objects({target_obj.__class__: [target_obj.id]})
             else:
                 log.debug(
                     "Deleting {} relationships {} for {}".format(
@@ -0,0 +1,61 @@
+"""Fills in the similarity hash used to find similar and reference REM/Rate simulations."""
+
+import logging
+
+from django.core.management import BaseCommand
+
+from ...models import Simulation
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 15:10"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Backfill ``Simulation.similarity_hash``"""
+
+    help = "Fills in the similarity hash used to find similar and reference REM/Rate simulations."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        """Add our own arguments"""
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="recompute",
+            help="Recompute the hash on every simulation, not only those missing it",
+        )
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            type=int,
+            default=2000,
+            help="Simulations updated per query",
+        )
+
+    def handle(self, recompute=False, batch_size=2000, **options):
+        simulations = Simulation.objects.filter(building__building_info__isnull=False)
+        if not recompute:
+            simulations = simulations.filter(similarity_hash__isnull=True)
+        simulations = simulations.select_related("building__building_info").order_by("id")
+
+        total, updated, batch = simulations.count(), 0, []
+        for simulation in simulations.iterator(chunk_size=batch_size):
+            similarity_hash = simulation.get_similarity_hash()
+            if similarity_hash == simulation.similarity_hash:
+                continue
+            simulation.similarity_hash = similarity_hash
+            batch.append(simulation)
+            if len(batch) >= batch_size:
+                updated += Simulation.objects.bulk_update(batch, ["similarity_hash"])
+                batch = []
+        if batch:
+            updated += Simulation.objects.bulk_update(batch, ["similarity_hash"])
+
+        self.stdout.write("Updated the similarity hash on %d of %d simulations" % (updated, total))
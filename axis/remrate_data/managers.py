@@ -217,6 +217,7 @@ def filter_similar(
     ):
         """Returns similar simulations"""
         from .models import DESIGN_MODELS, REFERENCE_MODELS
+        from .models.simulation import SIMILARITY_BUILDING_INFO_FIELDS
 
         start_date_filter = (
             start_date_filter
@@ -231,22 +232,25 @@ def filter_similar(
 
         _kw = kwargs.copy()
 
-        kwargs = dict(
-            company=base.company,
-            remrate_user=base.remrate_user,
+        # Company, user, rating number and building info all fold into the similarity hash
+        similarity_hash = base.get_similarity_hash()
+        if similarity_hash is None:
+            return self.none()
+
+        # Simulations which haven't been hashed yet (backfill_similarity_hash) are compared on
+        # the underlying fields like they used to be.
+        unhashed = dict(
+            similarity_hash__isnull=True,
+            company=base.company_id,
+            remrate_user=base.remrate_user_id,
             rating_number=base.rating_number,
-            building__building_info__volume=base.building.building_info.volume,
-            building__building_info__conditioned_area=base.building.building_info.conditioned_area,
-            building__building_info__type=base.building.building_info.type,
-            building__building_info__house_level_type=base.building.building_info.house_level_type,
-            building__building_info__number_stories=base.building.building_info.number_stories,
-            building__building_info__foundation_type=base.building.building_info.foundation_type,
-            building__building_info__number_bedrooms=base.building.building_info.number_bedrooms,
-            building__building_info__num_units=base.building.building_info.num_units,
-            building__building_info__year_built=base.building.building_info.year_built,
-            building__building_info__thermal_boundary=base.building.building_info.thermal_boundary,
         )
-        kwargs.update(**_kw)
+        building_info = base.building.building_info
+        for name in SIMILARITY_BUILDING_INFO_FIELDS:
+            unhashed["building__building_info__{}".format(name)] = getattr(building_info, name)
+        similar = Q(similarity_hash=similarity_hash) | Q(**unhashed)
+
+        kwargs = dict(**_kw)
 
         if use_date_range:
             start_date = base.building.created_on - datetime.timedelta(**start_date_filter)
@@ -264,12 +268,13 @@ def filter_similar(
 
             kwargs["export_type__in"] = [1] + DESIGN_MODELS
             if include_self:
-                return self.filter(**kwargs).distinct()
+                return self.filter(similar, **kwargs).distinct()
             else:
-                return self.filter(**kwargs).exclude(id=base.id).distinct()
+                return self.filter(similar, **kwargs).exclude(id=base.id).distinct()
 
         # Note include self doesn't make any logical sense here so it's not available.
-        return self.filter(export_type=export_type, **kwargs).exclude(id=base.id).distinct()
+        queryset = self.filter(similar, export_type=export_type, **kwargs)
+        return queryset.exclude(id=base.id).distinct()
 
     def filter_references(self, base, *args, **kwargs):
         """Returns similar simulations"""
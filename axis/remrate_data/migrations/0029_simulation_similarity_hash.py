@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("remrate_data", "0028_remrate_16p3p4"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalsimulation",
+            name="similarity_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="simulation",
+            name="similarity_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=40, null=True),
+        ),
+    ]
@@ -58,6 +58,20 @@
 REFERENCE_MODELS = [x[0] for x in SIMULATION_EXPORT_PAIRS]
 DESIGN_MODELS = [x[1] for x in SIMULATION_EXPORT_PAIRS]
 
+# The building info which has to match for simulations to be considered similar
+SIMILARITY_BUILDING_INFO_FIELDS = [
+    "volume",
+    "conditioned_area",
+    "type",
+    "house_level_type",
+    "number_stories",
+    "foundation_type",
+    "number_bedrooms",
+    "num_units",
+    "year_built",
+    "thermal_boundary",
+]
+
 
 class Simulation(models.Model):
     """The Simulation Table"""
@@ -90,6 +104,9 @@ class Simulation(models.Model):
     references = models.ManyToManyField("self", symmetrical=False, related_name="base_building")
     similar = models.ManyToManyField("self")
 
+    # See get_similarity_hash()
+    similarity_hash = models.CharField(max_length=40, blank=True, null=True, db_index=True)
+
     objects = SimulationManager()
     history = HistoricalRecords()  # This is only here to track deletions.
 
@@ -264,6 +281,32 @@ def _get_similar(self):
             building__building_info__thermal_boundary=self.building.building_info.thermal_boundary,
         ).filter(building__created_on__lte=end_date)
 
+    def get_similarity_hash(self):
+        """A fingerprint of everything ``filter_similar()`` needs to match on, other than dates.
+        Returns None when there's no building info to go by."""
+        try:
+            building_info = self.building.building_info
+        except ObjectDoesNotExist:
+            return None
+        if building_info is None:
+            return None
+
+        # Values assigned in memory (Decimal, int for a float field..) have to hash the same as
+        # they will when read back from the database.
+        values = [self.company_id, self.remrate_user_id, self.rating_number]
+        for name in SIMILARITY_BUILDING_INFO_FIELDS:
+            field = building_info._meta.get_field(name)
+            values.append(field.to_python(getattr(building_info, name)))
+        return hashlib.sha1(repr(values).encode("utf-8")).hexdigest()
+
+    def update_similarity_hash(self):
+        """Stores the current similarity hash without going through save()"""
+        similarity_hash = self.get_similarity_hash()
+        if similarity_hash != self.similarity_hash:
+            self.similarity_hash = similarity_hash
+            self._meta.model.objects.filter(pk=self.pk).update(similarity_hash=similarity_hash)
+        return similarity_hash
+
     def assign_references_and_similar(
         self, dry_run=False, clear_existing=False, only_affect_self=False
     ):
@@ -273,6 +316,7 @@ def assign_references_and_similar(
         Any "design" home will only get bound to the pairing reference
 
         """
+        self.update_similarity_hash()
         objects = self._meta.model.objects.filter_similar(self, include_self=True)
         # log.debug("Object IDs:  %r", objects.values_list('pk', flat=True))
         _reference, _similar = [], []
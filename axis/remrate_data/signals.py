@@ -0,0 +1,48 @@
+"""signals.py: Django remrate_data"""
+
+
+import logging
+
+from django.db.models.signals import post_save
+
+from axis.remrate_data.models import Building, BuildingInfo, Simulation
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 15:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+def register_signals():
+    """Nested to avoid tangling import during initial load."""
+
+    post_save.connect(update_similarity_hash_on_simulation, sender=Simulation)
+    post_save.connect(update_similarity_hash_on_building, sender=Building)
+    post_save.connect(update_similarity_hash_on_building_info, sender=BuildingInfo)
+
+
+def update_similarity_hash_on_simulation(sender, instance, raw=False, **kwargs):
+    """Company, user and rating number are all part of the similarity hash"""
+    if raw:
+        return
+    instance.update_similarity_hash()
+
+
+def update_similarity_hash_on_building(sender, instance, raw=False, **kwargs):
+    """The building is what ties the simulation to its building info"""
+    if raw or not instance.building_info_id:
+        return
+    Simulation.objects.get(id=instance.simulation_id).update_similarity_hash()
+
+
+def update_similarity_hash_on_building_info(sender, instance, raw=False, **kwargs):
+    """Building info changes which simulations are similar"""
+    if raw:
+        return
+    simulation = Simulation.objects.filter(building__building_info=instance).first()
+    if simulation:
+        simulation.update_similarity_hash()
@@ -4,8 +4,8 @@
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils.timezone import now
 from simple_history.utils import update_change_reason
 from simulation.models import get_or_import_rem_simulation
@@ -21,6 +21,8 @@
 
 logger = get_task_logger(__name__)
 
+PRUNE_BATCH_SIZE = 500
+
 
 @shared_task(time_limit=60 * 3)
 def assign_references_and_similar_simulation_models(**kwargs):
@@ -38,9 +40,50 @@ def assign_references_and_similar_simulation_models(**kwargs):
     return results if len(results) else "No assignments over."
 
 
+def get_unused_simulations(simulations):
+    """Narrow ``simulations`` down to the ones nobody depends on, in a single query.
+
+    A simulation is in use when it has a floorplan, or when one of its references / designs sits
+    on a floorplan that is attached to a home status.  Any floorplan counts as user work on the
+    simulation itself - the old row by row check tested ``floorplan.customer_documents``, a related
+    manager which is always truthy, and we keep that conservative behaviour.
+    """
+    from axis.floorplan.models import Floorplan
+
+    Link = Simulation.references.through
+    used = Simulation.objects.filter(
+        Q(floorplan__active_for_homestatuses__isnull=False)
+        | Q(floorplan__homestatuses__isnull=False)
+    ).values("pk")
+
+    return Simulation.objects.filter(pk__in=simulations.values("pk")).filter(
+        ~Exists(Floorplan.objects.filter(remrate_target=OuterRef("pk"))),
+        ~Exists(Link.objects.filter(from_simulation=OuterRef("pk"), to_simulation__in=used)),
+        ~Exists(Link.objects.filter(to_simulation=OuterRef("pk"), from_simulation__in=used)),
+    )
+
+
+def get_linked_simulation_ids(simulation_ids, batch_size=PRUNE_BATCH_SIZE):
+    """The references and designs of ``simulation_ids``, which go along with them"""
+    Link = Simulation.references.through
+    simulation_ids = list(simulation_ids)
+    linked = set()
+    for idx in range(0, len(simulation_ids), batch_size):
+        batch = simulation_ids[idx : idx + batch_size]
+        links = Link.objects.filter(Q(from_simulation_id__in=batch) | Q(to_simulation_id__in=batch))
+        for from_id, to_id in links.values_list("from_simulation_id", "to_simulation_id"):
+            linked.update([from_id, to_id])
+    return linked
+
+
 @shared_task(time_limit=60 * 60)
 def prune_failed_simulation_models(min_lookback_days=7, max_lookback_days=45, **kwargs):
-    """This looks towards each simulation and if it failed and is unused get rid of it."""
+    """This looks towards each simulation and if it failed and is unused get rid of it.
+
+    Usage is worked out for every candidate up front, so only the unused ones get validated and
+    the removals happen ``batch_size`` at a time.
+    """
+    batch_size = kwargs.get("batch_size", PRUNE_BATCH_SIZE)
     last_update_gte = now() - datetime.timedelta(days=max_lookback_days)
     last_update_lt = now() - datetime.timedelta(days=min_lookback_days)
 
@@ -51,86 +94,20 @@ def prune_failed_simulation_models(min_lookback_days=7, max_lookback_days=45, **
         | Q(floorplan__active_for_homestatuses__isnull=True)
         | Q(floorplan__homestatuses__isnull=True),
     )
+    total = simulations.values("pk").distinct().count()
+    logger.debug(f"Found {total} simulations to review")
 
-    logger.debug(f"Found {simulations.count()} simulations to review")
-    to_be_deleted = []
-    for simulation in simulations:
+    unused = get_unused_simulations(simulations).select_related("building")
+    failed_ids = []
+    for simulation in unused.iterator(chunk_size=batch_size):
         errors = simulation.get_validation_errors()
         if errors:
             logger.debug(
-                f"Simulation {simulation.pk} has {len(errors)} validation errors, will delete if unused"
+                f"Simulation {simulation.pk} has {len(errors)} validation errors and is unused"
             )
-            deletion_ids = [simulation.id]
-            try:
-                # Did the user do more than simply accept defaults
-                if (
-                    simulation.floorplan.remrate_data_file
-                    or simulation.floorplan.customer_documents
-                    or simulation.floorplan.comment
-                ):
-                    logger.debug(
-                        f"Will not delete Simulation {simulation.pk} - it has a floorplan with remrate_data_file, customer_documents or comment"
-                    )
-                    continue
-            except ObjectDoesNotExist:
-                pass
-
-            try:
-                if simulation.floorplan.active_for_homestatuses.count():
-                    logger.debug(
-                        f"Will not delete Simulation {simulation.pk} - it has simulation.floorplan.active_for_homestatuses"
-                    )
-                    continue
-            except ObjectDoesNotExist:
-                pass
-
-            try:
-                if simulation.floorplan.homestatuses.count():
-                    logger.debug(
-                        f"Will not delete Simulation {simulation.pk} - it has simulation.floorplan.homestatuses"
-                    )
-                    continue
-            except ObjectDoesNotExist:
-                pass
-
-            used = False
-            # Are there references and if so are any of them used.
-            refs = list(simulation.references.all()) + list(simulation.base_building.all())
-            if len(refs):
-                ref_ids = [ref.id for ref in refs]
-                logger.debug(
-                    f"Simulation {simulation.pk} has references to ({', '.join(map(str, ref_ids))}), checking whether they are used as well"
-                )
-            for ref in refs:
-                deletion_ids.append(ref.id)
-
-                try:
-                    if ref.floorplan.active_for_homestatuses.count():
-                        logger.debug(
-                            f"Simulation {simulation.pk} won't be deleted - ref {ref.id} has floorplan.active_for_homestatuses"
-                        )
-                        used = True
-                        break
-                except ObjectDoesNotExist:
-                    pass
-
-                try:
-                    if ref.floorplan.homestatuses.count():
-                        logger.debug(
-                            f"Simulation {simulation.pk} won't be deleted - ref {ref.id} has floorplan.homestatuses"
-                        )
-                        used = True
-                        break
-                except ObjectDoesNotExist:
-                    pass
-
-            if not used:
-                logger.debug(
-                    f"Adding ({', '.join(map(str, deletion_ids))} to set of IDs to be deleted"
-                )
-                to_be_deleted += deletion_ids
-
-    to_be_deleted = sorted(list(set(to_be_deleted)))
+            failed_ids.append(simulation.pk)
+
+    to_be_deleted = sorted(set(failed_ids) | get_linked_simulation_ids(failed_ids, batch_size))
 
     if not to_be_deleted:
         logger.debug("Nothing to be done.")
@@ -140,8 +117,11 @@ def prune_failed_simulation_models(min_lookback_days=7, max_lookback_days=45, **
         logger.debug("return_ids is set, so we will not actually delete any Simulations")
         return to_be_deleted
 
-    for sim in Simulation.objects.filter(id__in=to_be_deleted).all():
-        sim.delete()
-        update_change_reason(sim, "axis.remrate_data.tasks.prune_failed_simulation_models")
+    for idx in range(0, len(to_be_deleted), batch_size):
+        batch = to_be_deleted[idx : idx + batch_size]
+        with transaction.atomic():
+            for sim in Simulation.objects.filter(id__in=batch):
+                sim.delete()
+                update_change_reason(sim, "axis.remrate_data.tasks.prune_failed_simulation_models")
 
-    return f"Removed {len(to_be_deleted)}/{simulations.count()} simulations between {last_update_gte} - {last_update_lt}"
+    return f"Removed {len(to_be_deleted)}/{total} simulations between {last_update_gte} - {last_update_lt}"
@@ -1,7 +1,11 @@
 """test_models.py: Django remrate_data"""
 
 import datetime
+import io
 import logging
+from decimal import Decimal
+
+from django.core.management import call_command
 
 from axis.core.tests.client import AxisClient
 from axis.core.tests.testcases import AxisTestCase
@@ -250,6 +254,56 @@ def test_similar(self):
         self.assertEqual(similar.count(), 1)
         self.assertEqual(Simulation.objects.filter_similar(base, include_self=True).count(), 2)
 
+    def test_similarity_hash(self):
+        """The stored hash is kept up to date and shared only by similar simulations"""
+        similar = Simulation.objects.filter(rating_number="Similar")
+        hashes = set(similar.values_list("similarity_hash", flat=True))
+        self.assertEqual(len(hashes), 1)
+        self.assertEqual(hashes, {similar.first().get_similarity_hash()})
+        self.assertIsNotNone(hashes.pop())
+
+        other = Simulation.objects.get(rating_number="Not Similar")
+        self.assertNotIn(other.similarity_hash, similar.values_list("similarity_hash", flat=True))
+
+        building_info = other.building.building_info
+        building_info.number_bedrooms = (building_info.number_bedrooms or 0) + 1
+        building_info.save()
+        other.refresh_from_db()
+        self.assertEqual(other.similarity_hash, other.get_similarity_hash())
+
+        Simulation.objects.filter(id=other.id).update(similarity_hash=None)
+        call_command("backfill_similarity_hash", stdout=io.StringIO())
+        self.assertEqual(
+            Simulation.objects.get(id=other.id).similarity_hash, other.get_similarity_hash()
+        )
+
+    def test_similar_unhashed(self):
+        """Simulations from before the hash was backfilled are still found"""
+        base = Simulation.objects.filter(rating_number="Similar").first()
+        expected = set(Simulation.objects.filter_similar(base).values_list("id", flat=True))
+        self.assertEqual(len(expected), 1)
+
+        Simulation.objects.exclude(id=base.id).update(similarity_hash=None)
+        similar = Simulation.objects.filter_similar(base)
+        self.assertEqual(set(similar.values_list("id", flat=True)), expected)
+
+        other = Simulation.objects.get(rating_number="Not Similar")
+        self.assertNotIn(other, Simulation.objects.filter_similar(base, use_date_range=False))
+
+    def test_similarity_hash_normalized(self):
+        """Values assigned in memory hash the same as they do once read back"""
+        simulation = Simulation.objects.get(rating_number="Not Similar")
+        building_info = simulation.building.building_info
+        building_info.volume = 12000
+        building_info.conditioned_area = Decimal("1500.0")
+        building_info.number_bedrooms = 3.0
+        building_info.year_built = None
+        building_info.save()
+
+        reloaded = Simulation.objects.get(id=simulation.id)
+        self.assertEqual(reloaded.get_similarity_hash(), simulation.get_similarity_hash())
+        self.assertEqual(reloaded.similarity_hash, simulation.get_similarity_hash())
+
     def test_similar_exclude_dates(self):
         """This tests the filter to grab the last related simulation"""
         base = Simulation.objects.filter(rating_number="Similar").first()
@@ -8,7 +8,7 @@
 from axis.core.tests.testcases import AxisTestCase
 from axis.floorplan.models import Floorplan
 from axis.remrate_data.models import Building, Simulation
-from axis.remrate_data.tasks import prune_failed_simulation_models
+from axis.remrate_data.tasks import get_unused_simulations, prune_failed_simulation_models
 from axis.remrate_data.tests.factories import simulation_factory
 from ...eep_program.tests.factories import basic_eep_program_factory
 from ...floorplan.tests.factories import floorplan_factory
@@ -254,3 +254,13 @@ def test_time_window_multiple_references_with_home_status(self):
         self.assertEqual(Simulation.objects.count(), 6)
 
         self.assertEqual(Simulation.objects.filter(rating_number="multiple_ref_design").count(), 3)
+
+    def test_get_unused_simulations(self):
+        """A simulation is used through its own floorplan or a linked simulation's home status"""
+        sim = Simulation.objects.get(export_type=4, rating_number="multiple_ref_design")
+        self.assertEqual(get_unused_simulations(Simulation.objects.all()).count(), 6)
+
+        Floorplan.objects.update(remrate_target=sim)
+        unused = get_unused_simulations(Simulation.objects.all())
+        self.assertEqual(unused.count(), 3)
+        self.assertFalse(unused.filter(rating_number="multiple_ref_design").exists())
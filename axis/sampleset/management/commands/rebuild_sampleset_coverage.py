@@ -0,0 +1,58 @@
+"""Rebuilds the answer coverage index samplesets use to find covered and uncovered questions."""
+
+import logging
+
+from django.core.management import BaseCommand
+
+from ...models import SampleSet
+from ...utils import rebuild_sampleset_coverage
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 17:55"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Backfill / repair ``SampleSetAnswerCoverage``"""
+
+    help = "Rebuilds the answer coverage index samplesets use to find uncovered questions."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        """Add our own arguments"""
+        parser.add_argument(
+            "--sampleset",
+            action="append",
+            dest="sampleset_ids",
+            type=int,
+            help="Only rebuild these samplesets (may be repeated)",
+        )
+        parser.add_argument(
+            "--confirmed",
+            action="store_true",
+            dest="include_confirmed",
+            help="Include samplesets which have already been confirmed",
+        )
+
+    def handle(self, sampleset_ids=None, include_confirmed=False, **options):
+        samplesets = SampleSet.objects.order_by("id")
+        if sampleset_ids:
+            samplesets = samplesets.filter(id__in=sampleset_ids)
+        elif not include_confirmed:
+            samplesets = samplesets.filter(confirm_date__isnull=True)
+
+        added = removed = 0
+        for sampleset in samplesets.iterator():
+            _added, _removed = rebuild_sampleset_coverage(sampleset)
+            added += _added
+            removed += _removed
+
+        self.stdout.write(
+            "Rebuilt coverage on %d samplesets (%d added, %d removed)"
+            % (samplesets.count(), added, removed)
+        )
@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("checklist", "0021_alter_historicalanswer_options_and_more"),
+        ("sampleset", "0004_alter_historicalsampleset_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SampleSetAnswerCoverage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("source", "Offered by a test home"),
+                            ("contributed", "Contributed by advance"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "answer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sampleset_coverage",
+                        to="checklist.answer",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="checklist.question",
+                    ),
+                ),
+                (
+                    "sampleset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answer_coverage",
+                        to="sampleset.sampleset",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sample Set Answer Coverage",
+                "verbose_name_plural": "Sample Set Answer Coverage",
+                "unique_together": {("sampleset", "answer", "kind")},
+                "indexes": [
+                    models.Index(
+                        fields=["sampleset", "kind", "question"],
+                        name="sampleset_s_samples_b9242a_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2 on 2026-10-18 21:40
+
+from django.db import migrations
+
+
+def get_source_answer_rows(Answer, EEPProgram, test_home_statuses, program_questions):
+    """A frozen copy of ``axis.sampleset.utils.get_homestatus_test_answers()``"""
+    rows = set()
+    for home_id, company_id, eep_program_id in test_home_statuses:
+        if eep_program_id not in program_questions:
+            question_ids = EEPProgram.objects.filter(id=eep_program_id).values_list(
+                "required_checklists__questions__id", flat=True
+            )
+            program_questions[eep_program_id] = {x for x in question_ids if x is not None}
+        question_ids = program_questions[eep_program_id]
+        if not question_ids:
+            continue
+        rows |= set(
+            Answer.objects.filter(
+                home_id=home_id, question_id__in=question_ids, user__company_id=company_id
+            ).values_list("id", "question_id")
+        )
+    return rows
+
+
+def populate_sampleset_answer_coverage(apps, schema_editor):
+    Answer = apps.get_model("checklist", "Answer")
+    EEPProgram = apps.get_model("eep_program", "EEPProgram")
+    SampleSet = apps.get_model("sampleset", "SampleSet")
+    SampleSetHomeStatus = apps.get_model("sampleset", "SampleSetHomeStatus")
+    SampleSetAnswerCoverage = apps.get_model("sampleset", "SampleSetAnswerCoverage")
+
+    program_questions = {}
+    sampleset_ids = SampleSet.objects.filter(confirm_date__isnull=True).values_list("id", flat=True)
+    for sampleset_id in sampleset_ids.order_by("id").iterator():
+        test_home_statuses = SampleSetHomeStatus.objects.filter(
+            sampleset_id=sampleset_id, is_active=True, is_test_home=True
+        ).values_list(
+            "home_status__home_id", "home_status__company_id", "home_status__eep_program_id"
+        )
+        rows = {
+            ("source", answer_id, question_id)
+            for answer_id, question_id in get_source_answer_rows(
+                Answer, EEPProgram, test_home_statuses, program_questions
+            )
+        }
+        rows |= {
+            ("contributed", answer_id, question_id)
+            for answer_id, question_id in Answer.objects.filter(
+                samplesethomestatus__sampleset_id=sampleset_id
+            ).values_list("id", "question_id")
+        }
+        SampleSetAnswerCoverage.objects.bulk_create(
+            [
+                SampleSetAnswerCoverage(
+                    sampleset_id=sampleset_id,
+                    kind=kind,
+                    answer_id=answer_id,
+                    question_id=question_id,
+                )
+                for kind, answer_id, question_id in rows
+            ],
+            batch_size=5000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("eep_program", "0024_remove_eepprogram_require_builder_epa_is_active_and_more"),
+        ("home", "0028_homevisibility"),
+        ("sampleset", "0005_samplesetanswercoverage"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_sampleset_answer_coverage, migrations.RunPython.noop),
+    ]
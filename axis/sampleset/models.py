@@ -160,6 +160,9 @@ def advance(self):
         self.revision = new_revision
         self.save()
 
+        # Membership was rewritten with update() / bulk_create(), neither of which send signals
+        utils.rebuild_sampleset_coverage(self)
+
     def certify(self, user, date, return_report=False, validate_certified=True):
         """
         Calls advance() to guarantee all answers are pushed to sampled homes, and then asks the
@@ -397,7 +400,7 @@ def get_completion_percentage(self):
             return 0
 
         # Find all answers that have ever been given to the sampleset, even by past test homes.
-        answered_questions = set(self.get_test_answers().values_list("question__id", flat=True))
+        answered_questions = set(self.answer_coverage.values_list("question_id", flat=True))
         try:
             return 100.0 * len(answered_questions) / len(question_ids)
         except ZeroDivisionError:
@@ -429,7 +432,12 @@ def get_current_source_answers(self):
         Returns a queryset of current Answers
         being provided by the sampleset to sampled homes.
         """
-        return self.samplesethomestatus_set.get_current_source_answers()
+        from axis.checklist.models import Answer
+
+        return Answer.objects.filter(
+            sampleset_coverage__sampleset=self,
+            sampleset_coverage__kind=SampleSetAnswerCoverage.SOURCE,
+        )
 
     def get_current_source_failing_answers(self, combined=False):
         """
@@ -472,7 +480,10 @@ def get_previous_contributed_answers(self):
         """
         from axis.checklist.models import Answer
 
-        return Answer.objects.filter(samplesethomestatus__sampleset=self).distinct()
+        return Answer.objects.filter(
+            sampleset_coverage__sampleset=self,
+            sampleset_coverage__kind=SampleSetAnswerCoverage.CONTRIBUTED,
+        )
 
     def get_test_answers(self):
         """
@@ -482,9 +493,9 @@ def get_test_answers(self):
         """
         from axis.checklist.models import Answer
 
-        current = set(self.get_current_source_answers().values_list("id", flat=True))
-        previous = set(self.get_previous_contributed_answers().values_list("id", flat=True))
-        return Answer.objects.filter(id__in=(current | previous))
+        return Answer.objects.filter(
+            id__in=self.answer_coverage.values("answer_id"),
+        )
 
 
 class SampleSetHomeStatus(models.Model):
@@ -623,12 +634,53 @@ def find_uncovered_questions(self, include_optional=False):
         """
         # NOTE: This is like peeking at what the question coverage would be if the sampleset were
         # put through the required advance().
-        v1 = set(self.find_existing_answers().values_list("id", flat=True))
-        v2 = set(self.find_new_test_answers().values_list("id", flat=True))
+        answer_ids = list(self.find_existing_answers().values_list("id", flat=True))
+        offered = SampleSetAnswerCoverage.objects.filter(
+            sampleset_id=self.sampleset_id, kind=SampleSetAnswerCoverage.SOURCE
+        )
         queryset = self.get_questions()
         if not include_optional:
             queryset = queryset.filter(is_optional=False)
-        return queryset.exclude(answer__id__in=(v1 | v2))
+        queryset = queryset.exclude(id__in=offered.values("question_id"))
+        return queryset.exclude(answer__id__in=answer_ids)
+
+
+class SampleSetAnswerCoverage(models.Model):
+    """
+    Maintained index of the answers covering questions on a sampleset.
+
+    "source" rows are answers currently offered by the sampleset's active test homes, and
+    "contributed" rows are answers that have been locked onto any of its items by advance().  Rows
+    are kept up to date by the signals in this app, so coverage checks don't have to rebuild the
+    test home answer query each time.  ``rebuild_sampleset_coverage`` repairs a sampleset.
+    """
+
+    SOURCE = "source"
+    CONTRIBUTED = "contributed"
+    KIND_CHOICES = (
+        (SOURCE, "Offered by a test home"),
+        (CONTRIBUTED, "Contributed by advance"),
+    )
+
+    sampleset = models.ForeignKey(
+        "SampleSet", on_delete=models.CASCADE, related_name="answer_coverage"
+    )
+    question = models.ForeignKey("checklist.Question", on_delete=models.CASCADE, related_name="+")
+    answer = models.ForeignKey(
+        "checklist.Answer", on_delete=models.CASCADE, related_name="sampleset_coverage"
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+
+    class Meta:
+        unique_together = [("sampleset", "answer", "kind")]
+        indexes = [models.Index(fields=["sampleset", "kind", "question"])]
+        verbose_name = "Sample Set Answer Coverage"
+        verbose_name_plural = "Sample Set Answer Coverage"
+
+    def __str__(self):
+        return "{} answer {} covers question {} on {}".format(
+            self.get_kind_display(), self.answer_id, self.question_id, self.sampleset_id
+        )
 
 
 class SamplingProviderApproval(models.Model):
@@ -0,0 +1,79 @@
+"""signals.py: Django sampleset"""
+
+
+import logging
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from axis.checklist.models import Answer
+from .models import SampleSet, SampleSetAnswerCoverage, SampleSetHomeStatus
+from .utils import rebuild_sampleset_coverage, update_sampleset_answer_coverage
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 17:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+def register_signals():
+    """Nested to avoid tangling import during initial load."""
+
+    post_save.connect(update_coverage_on_answer, sender=Answer)
+    post_save.connect(update_coverage_on_membership, sender=SampleSetHomeStatus)
+    post_delete.connect(update_coverage_on_membership, sender=SampleSetHomeStatus)
+    m2m_changed.connect(
+        update_coverage_on_contributed_answers, sender=SampleSetHomeStatus.answers.through
+    )
+
+
+def update_coverage_on_answer(sender, instance, raw=False, **kwargs):
+    """An answer on a test home is offered to its samplesets"""
+    if raw:
+        return
+    update_sampleset_answer_coverage([instance])
+
+
+def update_coverage_on_membership(sender, instance, raw=False, **kwargs):
+    """Test homes coming, going or changing roles change what the sampleset offers"""
+    if raw:
+        return
+    sampleset = SampleSet.objects.filter(id=instance.sampleset_id).first()
+    if sampleset:
+        rebuild_sampleset_coverage(sampleset)
+
+
+def update_coverage_on_contributed_answers(
+    sender, instance, action, reverse, pk_set, raw=False, **kwargs
+):
+    """Answers locked onto a sampleset item by advance() stay covered for the sampleset"""
+    if raw or action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_add" and not reverse:
+        answers = Answer.objects.filter(id__in=pk_set).values_list("id", "question_id")
+        SampleSetAnswerCoverage.objects.bulk_create(
+            [
+                SampleSetAnswerCoverage(
+                    sampleset_id=instance.sampleset_id,
+                    kind=SampleSetAnswerCoverage.CONTRIBUTED,
+                    answer_id=answer_id,
+                    question_id=question_id,
+                )
+                for answer_id, question_id in answers
+            ],
+            ignore_conflicts=True,
+        )
+        return
+
+    if reverse:
+        samplesets = SampleSet.objects.filter(answer_coverage__answer=instance)
+        if pk_set:
+            samplesets = samplesets | SampleSet.objects.filter(samplesethomestatus__id__in=pk_set)
+    else:
+        samplesets = SampleSet.objects.filter(id=instance.sampleset_id)
+    for sampleset in samplesets.distinct():
+        rebuild_sampleset_coverage(sampleset)
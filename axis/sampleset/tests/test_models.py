@@ -397,6 +397,47 @@ def test_find_uncovered_questions(self):
         self.assertEqual(uncovered.count(), questions.count() - answered.count())
 
 
+class SampleSetAnswerCoverageTests(SampleSetTestMixin, TestCase, AxisTestCaseUserMixin):
+    def assertCoverageCurrent(self, sampleset):
+        """The maintained index matches what the membership queries would compute"""
+        source = sampleset.samplesethomestatus_set.get_current_source_answers()
+        contributed = Answer.objects.filter(samplesethomestatus__sampleset=sampleset)
+        self.assertEqual(set(sampleset.get_current_source_answers()), set(source))
+        self.assertEqual(set(sampleset.get_previous_contributed_answers()), set(contributed))
+
+    def test_coverage_maintained(self):
+        """Answers, membership changes and advance() keep the coverage index current."""
+        from axis.checklist.tests.factories import answer_factory
+
+        for sampleset in SampleSet.objects.all():
+            self.assertCoverageCurrent(sampleset)
+
+        sampleset = SampleSet.objects.get(uuid="multistage_incomplete")
+        test_home = sampleset.samplesethomestatus_set.current().filter(is_test_home=True)[0]
+        sampled_home = sampleset.samplesethomestatus_set.current().filter(is_test_home=False)[0]
+        uncovered = sampled_home.find_uncovered_questions()
+        self.assertNotEqual(uncovered.count(), 0)
+
+        question = uncovered[0]
+        user = sampleset.samplesethomestatus_set.get_current_source_answers()[0].user
+        answer = answer_factory(question, test_home.home_status.home, user)
+        self.assertCoverageCurrent(sampleset)
+        self.assertNotIn(question, sampled_home.find_uncovered_questions())
+
+        answer.delete()
+        self.assertCoverageCurrent(sampleset)
+        self.assertIn(question, sampled_home.find_uncovered_questions())
+
+        test_home.is_test_home = False
+        test_home.save()
+        self.assertCoverageCurrent(sampleset)
+
+        sampleset = SampleSet.objects.get(uuid="generic")
+        sampleset.advance()
+        self.assertCoverageCurrent(sampleset)
+        self.assertNotEqual(sampleset.get_previous_contributed_answers().count(), 0)
+
+
 class SampleSetQueryTests(SampleSetTestMixin, TestCase, AxisTestCaseUserMixin):
     def test_filter_answers_across_programs(self):
         """
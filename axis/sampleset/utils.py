@@ -213,6 +213,7 @@ def modify_sampleset(obj, test_id_list, sampled_id_list, user, simulate=True):
                 for home_status in to_add
             ]
         )
+        rebuild_sampleset_coverage(obj)
 
         if len(all_memberships):
             # Select a homestatus item in the set to use for stats/state update.
@@ -294,6 +295,115 @@ def get_homestatus_test_answers(test_statuses, include_failures=True):
     return answers.filter(reduce(operator.or_, answer_qs))
 
 
+def rebuild_sampleset_coverage(sampleset):
+    """Bring the answer coverage index of ``sampleset`` in line with its current membership.
+    Only the difference is written, so this is cheap when nothing has changed."""
+    from axis.checklist.models import Answer
+    from .models import SampleSetAnswerCoverage
+
+    expected = {
+        (SampleSetAnswerCoverage.SOURCE, answer_id, question_id)
+        for answer_id, question_id in (
+            sampleset.samplesethomestatus_set.get_current_source_answers()
+            .values_list("id", "question_id")
+            .distinct()
+        )
+    }
+    expected |= {
+        (SampleSetAnswerCoverage.CONTRIBUTED, answer_id, question_id)
+        for answer_id, question_id in (
+            Answer.objects.filter(samplesethomestatus__sampleset=sampleset)
+            .values_list("id", "question_id")
+            .distinct()
+        )
+    }
+
+    existing = {}
+    for coverage in sampleset.answer_coverage.values_list("id", "kind", "answer_id", "question_id"):
+        existing[coverage[1:]] = coverage[0]
+
+    stale = [_id for key, _id in existing.items() if key not in expected]
+    if stale:
+        SampleSetAnswerCoverage.objects.filter(id__in=stale).delete()
+
+    missing = expected - set(existing)
+    SampleSetAnswerCoverage.objects.bulk_create(
+        [
+            SampleSetAnswerCoverage(
+                sampleset=sampleset, kind=kind, answer_id=answer_id, question_id=question_id
+            )
+            for kind, answer_id, question_id in missing
+        ],
+        ignore_conflicts=True,
+    )
+    return len(missing), len(stale)
+
+
+def update_sampleset_answer_coverage(answers):
+    """Index newly saved ``answers`` against the samplesets their home is a test home for.  This
+    applies the same rules as ``get_homestatus_test_answers`` to just these answers."""
+    from django.contrib.auth import get_user_model
+    from .models import SampleSetAnswerCoverage, SampleSetHomeStatus
+
+    answers = [answer for answer in answers if answer.pk]
+    if not answers:
+        return
+
+    test_statuses = (
+        SampleSetHomeStatus.objects.current()
+        .filter(is_test_home=True, home_status__home_id__in={a.home_id for a in answers})
+        .select_related("home_status__eep_program")
+    )
+    offering = {}
+    questions = {}
+    for item in test_statuses:
+        home_status = item.home_status
+        key = (home_status.home_id, home_status.company_id)
+        offering.setdefault(key, []).append((item.sampleset_id, home_status.eep_program_id))
+        if home_status.eep_program_id not in questions:
+            questions[home_status.eep_program_id] = set(
+                home_status.eep_program.get_checklist_question_set().values_list("id", flat=True)
+            )
+
+    user_companies = dict(
+        get_user_model()
+        .objects.filter(id__in={a.user_id for a in answers if a.user_id})
+        .values_list("id", "company_id")
+    )
+
+    expected = set()
+    for answer in answers:
+        key = (answer.home_id, user_companies.get(answer.user_id))
+        for sampleset_id, eep_program_id in offering.get(key, []):
+            if answer.question_id in questions[eep_program_id]:
+                expected.add((sampleset_id, answer.id, answer.question_id))
+
+    existing = SampleSetAnswerCoverage.objects.filter(
+        kind=SampleSetAnswerCoverage.SOURCE, answer_id__in=[a.pk for a in answers]
+    )
+    stale, current = [], set()
+    for _id, *key in existing.values_list("id", "sampleset_id", "answer_id", "question_id"):
+        if tuple(key) in expected:
+            current.add(tuple(key))
+        else:
+            stale.append(_id)
+    if stale:
+        SampleSetAnswerCoverage.objects.filter(id__in=stale).delete()
+
+    SampleSetAnswerCoverage.objects.bulk_create(
+        [
+            SampleSetAnswerCoverage(
+                sampleset_id=sampleset_id,
+                kind=SampleSetAnswerCoverage.SOURCE,
+                answer_id=answer_id,
+                question_id=question_id,
+            )
+            for sampleset_id, answer_id, question_id in expected - current
+        ],
+        ignore_conflicts=True,
+    )
+
+
 def discover_is_metro_sampled(queryset):
     """Returns True if there is more than one subdivision used on the given homes."""
     from axis.home.models import EEPProgramHomeStatus
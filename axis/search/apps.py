@@ -17,3 +17,7 @@ class SearchConfig(platform.PlatformAppConfig):
     """Search platform configuration."""
 
     name = "axis.search"
+
+    # The header search reads homes, subdivisions, communities, companies and floorplans from the
+    # search index.  Only turn this on once ``rebuild_search_index`` has been run.
+    USE_INDEX = settings.get("USE_INDEX", False)
@@ -0,0 +1,182 @@
+"""documents.py: Django search"""
+
+import logging
+import re
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+TOKEN_LENGTH = 64
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(*values):
+    """The lower cased words in ``values`` - this is what gets indexed and searched on"""
+    tokens = set()
+    for value in values:
+        if value is None:
+            continue
+        tokens.update(x[:TOKEN_LENGTH] for x in TOKEN_RE.findall(str(value).lower()))
+    return tokens
+
+
+def get_relationship_company_ids(model, object_ids, **filters):
+    """{object_id: {company_id, ...}} for the companies owning ``object_ids`` through their
+    relationships.  This is the ``show_attached=False`` side of ``filter_by_user()``."""
+    from axis.relationship.models import Relationship
+
+    relationships = Relationship.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id__in=object_ids,
+        is_owned=True,
+        **filters,
+    ).values_list("object_id", "company_id")
+
+    company_ids = defaultdict(set)
+    for object_id, company_id in relationships:
+        company_ids[object_id].add(company_id)
+    return company_ids
+
+
+class SearchDocumentType(object):
+    """Describes how one model is flattened into ``SearchDocument`` rows.
+
+    ``fields`` are the value paths which end up in the searchable text and
+    ``get_company_ids()`` has to agree with the model's ``filter_by_user()``.
+    """
+
+    model = None  # "app_label.ModelName"
+    fields = ()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_queryset(self):
+        return self.get_model()._default_manager.all()
+
+    def get_values(self, object_ids):
+        """{object_id: [value, ...]} - multi-valued paths show up once per related row"""
+        values = defaultdict(list)
+        queryset = self.get_queryset().filter(id__in=object_ids)
+        for row in queryset.values_list("id", *self.fields):
+            values[row[0]].extend(x for x in row[1:] if x not in (None, ""))
+        for object_id in queryset.values_list("id", flat=True):
+            values.setdefault(object_id, [])
+        return values
+
+    def get_company_ids(self, object_ids):
+        return get_relationship_company_ids(self.get_model(), object_ids)
+
+    def get_documents(self, object_ids):
+        """{object_id: (text, company_ids)} for the ``object_ids`` which should be indexed"""
+        company_ids = self.get_company_ids(object_ids)
+        documents = {}
+        for object_id, values in self.get_values(object_ids).items():
+            text = " ".join(sorted(tokenize(*values)))
+            documents[object_id] = (text, frozenset(company_ids.get(object_id, ())))
+        return documents
+
+
+class HomeDocumentType(SearchDocumentType):
+    model = "home.Home"
+    fields = (
+        "lot_number",
+        "street_line1",
+        "city__name",
+        "zipcode",
+        "geocode_response__geocode__raw_street_line1",
+        "hirl_certification__project_id",
+    )
+
+    def get_company_ids(self, object_ids):
+        from axis.home.models import HomeVisibility
+
+        rows = HomeVisibility.objects.get_expected_rows(object_ids)
+        company_ids = defaultdict(set)
+        for company_id, home_id, show_attached in rows:
+            if not show_attached:
+                company_ids[home_id].add(company_id)
+        return company_ids
+
+
+class SubdivisionDocumentType(SearchDocumentType):
+    model = "subdivision.Subdivision"
+    # The community name is here for the "Subdivision at Community" searches
+    fields = ("name", "builder_name", "community__name")
+
+
+class CommunityDocumentType(SearchDocumentType):
+    model = "community.Community"
+    fields = ("name",)
+
+
+class CompanyDocumentType(SearchDocumentType):
+    model = "company.Company"
+    fields = ("name", "altname__name")
+
+    def get_queryset(self):
+        return super(CompanyDocumentType, self).get_queryset().filter(is_active=True)
+
+    def get_company_ids(self, object_ids):
+        return get_relationship_company_ids(self.get_model(), object_ids, is_viewable=True)
+
+
+class FloorplanDocumentType(SearchDocumentType):
+    model = "floorplan.Floorplan"
+    fields = ("name", "number")
+
+    def get_company_ids(self, object_ids):
+        from axis.home.models import EEPProgramHomeStatus
+
+        Floorplan = self.get_model()
+        # Unnamed floorplans are only ever seen through their homes
+        named_ids = (
+            Floorplan.objects.filter(id__in=object_ids)
+            .exclude(name="", number="")
+            .values_list("id", flat=True)
+        )
+        company_ids = get_relationship_company_ids(Floorplan, list(named_ids))
+
+        Associations = EEPProgramHomeStatus.associations.rel.related_model
+        associations = Associations.objects.filter(
+            is_active=True,
+            is_hidden=False,
+            eepprogramhomestatus__floorplans__in=object_ids,
+        ).values_list("eepprogramhomestatus__floorplans", "company_id")
+        for floorplan_id, company_id in associations:
+            company_ids[floorplan_id].add(company_id)
+        return company_ids
+
+
+SEARCH_DOCUMENT_TYPES = {
+    x.model.lower(): x()
+    for x in (
+        HomeDocumentType,
+        SubdivisionDocumentType,
+        CommunityDocumentType,
+        CompanyDocumentType,
+        FloorplanDocumentType,
+    )
+}
+
+
+def get_document_type(model):
+    """The ``SearchDocumentType`` for a model class or 'app_label.ModelName', None if unindexed"""
+    if not isinstance(model, str):
+        # Company proxies (RaterOrganization, etc.) share the Company documents
+        model = model._meta.concrete_model._meta.label
+    return SEARCH_DOCUMENT_TYPES.get(model.lower())
+
+
+def get_indexed_models():
+    return [x.get_model() for x in SEARCH_DOCUMENT_TYPES.values()]
@@ -0,0 +1,7 @@
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+__license__ = "See the file LICENSE.txt for licensing information."
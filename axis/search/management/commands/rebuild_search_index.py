@@ -0,0 +1,80 @@
+"""rebuild_search_index.py - Axis"""
+
+import logging
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import BaseCommand, CommandError
+
+from axis.search.documents import SEARCH_DOCUMENT_TYPES, get_document_type
+from axis.search.models import SearchDocument
+
+log = logging.getLogger(__name__)
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the search index"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            dest="verify",
+            help="Only report the documents which are out of date - fails if there are any",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            choices=sorted(SEARCH_DOCUMENT_TYPES),
+            help="Limit to these models (app_label.modelname)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            action="store",
+            dest="chunk_size",
+            type=int,
+            default=1000,
+            help="Objects handled per pass",
+        )
+
+    def handle(self, verify=False, models=None, chunk_size=1000, **options):
+        stale = False
+        for label in models or sorted(SEARCH_DOCUMENT_TYPES):
+            model = get_document_type(label).get_model()
+            object_ids = set(model._default_manager.values_list("id", flat=True))
+            object_ids |= set(
+                SearchDocument.objects.filter(
+                    content_type=ContentType.objects.get_for_model(model)
+                ).values_list("object_id", flat=True)
+            )
+
+            created, updated, deleted = SearchDocument.objects.sync(
+                model, object_ids, commit=not verify, chunk_size=chunk_size
+            )
+            stale = stale or any([created, updated, deleted])
+
+            verb = "Missing" if verify else "Created"
+            self.stdout.write(
+                "%s: %d objects checked.  %s %d, %s %d, %s %d documents"
+                % (
+                    label,
+                    len(object_ids),
+                    verb,
+                    created,
+                    "Stale" if verify else "Updated",
+                    updated,
+                    "Extra" if verify else "Deleted",
+                    deleted,
+                )
+            )
+
+        if verify and stale:
+            raise CommandError("The search index is out of date - run without --verify to repair")
@@ -0,0 +1,174 @@
+"""managers.py: Django search"""
+
+import logging
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Q
+
+from .documents import get_document_type, tokenize
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class SearchDocumentManager(models.Manager):
+    """Keeps ``SearchDocument`` in line with the indexed models and answers searches from it"""
+
+    def sync(self, model, object_ids, commit=True, chunk_size=1000):
+        """
+        Brings the documents for ``object_ids`` of ``model`` in line with the objects.  Objects
+        which are gone (or no longer indexed) lose their document.  With ``commit=False`` nothing is
+        written, which is how the index gets verified.
+
+        Returns (created, updated, deleted) document counts.
+        """
+        document_type = get_document_type(model)
+        if document_type is None:
+            raise ValueError("%s is not indexed for search" % model)
+
+        object_ids = sorted(set(object_ids))
+        counts = [0, 0, 0]
+        for start in range(0, len(object_ids), chunk_size):
+            chunk = object_ids[start : start + chunk_size]
+            for idx, count in enumerate(self._sync(document_type, chunk, commit=commit)):
+                counts[idx] += count
+        return tuple(counts)
+
+    def sync_objects(self, object_ids):
+        """``sync()`` every model in {model: [object_id, ...]}, skipping those not indexed"""
+        for model, ids in object_ids.items():
+            if ids and get_document_type(model) is not None:
+                self.sync(model, ids)
+
+    def get_relationship_object_ids(self, relationships):
+        """{model: [object_id, ...]} for the indexed objects behind a queryset of relationships -
+        take these before updating it"""
+        object_ids = defaultdict(set)
+        for content_type_id, object_id in relationships.values_list(
+            "content_type_id", "object_id"
+        ).distinct():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is not None and get_document_type(model) is not None:
+                object_ids[model].add(object_id)
+        return {model: sorted(ids) for model, ids in object_ids.items()}
+
+    def _sync(self, document_type, object_ids, commit=True):
+        expected = document_type.get_documents(object_ids)
+        content_type = ContentType.objects.get_for_model(document_type.get_model())
+
+        current = {}
+        documents = self.filter(content_type=content_type, object_id__in=object_ids)
+        for pk, object_id, text in documents.values_list("id", "object_id", "text"):
+            current[object_id] = (pk, text, set())
+        Companies = self.model.companies.through
+        for document_id, company_id, object_id in Companies.objects.filter(
+            searchdocument__in=documents
+        ).values_list("searchdocument_id", "company_id", "searchdocument__object_id"):
+            current[object_id][2].add(company_id)
+
+        to_create, to_update, to_delete = [], [], []
+        for object_id, (pk, text, company_ids) in current.items():
+            if object_id not in expected:
+                to_delete.append(pk)
+            elif expected[object_id] != (text, company_ids):
+                to_update.append((pk, text, company_ids) + expected[object_id])
+        for object_id, document in expected.items():
+            if object_id not in current:
+                to_create.append((object_id,) + document)
+
+        if commit:
+            with transaction.atomic():
+                self._apply(content_type, to_create, to_update, to_delete)
+
+        return len(to_create), len(to_update), len(to_delete)
+
+    def _apply(self, content_type, to_create, to_update, to_delete):
+        from .models import SearchToken
+
+        Companies = self.model.companies.through
+
+        if to_delete:
+            self.filter(id__in=to_delete).delete()
+
+        if to_create:
+            self.bulk_create(
+                [
+                    self.model(content_type=content_type, object_id=object_id, text=text)
+                    for object_id, text, _company_ids in to_create
+                ],
+                ignore_conflicts=True,
+            )
+            # bulk_create doesn't hand back ids on every backend
+            created_ids = dict(
+                self.filter(
+                    content_type=content_type, object_id__in=[x[0] for x in to_create]
+                ).values_list("object_id", "id")
+            )
+            to_update += [
+                (created_ids[object_id], "", set(), text, company_ids)
+                for object_id, text, company_ids in to_create
+            ]
+
+        tokens, companies = [], []
+        for pk, old_text, old_company_ids, text, company_ids in to_update:
+            if old_text != text:
+                SearchToken.objects.filter(document_id=pk).delete()
+                tokens += [SearchToken(document_id=pk, token=x) for x in text.split()]
+                self.filter(id=pk).update(text=text)
+            if old_company_ids != company_ids:
+                Companies.objects.filter(
+                    searchdocument_id=pk, company_id__in=old_company_ids - company_ids
+                ).delete()
+                companies += [
+                    Companies(searchdocument_id=pk, company_id=x)
+                    for x in company_ids - old_company_ids
+                ]
+
+        SearchToken.objects.bulk_create(tokens, batch_size=5000, ignore_conflicts=True)
+        Companies.objects.bulk_create(companies, batch_size=5000, ignore_conflicts=True)
+
+    def search(self, user, terms, models=None):
+        """
+        The objects ``user`` can see where every term starts one of the indexed words, or whose id
+        is one of the numeric terms.  This is a single query on the index.
+
+        Returns {model: [object_id, ...]}
+        """
+        if not user.is_superuser and not user.company_id:
+            return {}
+
+        tokens = tokenize(*terms)
+        if not tokens:
+            return {}
+
+        documents = self.all()
+        if models:
+            content_types = ContentType.objects.get_for_models(*models).values()
+            documents = documents.filter(content_type__in=content_types)
+        if not user.is_superuser:
+            documents = documents.filter(companies__id=user.company_id)
+
+        matches = documents
+        for token in tokens:
+            # Tokens are stored lower cased - MySQL only ranges over the index for a plain LIKE
+            matches = matches.filter(tokens__token__istartswith=token)
+        query = Q(id__in=matches.values("id"))
+
+        object_ids = [int(x) for x in tokens if x.isdigit()]
+        if object_ids:
+            query |= Q(object_id__in=object_ids)
+
+        results = defaultdict(list)
+        values = documents.filter(query).values_list("content_type_id", "object_id").distinct()
+        for content_type_id, object_id in values:
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            results[model].append(object_id)
+        return dict(results)
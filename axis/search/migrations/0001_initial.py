@@ -0,0 +1,71 @@
+# Generated by Django 4.2 on 2026-10-18 19:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("company", "0035_auto_20230418_0717"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("text", models.TextField(blank=True)),
+                ("last_update", models.DateTimeField(auto_now=True)),
+                (
+                    "companies",
+                    models.ManyToManyField(blank=True, related_name="+", to="company.company"),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("content_type", "object_id")},
+            },
+        ),
+        migrations.CreateModel(
+            name="SearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("token", models.CharField(max_length=64)),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to="search.searchdocument",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["token", "document"], name="search_sear_token_628123_idx")
+                ],
+                "unique_together": {("document", "token")},
+            },
+        ),
+    ]
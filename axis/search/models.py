@@ -0,0 +1,62 @@
+"""models.py: Django search"""
+
+import logging
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.db import models
+
+from .managers import SearchDocumentManager
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable words of a home, subdivision, community, company or floorplan, flattened out
+    along with the companies which see it through ``filter_by_user()``.  The header search reads
+    this in one pass instead of running ``filter_by_user()`` and ``icontains`` over every model.
+
+    This is maintained by the signals in ``axis.search.signals``; ``rebuild_search_index``
+    verifies and repairs it.  The documents are described in ``axis.search.documents``.
+    """
+
+    content_type = models.ForeignKey(
+        "contenttypes.ContentType", on_delete=models.CASCADE, related_name="+"
+    )
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+
+    # Space separated, lower cased tokens.  Each one is also a SearchToken row.
+    text = models.TextField(blank=True)
+    companies = models.ManyToManyField("company.Company", related_name="+", blank=True)
+
+    last_update = models.DateTimeField(auto_now=True)
+
+    objects = SearchDocumentManager()
+
+    class Meta:
+        unique_together = ("content_type", "object_id")
+
+    def __str__(self):
+        return "{} {}".format(self.content_type_id, self.object_id)
+
+
+class SearchToken(models.Model):
+    """One indexed word of a ``SearchDocument``.  Searches are prefix matches on ``token``."""
+
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name="tokens")
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ("document", "token")
+        indexes = [models.Index(fields=["token", "document"])]
+
+    def __str__(self):
+        return self.token
@@ -0,0 +1,120 @@
+"""signals.py: Django search"""
+
+import logging
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .documents import get_document_type, get_indexed_models
+from .models import SearchDocument
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+def register_signals():
+    """Nested to avoid tangling import during initial load."""
+
+    from axis.community.models import Community
+    from axis.company.models import AltName, COMPANY_MODELS
+    from axis.home.models import EEPProgramHomeStatus
+    from axis.relationship.models import Relationship
+
+    # Saves on the company proxies are sent by the proxy class
+    for model in set(get_indexed_models()) | set(COMPANY_MODELS):
+        post_save.connect(update_index_on_save, sender=model)
+        post_delete.connect(update_index_on_save, sender=model)
+
+    post_save.connect(update_index_on_community, sender=Community)
+    post_save.connect(update_index_on_alt_name, sender=AltName)
+    post_delete.connect(update_index_on_alt_name, sender=AltName)
+
+    post_save.connect(update_index_on_relationship, sender=Relationship)
+    post_delete.connect(update_index_on_relationship, sender=Relationship)
+
+    Associations = EEPProgramHomeStatus.associations.rel.related_model
+    post_save.connect(update_index_on_association, sender=Associations)
+    post_delete.connect(update_index_on_association, sender=Associations)
+    post_delete.connect(update_index_on_home_status_delete, sender=EEPProgramHomeStatus)
+    m2m_changed.connect(
+        update_index_on_floorplans_changed, sender=EEPProgramHomeStatus.floorplans.through
+    )
+
+
+def update_index_on_save(sender, instance, **kwargs):
+    """Re-index an object when it changes, drop its document when it goes"""
+    if kwargs.get("raw"):
+        return
+    SearchDocument.objects.sync(sender, [instance.pk])
+
+
+def update_index_on_community(sender, instance, **kwargs):
+    """Subdivisions carry their community name"""
+    from axis.subdivision.models import Subdivision
+
+    if kwargs.get("raw"):
+        return
+    subdivision_ids = Subdivision.objects.filter(community=instance).values_list("id", flat=True)
+    SearchDocument.objects.sync(Subdivision, list(subdivision_ids))
+
+
+def update_index_on_alt_name(sender, instance, **kwargs):
+    """Companies carry their alternate names"""
+    from axis.company.models import Company
+
+    if kwargs.get("raw"):
+        return
+    SearchDocument.objects.sync(Company, [instance.company_id])
+
+
+def update_index_on_relationship(sender, instance, **kwargs):
+    """Relationships decide which companies see an object"""
+    if kwargs.get("raw"):
+        return
+    model = instance.content_type.model_class()
+    if model is None or get_document_type(model) is None:
+        return
+    SearchDocument.objects.sync(model, [instance.object_id])
+
+
+def _sync_home_status_ids(home_status_ids):
+    from axis.floorplan.models import Floorplan
+    from axis.home.models import EEPProgramHomeStatus, Home
+
+    home_statuses = EEPProgramHomeStatus.objects.filter(id__in=home_status_ids)
+    SearchDocument.objects.sync(Home, list(home_statuses.values_list("home_id", flat=True)))
+    floorplan_ids = home_statuses.filter(floorplans__isnull=False).values_list(
+        "floorplans", flat=True
+    )
+    SearchDocument.objects.sync(Floorplan, list(floorplan_ids))
+
+
+def update_index_on_association(sender, instance, **kwargs):
+    """Home status associations let companies see the home and its floorplans"""
+    if kwargs.get("raw"):
+        return
+    _sync_home_status_ids([instance.eepprogramhomestatus_id])
+
+
+def update_index_on_home_status_delete(sender, instance, **kwargs):
+    """Associations cascading away with the home status can't find their home any more"""
+    from axis.home.models import Home
+
+    SearchDocument.objects.sync(Home, [instance.home_id])
+
+
+def update_index_on_floorplans_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Floorplans are seen through the associations of the home statuses using them"""
+    from axis.floorplan.models import Floorplan
+
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+    if reverse:
+        SearchDocument.objects.sync(Floorplan, [instance.pk])
+    else:
+        SearchDocument.objects.sync(Floorplan, pk_set)
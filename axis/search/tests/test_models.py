@@ -0,0 +1,110 @@
+"""test_models.py: Django search"""
+
+import logging
+
+from django.core import management
+from django.core.management import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from axis.community.models import Community
+from axis.community.tests.factories import community_factory
+from axis.company.tests.factories import base_company_factory
+from axis.core.tests.factories import builder_user_factory, rater_user_factory
+from axis.core.tests.test_views import DevNull
+from axis.geographic.tests.factories import real_city_factory
+from axis.relationship.models import Relationship
+from axis.search.documents import tokenize
+from axis.search.models import SearchDocument
+
+__author__ = "Steven Klass"
+__date__ = "10/18/26 19:40"
+__copyright__ = "Copyright 2011-2023 Pivotal Energy Solutions. All rights reserved."
+__credits__ = [
+    "Steven Klass",
+]
+
+log = logging.getLogger(__name__)
+
+
+class TokenizeTests(SimpleTestCase):
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("123 N. Main-St", None, 85296, "main"),
+            {"123", "n", "main", "st", "85296"},
+        )
+
+
+class SearchDocumentTests(TestCase):
+    """The index has to agree with the objects and relationships behind it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = real_city_factory("Ames", "IA")
+        cls.rater = base_company_factory(company_type="rater", city=cls.city)
+        cls.builder = base_company_factory(company_type="builder", city=cls.city)
+        cls.rater_user = rater_user_factory(company=cls.rater)
+        cls.builder_user = builder_user_factory(company=cls.builder)
+
+        cls.community = community_factory(name="Sunny Meadows", city=cls.city)
+        Relationship.objects.create(
+            company=cls.rater,
+            content_object=cls.community,
+            is_owned=True,
+            is_attached=True,
+            is_viewable=True,
+        )
+
+    def search(self, user, query):
+        return SearchDocument.objects.search(user, query.split(), models=[Community])
+
+    def test_search(self):
+        self.assertEqual(self.search(self.rater_user, "sunny"), {Community: [self.community.id]})
+        self.assertEqual(self.search(self.rater_user, "MEAD sun"), {Community: [self.community.id]})
+        self.assertEqual(
+            self.search(self.rater_user, str(self.community.id)), {Community: [self.community.id]}
+        )
+        self.assertEqual(self.search(self.rater_user, "sunny nowhere"), {})
+        self.assertEqual(self.search(self.builder_user, "sunny"), {})
+
+    def test_signals(self):
+        self.community.name = "Shady Acres"
+        self.community.save()
+        self.assertEqual(self.search(self.rater_user, "sunny"), {})
+        self.assertEqual(self.search(self.rater_user, "shady"), {Community: [self.community.id]})
+
+        Relationship.objects.create(
+            company=self.builder, content_object=self.community, is_owned=True
+        )
+        self.assertEqual(self.search(self.builder_user, "acres"), {Community: [self.community.id]})
+
+        self.community.delete()
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.community.id).exists())
+
+    def test_sync_relationship_updates(self):
+        """Queryset updates skip the signals, so their callers sync what they touched"""
+        relationship = Relationship.objects.create(
+            company=self.builder, content_object=self.community, is_owned=True
+        )
+        relationships = Relationship.objects.filter(id=relationship.id)
+        object_ids = SearchDocument.objects.get_relationship_object_ids(relationships)
+        self.assertEqual(object_ids, {Community: [self.community.id]})
+
+        relationships.update(is_owned=False)
+        args = ("rebuild_search_index", "--model", "community.community", "--verify")
+        with self.assertRaises(CommandError):
+            management.call_command(*args, stdout=DevNull())
+
+        SearchDocument.objects.sync_objects(object_ids)
+        management.call_command(*args, stdout=DevNull())
+
+    def test_rebuild_search_index(self):
+        args = ("rebuild_search_index", "--model", "community.community")
+        management.call_command(*args, "--verify", stdout=DevNull())
+
+        SearchDocument.objects.all().delete()
+        with self.assertRaises(CommandError):
+            management.call_command(*args, "--verify", stdout=DevNull())
+
+        management.call_command(*args, stdout=DevNull())
+        management.call_command(*args, "--verify", stdout=DevNull())
+        self.assertEqual(self.search(self.rater_user, "sunny"), {Community: [self.community.id]})
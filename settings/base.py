@@ -1002,6 +1002,7 @@
 
 USER_PERMISSION_CACHE_DURATION = 15 * 60  # seconds
 COMPANY_SPONSOR_INFO_CACHE_DURATION = 15 * 60  # seconds
+MENU_CACHE_DURATION = 15 * 60  # seconds
 
 OAUTH2_PROVIDER = {"SCOPES": {"read": "Read scope"}}
 OAUTH2_PROVIDER_ACCESS_TOKEN_MODEL = "oauth2_provider.AccessToken"